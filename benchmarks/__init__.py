@@ -0,0 +1,3 @@
+# benchmarks
+# Paquete con mediciones de rendimiento del programa. Cada módulo se ejecuta con
+# "python -m benchmarks.<modulo>" desde la carpeta del proyecto y no necesita red ni pantalla.
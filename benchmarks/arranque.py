@@ -0,0 +1,100 @@
+# benchmarks/arranque.py
+# Mide el arranque del visor:
+# 1. Importaciones: corre 'python -X importtime -c "import main"' e informa el total y los
+#    módulos que más tardan (tiempo acumulado, con sus dependencias).
+# 2. Primera ventana: corre 'python -X importtime main.py --medir-arranque --refresco manual'
+#    y toma el tiempo hasta cada hito que escribe la interfaz (ARRANQUE primera_ventana y
+#    ARRANQUE datos_visibles). Necesita una pantalla y Continentes/Todos.csv.
+# Uso: python -m benchmarks.arranque [--repeticiones 5] [--top 15]
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Carpeta del proyecto.
+LINEA_IMPORTTIME = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+HITOS = ("primera_ventana", "datos_visibles")
+ESPERA_MAXIMA = 60 # Segundos antes de dar por colgada la ventana.
+
+def leer_importtime(salida):
+    """Devuelve [(módulo, propio_us, acumulado_us, nivel)] a partir del stderr de -X importtime."""
+    modulos = []
+    for linea in salida.splitlines():
+        coincidencia = LINEA_IMPORTTIME.match(linea)
+        if coincidencia:
+            propio, acumulado, sangria, modulo = coincidencia.groups()
+            modulos.append((modulo, int(propio), int(acumulado), (len(sangria) - 1) // 2))
+    return modulos
+
+def medir_importaciones(top):
+    """Importa main en un proceso nuevo y muestra los módulos de primer nivel más lentos."""
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=RAIZ,
+                             capture_output=True, text=True)
+    if proceso.returncode != 0:
+        print(proceso.stderr, file=sys.stderr)
+        sys.exit(proceso.returncode)
+    modulos = leer_importtime(proceso.stderr)
+    de_primer_nivel = [m for m in modulos if m[3] == 0]
+    total = sum(acumulado for _, _, acumulado, _ in de_primer_nivel)
+    print(f"Importar main: {total / 1000:.1f} ms en total ({len(modulos)} módulos)")
+    print(f"{'módulo':>40} {'acumulado ms':>13} {'propio ms':>10}")
+    for modulo, propio, acumulado, _ in sorted(de_primer_nivel, key=lambda m: m[2], reverse=True)[:top]:
+        print(f"{modulo:>40} {acumulado / 1000:>13.1f} {propio / 1000:>10.1f}")
+    pesados = [m for m in ("requests", "tkinter") if any(nombre == m for nombre, *_ in modulos)]
+    if pesados:
+        print(f"Aviso: importar main ya carga {', '.join(pesados)}.")
+    return total
+
+def medir_primera_ventana():
+    """Abre el visor y devuelve {hito: segundos desde el lanzamiento}; None si no llegó a mostrarse."""
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, "-X", "importtime", "main.py", "--medir-arranque", "--refresco", "manual"],
+                               cwd=RAIZ, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    tiempos = {}
+    try:
+        for linea in proceso.stdout: # Los hitos llegan con flush, uno por línea.
+            if linea.startswith("ARRANQUE "):
+                tiempos[linea.split()[1]] = time.perf_counter() - inicio
+                if len(tiempos) == len(HITOS):
+                    break
+        proceso.wait(timeout=ESPERA_MAXIMA)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+    errores = proceso.stderr.read()
+    if len(tiempos) < len(HITOS):
+        motivo = [l for l in errores.splitlines() if not l.startswith("import time:")][-1:] or ["sin hitos"]
+        print(f"No se pudo medir la primera ventana: {motivo[0]}")
+        return None
+    tiempos['importaciones'] = sum(m[2] for m in leer_importtime(errores) if m[3] == 0) / 1e6
+    return tiempos
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque del visor (importaciones y primera ventana).")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Veces que se abre la ventana (se informa la mediana).")
+    parser.add_argument("--top", type=int, default=15, help="Cantidad de módulos a listar.")
+    argumentos = parser.parse_args()
+
+    # 1. Importaciones
+    medir_importaciones(argumentos.top)
+
+    # 2. Primera Ventana
+    if not os.path.exists(os.path.join(RAIZ, "Continentes", "Todos.csv")):
+        print("\nFalta Continentes/Todos.csv: corré main.py una vez para descargar los datos.")
+        return
+    mediciones = []
+    for _ in range(argumentos.repeticiones):
+        tiempos = medir_primera_ventana()
+        if tiempos is None:
+            return
+        mediciones.append(tiempos)
+    print(f"\nArranque de la ventana (mediana de {len(mediciones)}):")
+    for hito in ('importaciones',) + HITOS:
+        valores = [m[hito] * 1000 for m in mediciones]
+        print(f"{hito:>18} {statistics.median(valores):>9.1f} ms (mín. {min(valores):.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_busqueda.py
+# Compara la búsqueda original (recorrer todas las filas con lower().startswith) contra
+# el índice de prefijos de busquedaPaises, sobre un dataset sintético grande.
+# Uso: python -m benchmarks.bench_busqueda [--cantidad 1000000]
+
+import argparse
+import time
+
+from benchmarks.generador import generar_filas_todos
+from datosPaises import DatasetPaises
+
+CONSULTAS = ['a', 'ar', 'ka', 'mañ', 'sapepe', 'zz']
+
+def busqueda_lineal(nombres, texto):
+    # Igual que la versión original de buscar_pais.
+    texto = texto.lower()
+    return [i for i, nombre in enumerate(nombres) if nombre.lower().startswith(texto)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la búsqueda lineal con el índice de prefijos.")
+    parser.add_argument("--cantidad", type=int, default=250_000, help="Cantidad de países sintéticos.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    argumentos = parser.parse_args()
+
+    dataset = DatasetPaises.desde_filas(generar_filas_todos(argumentos.cantidad))
+    nombres = dataset.textos['nombre_comun_es']
+
+    inicio = time.perf_counter()
+    indice = dataset.indice_prefijos()
+    print(f"Índice construido en {time.perf_counter() - inicio:.2f}s para {len(dataset)} filas.\n")
+
+    print(f"{'consulta':>10} {'lineal ms':>10} {'índice ms':>10} {'resultados':>11}")
+    for consulta in CONSULTAS:
+        inicio = time.perf_counter()
+        for _ in range(argumentos.repeticiones):
+            lineal = busqueda_lineal(nombres, consulta)
+        t_lineal = (time.perf_counter() - inicio) / argumentos.repeticiones
+        inicio = time.perf_counter()
+        for _ in range(argumentos.repeticiones):
+            encontrados = indice.buscar(consulta, ['nombre_comun_es'])
+        t_indice = (time.perf_counter() - inicio) / argumentos.repeticiones
+        assert set(lineal) <= encontrados # El índice además ignora tildes, así que puede encontrar más.
+        print(f"{consulta:>10} {t_lineal * 1000:>10.2f} {t_indice * 1000:>10.3f} {len(encontrados):>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/bench_filtro.py
+# Compara el filtro lineal (recorrer todas las filas) contra los índices de rango de
+# filtroPaises, con varias selectividades y tamaños. Con un criterio selectivo el tiempo
+# del motor depende de la cantidad de resultados, no del tamaño del dataset.
+# Uso: python -m benchmarks.bench_filtro [--cantidades 10000 100000 500000]
+
+import argparse
+import time
+
+from benchmarks.generador import generar_filas_todos
+from datosPaises import DatasetPaises
+
+# (descripción, argumentos de filtrar).
+CONSULTAS = [
+    ("pob. 200-210 k", dict(min_pob=200_000, max_pob=210_000)),
+    ("área < 50.000 km²", dict(max_area=50_000)),
+    ("Oceania + pob. < 1 M", dict(continente="Oceania", max_pob=1_000_000)),
+    ("Europe + área > 15 M", dict(continente="Europe", min_area=15_000_000)),
+    ("Americas", dict(continente="Americas")),
+    ("pob. > 1.000 M", dict(min_pob=1_000_000_000)),
+]
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara el filtro lineal con los índices de rango.")
+    parser.add_argument("--cantidades", type=int, nargs="+", default=[10_000, 100_000, 500_000], help="Tamaños de dataset a probar.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    argumentos = parser.parse_args()
+
+    for cantidad in argumentos.cantidades:
+        dataset = DatasetPaises.desde_filas(generar_filas_todos(cantidad))
+        todas = range(len(dataset))
+        inicio = time.perf_counter()
+        dataset.motor_filtros()
+        print(f"\n{len(dataset)} filas (índices construidos en {time.perf_counter() - inicio:.2f}s)")
+        print(f"{'consulta':>24} {'lineal ms':>10} {'índices ms':>11} {'resultados':>11}")
+        for descripcion, criterios in CONSULTAS:
+            t_lineal, lineal = medir(lambda: dataset.filtrar(indices=todas, **criterios), argumentos.repeticiones)
+            t_motor, resultado = medir(lambda: dataset.filtrar(**criterios), argumentos.repeticiones)
+            assert resultado == lineal # Mismas filas y en el mismo orden.
+            print(f"{descripcion:>24} {t_lineal * 1000:>10.2f} {t_motor * 1000:>11.3f} {len(resultado):>11}")
+
+if __name__ == "__main__":
+    main()
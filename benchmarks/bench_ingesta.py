@@ -0,0 +1,107 @@
+# benchmarks/bench_ingesta.py
+# Compara la ingesta serial con ingestaParalela usando 1, 2, 4... procesos, sobre
+# archivos locales generados, e informa filas por segundo y aceleración. Verifica que
+# Todos.csv salga idéntico. Cada comparación hace el mismo trabajo de los dos lados:
+# 1. JSON de cada región -> Todos.csv, solo la transformación (sin CSV por continente,
+#    manifiesto ni snapshot): un recorrido serial contra ingerir_en_paralelo.
+# 2. CSV por continente -> Todos.csv con unir_csvs_en_uno completo (hashes, manifiesto y
+#    snapshot binario), serial contra unir_csvs_en_uno(procesos=N).
+# Uso: python -m benchmarks.bench_ingesta [--filas 500000] [--procesos 1 2 4 8]
+
+import argparse
+import contextlib
+import csv
+import filecmp
+import glob
+import io
+import os
+import tempfile
+import time
+
+from benchmarks.generador import escribir_json_por_region
+from generarPaises import (CAMPOS_CSV, TAMANIO_BLOQUE, TAMANIO_BUFFER_ESCRITURA, escribir_csv_paises,
+                           escritura_atomica, fila_desde_pais, unir_csvs_en_uno)
+from ingestaParalela import CABECERA, TAMANIO_BLOQUE as TAMANIO_BLOQUE_PARALELO, ingerir_en_paralelo
+from jsonIncremental import iterar_array_json
+
+def leer_en_bloques(ruta):
+    with open(ruta, 'rb') as archivo:
+        yield from iter(lambda: archivo.read(TAMANIO_BLOQUE), b'')
+
+def json_a_todos_serial(rutas_json, salida):
+    """La misma transformación que ingerir_en_paralelo, en un solo recorrido y sin procesos."""
+    with escritura_atomica(salida, newline='', encoding='utf-8', buffering=TAMANIO_BUFFER_ESCRITURA) as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(CABECERA)
+        for ruta in sorted(rutas_json, key=os.path.basename):
+            continente = os.path.splitext(os.path.basename(ruta))[0]
+            for pais in iterar_array_json(leer_en_bloques(ruta)):
+                fila = fila_desde_pais(pais)
+                escritor.writerow([fila[campo] for campo in CAMPOS_CSV] + [continente])
+    return salida
+
+def json_a_todos_paralelo(rutas_json, salida, procesos, bloque):
+    ingerir_en_paralelo(rutas_json, salida, procesos, bloque)
+    return salida
+
+def unir_completo(carpeta, procesos=None):
+    """unir_csvs_en_uno desde cero (sin salida ni manifiesto previos, para que no se saltee el trabajo)."""
+    salida = os.path.join(carpeta, "Todos.csv")
+    for ruta in glob.glob(os.path.join(carpeta, "Todos.*")):
+        os.remove(ruta)
+    with contextlib.redirect_stdout(io.StringIO()):
+        unir_csvs_en_uno(carpeta, salida, procesos=procesos)
+    return salida
+
+def medir(nombre, filas, funcion, referencia=None):
+    inicio = time.perf_counter()
+    ruta = funcion()
+    segundos = time.perf_counter() - inicio
+    igual = "-" if referencia is None else ("sí" if filecmp.cmp(ruta, referencia, shallow=False) else "NO")
+    print(f"{nombre:>28} {segundos:>9.2f} {filas / segundos:>12,.0f} {igual:>8}")
+    return segundos, ruta
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendimiento de la ingesta serial contra la paralela.")
+    parser.add_argument("--filas", type=int, default=500_000, help="Cantidad de países a generar.")
+    parser.add_argument("--procesos", type=int, nargs='+', help="Cantidades de procesos a probar (por defecto 1, 2, 4... hasta los núcleos).")
+    parser.add_argument("--bloque-mib", type=float, default=TAMANIO_BLOQUE_PARALELO / 2**20, help="Tamaño de bloque de la ingesta paralela.")
+    argumentos = parser.parse_args()
+    nucleos = os.cpu_count() or 1
+    procesos = argumentos.procesos or sorted({min(2 ** i, nucleos) for i in range(nucleos.bit_length() + 1)})
+    bloque = int(argumentos.bloque_mib * 2**20)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        carpeta_json = os.path.join(carpeta, "json")
+        os.makedirs(carpeta_json)
+        rutas_json = escribir_json_por_region(carpeta_json, argumentos.filas)
+        megas = sum(os.path.getsize(r) for r in rutas_json.values()) / 2**20
+        print(f"{argumentos.filas:,} países, {megas:.1f} MiB de JSON, {nucleos} núcleos\n")
+        print(f"{'ingesta':>28} {'segundos':>9} {'filas/s':>12} {'idéntico':>8}")
+
+        # 1. JSON de la API -> Todos.csv (solo la transformación)
+        salida_serial = os.path.join(carpeta, "serial.csv")
+        base, referencia = medir("JSON serial", argumentos.filas,
+                                 lambda: json_a_todos_serial(rutas_json.values(), salida_serial))
+        for cantidad in procesos:
+            salida = os.path.join(carpeta, f"paralelo_{cantidad}.csv")
+            segundos, _ = medir(f"JSON paralela, {cantidad} proc.", argumentos.filas,
+                                lambda: json_a_todos_paralelo(rutas_json.values(), salida, cantidad, bloque), referencia)
+            print(f"{'':>28} aceleración x{base / segundos:.2f}")
+
+        # 2. CSV por Continente -> Todos.csv (unión completa, con manifiesto y snapshot)
+        carpeta_csv = os.path.join(carpeta, "csv")
+        os.makedirs(carpeta_csv)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for region, ruta in rutas_json.items():
+                escribir_csv_paises(iterar_array_json(leer_en_bloques(ruta)), os.path.join(carpeta_csv, f"{region}.csv"))
+        base, ruta = medir("unir_csvs_en_uno serial", argumentos.filas, lambda: unir_completo(carpeta_csv))
+        referencia = os.path.join(carpeta, "union_serial.csv")
+        os.replace(ruta, referencia)
+        for cantidad in procesos:
+            segundos, _ = medir(f"unir_csvs_en_uno, {cantidad} proc.", argumentos.filas,
+                                lambda: unir_completo(carpeta_csv, cantidad), referencia)
+            print(f"{'':>28} aceleración x{base / segundos:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_snapshot.py
+# Compara el tiempo de arranque leyendo Todos.csv con csv.DictReader contra abrir el
+# snapshot binario con mmap, sobre el archivo real y sobre uno sintético 1000 veces mayor.
+# Uso: python -m benchmarks.bench_snapshot [--factor 1000]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.generador import escribir_csv_todos
+from datosPaises import DatasetPaises
+from snapshotPaises import cargar_snapshot, guardar_snapshot_desde_csv, snapshot_vigente
+
+RUTA_TODOS = os.path.join("Continentes", "Todos.csv")
+
+def cronometrar(funcion, repeticiones=3):
+    """Devuelve el mejor tiempo (segundos) de varias ejecuciones y el último resultado."""
+    mejor, resultado = None, None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+        mejor = segundos if mejor is None else min(mejor, segundos)
+    return mejor, resultado
+
+def comparar(nombre, ruta_csv):
+    ruta_snap = guardar_snapshot_desde_csv(ruta_csv)
+    t_csv, dataset_csv = cronometrar(lambda: DatasetPaises.desde_csv(ruta_csv))
+    t_vigencia, _ = cronometrar(lambda: snapshot_vigente(ruta_csv, ruta_snap))
+    t_snap, dataset_snap = cronometrar(lambda: cargar_snapshot(ruta_snap))
+    # Primer uso real: recorrer la columna de población entera.
+    t_suma, _ = cronometrar(lambda: sum(dataset_snap.poblacion))
+    assert len(dataset_csv) == len(dataset_snap)
+    print(f"{nombre:>12} {len(dataset_csv):>10} {t_csv * 1000:>10.2f} {t_snap * 1000:>10.2f} "
+          f"{t_vigencia * 1000:>10.2f} {t_suma * 1000:>10.2f} {os.path.getsize(ruta_csv) / 2**20:>8.2f} {os.path.getsize(ruta_snap) / 2**20:>8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la carga desde CSV y desde el snapshot binario.")
+    parser.add_argument("--factor", type=int, default=1000, help="Tamaño del dataset sintético respecto del real.")
+    argumentos = parser.parse_args()
+
+    print(f"{'archivo':>12} {'filas':>10} {'csv ms':>10} {'snap ms':>10} {'vigencia':>10} {'suma ms':>10} {'csv MiB':>8} {'snap MiB':>8}")
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_real = os.path.join(carpeta, "Todos.csv")
+        shutil.copy(RUTA_TODOS, ruta_real) # Copia para no dejar el snapshot junto al archivo real.
+        comparar("real", ruta_real)
+        with open(ruta_real, encoding='utf-8') as archivo:
+            filas_reales = sum(1 for _ in archivo) - 1
+        ruta_sintetica = os.path.join(carpeta, "Sintetico.csv")
+        escribir_csv_todos(ruta_sintetica, filas_reales * argumentos.factor)
+        comparar(f"x{argumentos.factor}", ruta_sintetica)
+
+if __name__ == "__main__":
+    main()
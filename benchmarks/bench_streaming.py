@@ -0,0 +1,56 @@
+# benchmarks/bench_streaming.py
+# Compara el camino original (response.json() y después escribir el CSV) con el modo
+# streaming de jsonIncremental, midiendo tiempo y pico de memoria con tracemalloc.
+# Uso: python -m benchmarks.bench_streaming --cantidad 100000
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.generador import escribir_json_api
+from generarPaises import escribir_csv_paises, TAMANIO_BLOQUE
+from jsonIncremental import iterar_array_json
+
+def camino_completo(ruta_json, ruta_csv):
+    # Igual que response.json(): primero todo el cuerpo, después todo el objeto decodificado.
+    with open(ruta_json, 'rb') as archivo:
+        cuerpo = archivo.read()
+    paises = json.loads(cuerpo)
+    return escribir_csv_paises(paises, ruta_csv)
+
+def camino_streaming(ruta_json, ruta_csv):
+    with open(ruta_json, 'rb') as archivo:
+        bloques = iter(lambda: archivo.read(TAMANIO_BLOQUE), b'')
+        return escribir_csv_paises(iterar_array_json(bloques), ruta_csv)
+
+def medir(funcion, *args):
+    """Ejecuta la función y devuelve (resultado, segundos, pico de memoria en bytes)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, pico
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara el modo streaming con el camino original.")
+    parser.add_argument("--cantidad", type=int, nargs='+', default=[1000, 100_000], help="Cantidad de países sintéticos.")
+    argumentos = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_csv = os.path.join(carpeta, "salida.csv")
+        print(f"{'países':>10} {'modo':>10} {'segundos':>10} {'pico MiB':>10}")
+        for cantidad in argumentos.cantidad:
+            ruta_json = os.path.join(carpeta, f"paises_{cantidad}.json")
+            escribir_json_api(ruta_json, cantidad)
+            for nombre, funcion in (("completo", camino_completo), ("streaming", camino_streaming)):
+                filas, segundos, pico = medir(funcion, ruta_json, ruta_csv)
+                assert filas == cantidad
+                print(f"{cantidad:>10} {nombre:>10} {segundos:>10.3f} {pico / 2**20:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_treeview.py
+# Mide cuánto tarda en refrescarse la tabla con 250, 10.000 y 1.000.000 de filas,
+# comparando el Treeview completo (un ítem por país; re-ordenar solo mueve ítems) con la TablaVirtual.
+# Necesita una pantalla (o un servidor X virtual como Xvfb).
+# Uso: python -m benchmarks.bench_treeview [--filas 250 10000 1000000]
+
+import argparse
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from benchmarks.generador import generar_filas_todos
+from datosPaises import DatasetPaises
+from interfaz import mostrar_datos_en_treeview, COLUMNAS_VISIBLES
+from tablaVirtual import TablaVirtual
+
+def crear_tabla(raiz):
+    """Crea un Treeview con su barra, igual que la ventana principal."""
+    marco = ttk.Frame(raiz)
+    marco.pack(fill="both", expand=True)
+    tree = ttk.Treeview(marco, columns=COLUMNAS_VISIBLES, show="headings", height=25)
+    barra = ttk.Scrollbar(marco, orient="vertical", command=tree.yview)
+    tree.configure(yscrollcommand=barra.set)
+    barra.pack(side="right", fill="y")
+    tree.pack(side="left", fill="both", expand=True)
+    return marco, tree, barra
+
+def cronometrar(raiz, funcion):
+    """Ejecuta la función y espera a que Tk termine de dibujar. Devuelve milisegundos."""
+    inicio = time.perf_counter()
+    funcion()
+    raiz.update_idletasks()
+    return (time.perf_counter() - inicio) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de refresco del Treeview completo y de la tabla virtual.")
+    parser.add_argument("--filas", type=int, nargs="+", default=[250, 10_000, 1_000_000])
+    parser.add_argument("--max-completo", type=int, default=100_000,
+                        help="Por encima de esta cantidad no se mide el Treeview completo (tardaría minutos).")
+    argumentos = parser.parse_args()
+
+    try:
+        raiz = tk.Tk()
+    except tk.TclError as e:
+        print(f"No se puede abrir una ventana ({e}). Ejecutar con pantalla o bajo Xvfb.")
+        sys.exit(1)
+    raiz.geometry("800x600")
+
+    print(f"{'filas':>10} {'completo ms':>12} {'c.re-orden':>11} {'virtual ms':>11} {'desplazar ms':>13} {'v.re-orden':>11}")
+    for cantidad in argumentos.filas:
+        dataset = DatasetPaises.desde_filas(generar_filas_todos(cantidad))
+        invertido = list(range(len(dataset) - 1, -1, -1))
+
+        marco, tree, _ = crear_tabla(raiz)
+        if cantidad <= argumentos.max_completo:
+            t_completo = f"{cronometrar(raiz, lambda: mostrar_datos_en_treeview(tree, dataset, COLUMNAS_VISIBLES)):12.1f}"
+            t_completo_orden = f"{cronometrar(raiz, lambda: mostrar_datos_en_treeview(tree, dataset, COLUMNAS_VISIBLES, invertido)):11.1f}"
+        else:
+            t_completo, t_completo_orden = f"{'omitido':>12}", f"{'omitido':>11}"
+        marco.destroy()
+
+        marco, tree, barra = crear_tabla(raiz)
+        tabla = TablaVirtual(tree, barra, COLUMNAS_VISIBLES)
+        raiz.update()
+        t_virtual = cronometrar(raiz, lambda: tabla.mostrar(dataset))
+        t_desplazar = cronometrar(raiz, lambda: tabla.yview("moveto", "0.5"))
+        t_reorden = cronometrar(raiz, lambda: tabla.mostrar(dataset, invertido))
+        marco.destroy()
+        print(f"{cantidad:>10} {t_completo} {t_completo_orden} {t_virtual:>11.2f} {t_desplazar:>13.2f} {t_reorden:>11.2f}")
+
+    raiz.destroy()
+
+if __name__ == "__main__":
+    main()
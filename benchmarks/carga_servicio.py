@@ -0,0 +1,117 @@
+# benchmarks/carga_servicio.py
+# Prueba de carga del servicio HTTP de servicioPaises: varios clientes concurrentes con
+# conexiones keep-alive piden una mezcla de consultas y se informa la latencia (p50, p99)
+# y los pedidos por segundo. Con --lanzar inicia el servicio en otro proceso.
+# Uso: python -m benchmarks.carga_servicio --lanzar [--clientes 32] [--pedidos 5000]
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+CONSULTAS = [
+    "/paises?limite=20",
+    "/paises?orden=poblacion:desc&limite=10",
+    "/buscar?q=ar&orden=nombre_comun_es",
+    "/buscar?q=Per%C3%BA",
+    "/filtrar?continente=Europe&min_pob=1000000&orden=area:desc",
+    "/filtrar?min_area=1000000&columnas=nombre_comun_es,area",
+    "/paises?orden=continente&orden=poblacion:desc&desde=40&limite=20",
+    "/estadisticas",
+    "/estadisticas?continente=Asia",
+]
+
+def percentil(valores_ordenados, p):
+    """Percentil p (0-100) de una lista ya ordenada, por el rango más cercano."""
+    if not valores_ordenados:
+        return 0.0
+    posicion = max(0, min(len(valores_ordenados) - 1, round(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[posicion]
+
+async def _pedir(lector, escritor, host, ruta, etag=None):
+    """Envía un GET por la conexión abierta y lee la respuesta completa. Devuelve (estado, etag)."""
+    cabeceras = f"GET {ruta} HTTP/1.1\r\nHost: {host}\r\n"
+    if etag:
+        cabeceras += f"If-None-Match: {etag}\r\n"
+    escritor.write((cabeceras + "\r\n").encode('latin-1'))
+    await escritor.drain()
+    encabezado = (await lector.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    estado = int(encabezado[0].split()[1])
+    valores = {n.strip().lower(): v.strip() for n, _, v in (l.partition(':') for l in encabezado[1:] if l)}
+    await lector.readexactly(int(valores.get('content-length', 0)))
+    return estado, valores.get('etag')
+
+async def cliente(host, puerto, pedidos, desplazamiento, latencias, estados, revalidar):
+    """Un cliente con una conexión keep-alive que hace 'pedidos' consultas rotando la lista."""
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    etags = {}
+    try:
+        for numero in range(pedidos):
+            ruta = CONSULTAS[(desplazamiento + numero) % len(CONSULTAS)]
+            inicio = time.perf_counter()
+            estado, etag = await _pedir(lector, escritor, host, ruta, etags.get(ruta) if revalidar else None)
+            latencias.append(time.perf_counter() - inicio)
+            estados[estado] = estados.get(estado, 0) + 1
+            if etag:
+                etags[ruta] = etag
+    finally:
+        escritor.close()
+
+async def esperar_servicio(host, puerto, espera=30.0):
+    """Espera a que el servicio responda /salud."""
+    limite = time.monotonic() + espera
+    while True:
+        try:
+            lector, escritor = await asyncio.open_connection(host, puerto)
+            estado, _ = await _pedir(lector, escritor, host, "/salud")
+            escritor.close()
+            if estado == 200:
+                return
+        except OSError:
+            pass
+        if time.monotonic() > limite:
+            raise TimeoutError("El servicio no respondió a tiempo.")
+        await asyncio.sleep(0.2)
+
+async def medir(host, puerto, clientes, pedidos, revalidar):
+    await esperar_servicio(host, puerto)
+    latencias, estados = [], {}
+    por_cliente = max(1, pedidos // clientes)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(host, puerto, por_cliente, k, latencias, estados, revalidar) for k in range(clientes)))
+    total = time.perf_counter() - inicio
+    latencias.sort()
+    print(f"{len(latencias)} pedidos con {clientes} clientes en {total:.2f}s")
+    print(f"  pedidos/s : {len(latencias) / total:,.0f}")
+    print(f"  p50       : {percentil(latencias, 50) * 1000:.2f} ms")
+    print(f"  p99       : {percentil(latencias, 99) * 1000:.2f} ms")
+    print(f"  máx       : {latencias[-1] * 1000:.2f} ms")
+    print(f"  estados   : {dict(sorted(estados.items()))}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio HTTP de países.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--clientes", type=int, default=32, help="Conexiones concurrentes.")
+    parser.add_argument("--pedidos", type=int, default=5000, help="Pedidos en total.")
+    parser.add_argument("--revalidar", action="store_true", help="Enviar If-None-Match con el último ETag (respuestas 304).")
+    parser.add_argument("--lanzar", action="store_true", help="Iniciar el servicio en otro proceso durante la prueba.")
+    parser.add_argument("--archivo", help="CSV para el servicio lanzado (por defecto el suyo).")
+    argumentos = parser.parse_args()
+
+    proceso = None
+    if argumentos.lanzar:
+        comando = [sys.executable, "-m", "servicioPaises", "--host", argumentos.host, "--puerto", str(argumentos.puerto)]
+        if argumentos.archivo:
+            comando += ["--archivo", argumentos.archivo]
+        proceso = subprocess.Popen(comando, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(medir(argumentos.host, argumentos.puerto, argumentos.clientes, argumentos.pedidos, argumentos.revalidar))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+if __name__ == "__main__":
+    main()
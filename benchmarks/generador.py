@@ -0,0 +1,79 @@
+# benchmarks/generador.py
+# Genera datos sintéticos con la misma forma que los de restcountries.com,
+# siempre iguales para una misma semilla, para poder medir con muchos más países.
+
+import csv
+import json
+import os
+import random
+
+REGIONES = ['Africa', 'Americas', 'Asia', 'Europe', 'Oceania', 'Antarctic']
+SILABAS = ['ar', 'be', 'ca', 'do', 'el', 'fi', 'go', 'ha', 'is', 'ju', 'ka', 'lo', 'ma', 'ni', 'ñu', 'pe', 'rú', 'sa', 'té', 'vo']
+
+def _nombre(azar):
+    """Arma un nombre inventado de 2 a 4 sílabas."""
+    return ''.join(azar.choice(SILABAS) for _ in range(azar.randint(2, 4))).capitalize()
+
+def generar_paises_api(cantidad, semilla=42):
+    """Devuelve (yield) 'cantidad' países con el formato de la API de restcountries."""
+    azar = random.Random(semilla)
+    for i in range(cantidad):
+        nombre = f"{_nombre(azar)} {i}" # El índice garantiza nombres únicos.
+        yield {
+            'translations': {'spa': {'common': nombre, 'official': f"República de {nombre}"}},
+            'capital': [_nombre(azar)],
+            'region': azar.choice(REGIONES),
+            'population': azar.randint(0, 1_500_000_000),
+            'area': round(azar.uniform(0.5, 17_000_000), 1),
+        }
+
+def escribir_json_api(ruta, cantidad, semilla=42):
+    """Escribe en 'ruta' un array JSON de países sintéticos, sin armarlo entero en memoria."""
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write('[')
+        for i, pais in enumerate(generar_paises_api(cantidad, semilla)):
+            if i:
+                archivo.write(',')
+            json.dump(pais, archivo, ensure_ascii=False)
+        archivo.write(']')
+
+def generar_filas_todos(cantidad, semilla=42):
+    """Devuelve (yield) filas de texto con la forma de Todos.csv (incluye la columna 'continente')."""
+    from generarPaises import fila_desde_pais
+    for pais in generar_paises_api(cantidad, semilla):
+        fila = fila_desde_pais(pais)
+        fila['continente'] = fila['region']
+        yield {clave: str(valor) for clave, valor in fila.items()}
+
+def escribir_csv_todos(ruta, cantidad, semilla=42):
+    """Escribe en 'ruta' un CSV con la forma de Todos.csv (incluye la columna 'continente')."""
+    from generarPaises import CAMPOS_CSV
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=CAMPOS_CSV + ['continente'])
+        escritor.writeheader()
+        escritor.writerows(generar_filas_todos(cantidad, semilla))
+
+def escribir_json_por_region(carpeta, cantidad, semilla=42):
+    """
+    Reparte 'cantidad' países sintéticos en un array JSON por región (como las respuestas de
+    /region/<nombre>) escribiéndolos a medida que se generan. Devuelve {región: ruta}.
+    """
+    rutas = {region: os.path.join(carpeta, f"{region}.json") for region in REGIONES}
+    archivos = {region: open(ruta, 'w', encoding='utf-8') for region, ruta in rutas.items()}
+    try:
+        vacios = set(REGIONES) # Regiones que todavía no tienen ningún país escrito.
+        for archivo in archivos.values():
+            archivo.write('[')
+        for pais in generar_paises_api(cantidad, semilla):
+            archivo = archivos[pais['region']]
+            if pais['region'] in vacios:
+                vacios.discard(pais['region'])
+            else:
+                archivo.write(',')
+            json.dump(pais, archivo, ensure_ascii=False)
+        for archivo in archivos.values():
+            archivo.write(']')
+    finally:
+        for archivo in archivos.values():
+            archivo.close()
+    return rutas
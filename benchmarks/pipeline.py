@@ -0,0 +1,307 @@
+# benchmarks/pipeline.py
+# Mide cada etapa del camino completo, de la respuesta de la API a la tabla, sin pantalla:
+# convertir el JSON de cada región a CSV (obtener_y_guardar_paises, con la red simulada por
+# una caché offline), unir los continentes, cargar el dataset con sus índices, buscar,
+# filtrar, ordenar y calcular estadísticas. De cada etapa se guarda el tiempo y el pico de
+# memoria (tracemalloc) y se compara con una línea base en JSON: si alguna etapa empeora
+# más de lo tolerado el programa lo informa y termina con código 1.
+# No importa tkinter: corre sin pantalla.
+#
+# La línea base (benchmarks/linea_base.json) está en el repositorio y guarda con qué Python,
+# semilla y tipo de máquina (arquitectura, procesador y núcleos) se midió. Si no hay una
+# comparable para los tamaños pedidos el programa termina con código 2: en otra máquina hay
+# que generarla con --guardar-linea-base o medir sin comparar con --sin-comparar.
+# Uso:
+#   python -m benchmarks.pipeline                        (1k y 100k contra benchmarks/linea_base.json)
+#   python -m benchmarks.pipeline --tamanios 10m         (10 millones: varios GB de disco y memoria)
+#   python -m benchmarks.pipeline --guardar-linea-base   (reemplaza la línea base de esos tamaños)
+#   python -m benchmarks.pipeline --sin-comparar         (solo mostrar los tiempos)
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.generador import escribir_json_por_region
+from busquedaPaises import BusquedaIncremental
+from cacheApi import CacheApi
+from datosPaises import DatasetPaises, rangos_de_orden
+from generarPaises import URL_BASE_API, obtener_y_guardar_paises, unir_csvs_en_uno
+from snapshotPaises import preparar_dataset
+
+RUTA_LINEA_BASE = os.path.join(os.path.dirname(__file__), "linea_base.json")
+TAMANIOS_POR_DEFECTO = ['1k', '100k']
+TOLERANCIA = 0.5 # Empeorar más de un 50% respecto de la línea base es una regresión.
+MINIMO_MS = 5.0 # Diferencias de tiempo menores a esto se consideran ruido.
+MINIMO_MIB = 1.0 # Ídem para el pico de memoria.
+COLUMNAS_VISIBLES = ["nombre_comun_es", "poblacion", "area", "continente"] # Las de la tabla principal.
+
+# Lo que "escribe" el usuario: cada texto se busca letra por letra, como en la búsqueda en vivo.
+BUSQUEDAS = ["argen", "maní", "peru", "ñuka", "zz"]
+FILTROS = [
+    {'continente': "Europe"},
+    {'min_pob': 1_000_000_000},
+    {'min_area': 10_000_000, 'max_area': 12_000_000},
+    {'continente': "Asia", 'min_pob': 500_000_000, 'max_area': 5_000_000},
+]
+ORDENES_MULTIPLES = [
+    [("continente", False), ("poblacion", True)],
+    [("continente", True), ("area", False), ("nombre_comun_es", False)],
+]
+
+def leer_tamanio(texto):
+    """Convierte '1k', '100k', '10m' o un número en una cantidad de filas."""
+    multiplicadores = {'k': 1_000, 'm': 1_000_000}
+    texto = texto.strip().lower()
+    try:
+        if texto[-1:] in multiplicadores:
+            return int(float(texto[:-1]) * multiplicadores[texto[-1]])
+        return int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Tamaño inválido: {texto} (usar por ejemplo 1k, 100k o 10m)")
+
+# Medición
+
+class Medidor:
+    """Cronometra etapas y, si tracemalloc está activo, registra el pico de memoria de cada una."""
+
+    def __init__(self):
+        self.resultados = {}
+
+    @contextlib.contextmanager
+    def etapa(self, nombre):
+        memoria = tracemalloc.is_tracing()
+        if memoria:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        inicio = time.perf_counter()
+        yield
+        segundos = time.perf_counter() - inicio
+        resultado = {'segundos': round(segundos, 6)}
+        if memoria: # Pico por encima de lo que ya estaba reservado al empezar la etapa.
+            resultado['pico_mib'] = round((tracemalloc.get_traced_memory()[1] - base) / 2**20, 3)
+        self.resultados[nombre] = resultado
+
+    def repetir(self, nombre, funcion, repeticiones):
+        """Ejecuta una etapa sin efectos secundarios varias veces y se queda con la mejor."""
+        mejor = None
+        for _ in range(repeticiones):
+            with self.etapa(nombre):
+                funcion()
+            actual = self.resultados[nombre]
+            if mejor is not None:
+                actual['segundos'] = min(actual['segundos'], mejor['segundos'])
+                if 'pico_mib' in actual:
+                    actual['pico_mib'] = max(actual['pico_mib'], mejor['pico_mib'])
+            mejor = actual
+        return mejor
+
+# Etapas
+
+def preparar_cache(carpeta, cantidad, semilla):
+    """
+    Genera el JSON de cada región y lo guarda en una caché offline, como si se hubiera
+    descargado. Devuelve (caché, regiones).
+    """
+    carpeta_json = os.path.join(carpeta, "api")
+    os.makedirs(carpeta_json)
+    cache = CacheApi(os.path.join(carpeta, "cache"), offline=True)
+    rutas = escribir_json_por_region(carpeta_json, cantidad, semilla)
+    for region, ruta in rutas.items():
+        with open(ruta, 'rb') as archivo:
+            bloques = iter(lambda: archivo.read(1 << 20), b'')
+            for _ in cache.guardar_flujo(f"{URL_BASE_API}/region/{region}", bloques, {}):
+                pass
+        os.remove(ruta) # Ya está en la caché; no hace falta ocupar el disco dos veces.
+    return cache, sorted(rutas)
+
+def obtener_regiones(cache, regiones, carpeta_continentes):
+    """Convierte la respuesta de cada región a su CSV (leyendo la caché en streaming)."""
+    for region in regiones:
+        if not obtener_y_guardar_paises(f"{URL_BASE_API}/region/{region}", f"{region}.csv", carpeta_continentes,
+                                        cache=cache, streaming=True):
+            raise RuntimeError(f"No se pudo convertir la región {region}.")
+
+def buscar_escribiendo(dataset, rangos):
+    """Búsqueda en vivo: cada texto se tipea letra por letra con la búsqueda incremental."""
+    busqueda = BusquedaIncremental(dataset)
+    encontrados = []
+    for texto in BUSQUEDAS:
+        busqueda.reiniciar()
+        for largo in range(1, len(texto) + 1):
+            encontrados.append(busqueda.buscar(texto[:largo], rangos=rangos))
+    return encontrados
+
+def filtrar(dataset, rangos):
+    return [dataset.filtrar(rangos=rangos, **criterios) for criterios in FILTROS]
+
+def ordenar_por_controles(dataset):
+    """
+    Los botones de orden: una clave, ascendente y descendente, con los rangos para las
+    búsquedas. Se descartan antes los órdenes ya calculados (los de la carga y los de la
+    repetición anterior): si no, la etapa solo mediría aciertos de la caché.
+    """
+    dataset.descartar_ordenes()
+    for columna in COLUMNAS_VISIBLES:
+        for descendente in (False, True):
+            dataset.orden(columna, descendente)
+            dataset.rangos(columna, descendente)
+
+def ordenar_por_varias_claves(dataset):
+    dataset.descartar_ordenes() # Los rangos densos de cada columna también se cachean.
+    for criterios in ORDENES_MULTIPLES:
+        rangos_de_orden(dataset.ordenar_multiple(criterios))
+
+def calcular_estadisticas(dataset, vistas):
+    """Estadísticas de cada vista (búsquedas y filtros) y las globales, como al cambiar la vista."""
+    motor = dataset.motor_estadisticas()
+    for numero, indices in enumerate(vistas):
+        motor.actualizar(indices, ('vista', numero))
+        motor.resumen()
+    motor.actualizar(None, None)
+    motor.resumen()
+
+def medir_tamanio(cantidad, semilla, repeticiones):
+    """Corre todas las etapas con 'cantidad' países y devuelve {etapa: resultado}."""
+    medidor = Medidor()
+    with tempfile.TemporaryDirectory() as carpeta:
+        # 1. Datos de Entrada (fuera de la medición)
+        cache, regiones = preparar_cache(carpeta, cantidad, semilla)
+        carpeta_continentes = os.path.join(carpeta, "Continentes")
+        ruta_todos = os.path.join(carpeta_continentes, "Todos.csv")
+
+        # 2. Ingesta: JSON -> CSV por Continente -> Todos.csv (los mensajes se descartan)
+        with contextlib.redirect_stdout(io.StringIO()):
+            with medidor.etapa("obtener_y_guardar_paises"):
+                obtener_regiones(cache, regiones, carpeta_continentes)
+            with medidor.etapa("unir_csvs_en_uno"):
+                unir_csvs_en_uno(carpeta_continentes, ruta_todos)
+
+        # 3. Carga: desde el CSV (primera vez) y desde el snapshot con los índices (arranque habitual)
+        with medidor.etapa("cargar_csv"):
+            DatasetPaises.desde_csv(ruta_todos)
+        with medidor.etapa("cargar_con_indices"): # Lo que hace la interfaz al arrancar.
+            dataset = preparar_dataset(ruta_todos, columnas_orden=COLUMNAS_VISIBLES)
+
+        # 4. Consultas de la Interfaz (sin efectos secundarios: se repiten y se toma la mejor)
+        rangos = dataset.rangos("poblacion", True) # Como si el usuario hubiera ordenado por población.
+        vistas = {} # Resultados de la última repetición de cada consulta.
+        medidor.repetir("buscar_pais", lambda: vistas.update(busqueda=buscar_escribiendo(dataset, rangos)), repeticiones)
+        medidor.repetir("aplicar_filtro", lambda: vistas.update(filtro=filtrar(dataset, rangos)), repeticiones)
+        medidor.repetir("ordenar_desde_controles", lambda: ordenar_por_controles(dataset), repeticiones)
+        medidor.repetir("ordenar_por_encabezado", lambda: ordenar_por_varias_claves(dataset), repeticiones)
+        # Las estadísticas se cachean por vista: solo la primera pasada calcula, así que no se repite.
+        medidor.repetir("estadisticas", lambda: calcular_estadisticas(dataset, vistas['busqueda'] + vistas['filtro']), 1)
+        del dataset
+    return medidor.resultados
+
+# Línea Base
+
+def describir_maquina():
+    """Arquitectura, procesador y núcleos: los tiempos de otro tipo de máquina no sirven como referencia."""
+    return f"{platform.machine()} {platform.processor() or '?'}, {os.cpu_count()} núcleos"
+
+def leer_linea_base(ruta):
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+def guardar_linea_base(ruta, linea_base):
+    ruta_temporal = ruta + ".tmp"
+    with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(linea_base, archivo, indent=2, ensure_ascii=False)
+        archivo.write('\n')
+    os.replace(ruta_temporal, ruta)
+
+def comparar(actual, base, tolerancia, minimo_ms=MINIMO_MS, minimo_mib=MINIMO_MIB):
+    """Devuelve las regresiones de 'actual' respecto de 'base' como textos."""
+    regresiones = []
+    for etapa, resultado in actual.items():
+        anterior = base.get(etapa)
+        if anterior is None:
+            continue
+        segundos, segundos_base = resultado['segundos'], anterior['segundos']
+        if segundos > segundos_base * (1 + tolerancia) and (segundos - segundos_base) * 1000 > minimo_ms:
+            regresiones.append(f"{etapa}: {segundos_base * 1000:.1f} ms -> {segundos * 1000:.1f} ms "
+                               f"(+{(segundos / max(segundos_base, 1e-9) - 1) * 100:.0f}%)")
+        pico, pico_base = resultado.get('pico_mib'), anterior.get('pico_mib')
+        if pico is not None and pico_base is not None and pico > pico_base * (1 + tolerancia) and pico - pico_base > minimo_mib:
+            regresiones.append(f"{etapa}: pico de memoria {pico_base:.1f} MiB -> {pico:.1f} MiB")
+    return regresiones
+
+def mostrar(etiqueta, cantidad, actual, base):
+    print(f"\n{etiqueta} ({cantidad:,} países)")
+    print(f"{'etapa':>26} {'ms':>11} {'base ms':>11} {'pico MiB':>9} {'base MiB':>9}")
+    for etapa, resultado in actual.items():
+        anterior = (base or {}).get(etapa, {})
+        base_ms = f"{anterior['segundos'] * 1000:.1f}" if 'segundos' in anterior else "-"
+        pico = f"{resultado['pico_mib']:.1f}" if 'pico_mib' in resultado else "-"
+        base_pico = f"{anterior['pico_mib']:.1f}" if 'pico_mib' in anterior else "-"
+        print(f"{etapa:>26} {resultado['segundos'] * 1000:>11.1f} {base_ms:>11} {pico:>9} {base_pico:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide cada etapa del visor con datos sintéticos y la compara con una línea base.")
+    parser.add_argument("--tamanios", nargs='+', default=TAMANIOS_POR_DEFECTO, metavar="TAMAÑO",
+                        help="Cantidades de países: 1k, 100k, 10m o un número (por defecto 1k 100k).")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones de las consultas (se toma la mejor).")
+    parser.add_argument("--linea-base", default=RUTA_LINEA_BASE, help="Archivo JSON con la línea base.")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--guardar-linea-base", action="store_true", help="Guardar estos resultados como nueva línea base.")
+    modo.add_argument("--sin-comparar", action="store_true", help="Medir sin exigir una línea base comparable.")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Empeoramiento tolerado (0.5 = 50%%).")
+    parser.add_argument("--sin-memoria", action="store_true", help="No usar tracemalloc (tiempos sin su costo).")
+    argumentos = parser.parse_args()
+    for texto in argumentos.tamanios:
+        leer_tamanio(texto) # Valida antes de empezar a generar datos.
+
+    linea_base = leer_linea_base(argumentos.linea_base) or {'resultados': {}}
+    entorno = {'python': platform.python_version(), 'tracemalloc': not argumentos.sin_memoria, 'semilla': argumentos.semilla,
+               'maquina': describir_maquina()}
+    comparable = {clave: linea_base.get(clave) for clave in entorno} == entorno
+    if not (argumentos.guardar_linea_base or argumentos.sin_comparar): # Sin referencia el control no puede fallar.
+        faltantes = [t for t in argumentos.tamanios if t.lower() not in linea_base['resultados']]
+        if faltantes:
+            detalle = f"no tiene {', '.join(faltantes)}" if linea_base['resultados'] else "no existe o está vacía"
+            parser.exit(2, f"Error: la línea base '{argumentos.linea_base}' {detalle}; "
+                           "generala con --guardar-linea-base o usá --sin-comparar.\n")
+        if not comparable:
+            parser.exit(2, f"Error: la línea base se midió con {({c: linea_base.get(c) for c in entorno})} y ahora "
+                           f"{entorno}; generala en esta máquina con --guardar-linea-base o usá --sin-comparar.\n")
+
+    regresiones = []
+    if not argumentos.sin_memoria:
+        tracemalloc.start()
+    try:
+        for etiqueta in argumentos.tamanios:
+            cantidad = leer_tamanio(etiqueta)
+            etiqueta = etiqueta.lower()
+            actual = medir_tamanio(cantidad, argumentos.semilla, argumentos.repeticiones)
+            base = linea_base['resultados'].get(etiqueta) if comparable and not argumentos.sin_comparar else None
+            mostrar(etiqueta, cantidad, actual, base)
+            if base:
+                regresiones += [f"[{etiqueta}] {texto}" for texto in comparar(actual, base, argumentos.tolerancia)]
+            if argumentos.guardar_linea_base:
+                linea_base['resultados'][etiqueta] = actual
+    finally:
+        tracemalloc.stop()
+
+    if argumentos.guardar_linea_base:
+        linea_base.update(entorno)
+        guardar_linea_base(argumentos.linea_base, linea_base)
+        print(f"\nLínea base guardada en '{argumentos.linea_base}'.")
+    elif regresiones:
+        print(f"\nREGRESIÓN: {len(regresiones)} etapa(s) empeoraron más de un {argumentos.tolerancia:.0%}:", file=sys.stderr)
+        for texto in regresiones:
+            print(f"  - {texto}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
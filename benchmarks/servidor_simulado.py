@@ -0,0 +1,253 @@
+# benchmarks/servidor_simulado.py
+# Servidor HTTP local (http.server) que imita a restcountries.com con datos sintéticos:
+# /region/<nombre> y /all devuelven arrays JSON armados con benchmarks.generador. Se le
+# pueden programar fallas por ruta (códigos de error, respuestas cortadas a la mitad) para
+# probar sin red la descarga concurrente, los reintentos, el manejo de errores y la caché.
+# Sin opciones corre una serie de verificaciones contra descargar_continentes_concurrente
+# y termina con código 1 si alguna falla. Con --servir queda atendiendo para usarlo con
+# 'python main.py --url-base http://127.0.0.1:<puerto>'.
+# Uso: python -m benchmarks.servidor_simulado [--paises 3000] [--servir [--puerto 8000]]
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from benchmarks.generador import REGIONES, generar_paises_api
+
+CORTAR = "cortar" # Falla que envía la mitad del cuerpo y cierra la conexión.
+
+def armar_respuestas(cantidad, semilla=42):
+    """Devuelve {ruta: cuerpo JSON en bytes} para /region/<nombre> de cada región y para /all."""
+    por_region = {region: [] for region in REGIONES}
+    for pais in generar_paises_api(cantidad, semilla):
+        por_region[pais['region']].append(pais)
+    respuestas = {f"/region/{region}": json.dumps(paises, ensure_ascii=False).encode('utf-8')
+                  for region, paises in por_region.items()}
+    respuestas["/all"] = json.dumps([p for paises in por_region.values() for p in paises], ensure_ascii=False).encode('utf-8')
+    return respuestas
+
+class ServidorSimulado:
+    """
+    Sirve 'respuestas' {ruta: bytes} en 127.0.0.1 desde un hilo de fondo. 'fallas' es
+    {ruta: [falla, ...]}: cada pedido a esa ruta consume la primera falla pendiente (un
+    código HTTP o CORTAR) y, cuando no quedan, se responde normalmente. Responde 304 si
+    el If-None-Match coincide con el ETag. Se usa con 'with'; 'pedidos' cuenta los
+    pedidos por ruta y 'estados' las respuestas por (ruta, código).
+    """
+
+    def __init__(self, respuestas, fallas=None, puerto=0, demora=0.0):
+        self.respuestas = respuestas
+        self.fallas = {ruta: list(lista) for ruta, lista in (fallas or {}).items()}
+        self.demora = demora # Segundos de espera antes de cada respuesta (simula la latencia).
+        self.pedidos = Counter()
+        self.estados = Counter()
+        self._bloqueo = threading.Lock() # Los pedidos se atienden en varios hilos a la vez.
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", puerto), self._manejador())
+        self._servidor.daemon_threads = True
+
+    @property
+    def url_base(self):
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}"
+
+    def programar(self, ruta, *fallas):
+        """Agrega fallas para los próximos pedidos a 'ruta'."""
+        with self._bloqueo:
+            self.fallas.setdefault(ruta, []).extend(fallas)
+
+    def reiniciar_conteo(self):
+        with self._bloqueo:
+            self.pedidos.clear()
+            self.estados.clear()
+
+    def _siguiente_falla(self, ruta):
+        with self._bloqueo:
+            self.pedidos[ruta] += 1
+            pendientes = self.fallas.get(ruta)
+            return pendientes.pop(0) if pendientes else None
+
+    def _manejador(self):
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, como la API real.
+
+            def do_GET(self):
+                ruta = self.path.split('?', 1)[0]
+                falla = servidor._siguiente_falla(ruta)
+                if servidor.demora:
+                    time.sleep(servidor.demora)
+                cuerpo = servidor.respuestas.get(ruta)
+                if cuerpo is None:
+                    falla = falla or 404
+                if isinstance(falla, int):
+                    return self._enviar(ruta, falla, b'{"status": %d}' % falla)
+                etag = '"%s"' % hashlib.sha256(cuerpo).hexdigest()[:16]
+                if falla is None and self.headers.get('If-None-Match') == etag:
+                    return self._enviar(ruta, 304, b'', etag)
+                self._enviar(ruta, 200, cuerpo, etag, cortar=falla == CORTAR)
+
+            def _enviar(self, ruta, estado, cuerpo, etag=None, cortar=False):
+                with servidor._bloqueo:
+                    servidor.estados[ruta, estado] += 1
+                self.send_response(estado)
+                self.send_header('Content-Type', 'application/json')
+                if etag:
+                    self.send_header('ETag', etag)
+                if estado != 304:
+                    self.send_header('Content-Length', str(len(cuerpo))) # Con CORTAR anuncia el cuerpo entero.
+                self.end_headers()
+                self.wfile.write(cuerpo[:len(cuerpo) // 2] if cortar else cuerpo)
+                if cortar:
+                    self.close_connection = True
+
+            def log_message(self, formato, *argumentos): # Sin una línea por pedido en la consola.
+                pass
+
+        return Manejador
+
+    def __enter__(self):
+        threading.Thread(target=self._servidor.serve_forever, name="servidor_simulado", daemon=True).start()
+        return self
+
+    def __exit__(self, *excepcion):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+def falla_al_reemplazar(escritura_atomica):
+    """Envuelve escritura_atomica para que falle al final, con el CSV ya escrito (como un disco lleno)."""
+    @contextmanager
+    def escritura_fallida(ruta, **opciones):
+        with escritura_atomica(ruta, **opciones) as archivo:
+            yield archivo
+            raise OSError("No queda espacio en el disco.")
+    return escritura_fallida
+
+def contar_filas(ruta):
+    with open(ruta, newline='', encoding='utf-8') as archivo:
+        return sum(1 for _ in csv.DictReader(archivo))
+
+def verificar(cantidad):
+    """Corre los casos contra el servidor simulado. Devuelve la lista de (caso, ok, detalle)."""
+    from cacheApi import CacheApi
+    from generarPaises import descargar_continentes_concurrente, escritura_atomica
+
+    respuestas = armar_respuestas(cantidad)
+    esperadas = {region: len(json.loads(respuestas[f"/region/{region}"])) for region in REGIONES}
+    resultados = []
+
+    def registrar(caso, ok, detalle=""):
+        resultados.append((caso, bool(ok), detalle))
+
+    def descargar(servidor, carpeta, **opciones):
+        with open(os.devnull, 'w') as nulo: # Los mensajes de cada descarga no interesan acá.
+            salida, sys.stdout = sys.stdout, nulo
+            try:
+                return descargar_continentes_concurrente(REGIONES, carpeta, url_base=servidor.url_base, **opciones)
+            finally:
+                sys.stdout = salida
+
+    with tempfile.TemporaryDirectory() as carpeta, ServidorSimulado(respuestas) as servidor:
+        # 1. Descarga Concurrente sin Fallas
+        tiempos = descargar(servidor, carpeta)
+        filas = {region: contar_filas(os.path.join(carpeta, f"{region}.csv")) for region in REGIONES}
+        registrar("concurrente: todos los continentes OK", all(exito for exito, _ in tiempos.values()))
+        registrar("concurrente: filas iguales a las servidas", filas == esperadas, f"{sum(filas.values())} filas")
+        registrar("concurrente: un pedido por continente", all(servidor.pedidos[f"/region/{r}"] == 1 for r in REGIONES))
+
+        # 2. Errores Transitorios: se reintenta y termina bien
+        servidor.reiniciar_conteo()
+        servidor.programar("/region/Asia", 503, 503)
+        servidor.programar("/region/Europe", 429)
+        tiempos = descargar(servidor, carpeta, reintentos=3)
+        registrar("reintentos: Asia tras dos 503", tiempos["Asia"][0] and servidor.pedidos["/region/Asia"] == 3,
+                  f"{servidor.pedidos['/region/Asia']} pedidos")
+        registrar("reintentos: Europe tras un 429", tiempos["Europe"][0] and servidor.pedidos["/region/Europe"] == 2,
+                  f"{servidor.pedidos['/region/Europe']} pedidos")
+
+        # 3. Errores Definitivos: se informan sin tocar el CSV anterior ni a los demás continentes
+        ruta_oceania = os.path.join(carpeta, "Oceania.csv")
+        ruta_africa = os.path.join(carpeta, "Africa.csv")
+        previos = {ruta: open(ruta, 'rb').read() for ruta in (ruta_oceania, ruta_africa)}
+        servidor.reiniciar_conteo()
+        servidor.programar("/region/Oceania", 404)
+        servidor.programar("/region/Africa", *[500] * 3) # Más fallas que reintentos.
+        tiempos = descargar(servidor, carpeta, reintentos=2)
+        registrar("errores: 404 informado sin reintentar",
+                  not tiempos["Oceania"][0] and servidor.pedidos["/region/Oceania"] == 1)
+        registrar("errores: 500 persistente agota los reintentos",
+                  not tiempos["Africa"][0] and servidor.pedidos["/region/Africa"] == 3,
+                  f"{servidor.pedidos['/region/Africa']} pedidos")
+        registrar("errores: los demás continentes siguen OK",
+                  all(tiempos[r][0] for r in REGIONES if r not in ("Oceania", "Africa")))
+        registrar("errores: se conservan los CSV anteriores",
+                  all(open(ruta, 'rb').read() == contenido for ruta, contenido in previos.items()))
+
+        # 4. Respuesta Cortada: el CSV anterior queda intacto (con y sin streaming)
+        for streaming in (False, True):
+            previo = open(ruta_oceania, 'rb').read()
+            servidor.programar("/region/Oceania", CORTAR)
+            tiempos = descargar(servidor, carpeta, streaming=streaming)
+            registrar(f"cortada{' (streaming)' if streaming else ''}: error y CSV intacto",
+                      not tiempos["Oceania"][0] and open(ruta_oceania, 'rb').read() == previo
+                      and not os.path.exists(ruta_oceania + ".tmp"))
+
+        # 5. Caché: la segunda pasada revalida con If-None-Match y recibe 304
+        cache = CacheApi(os.path.join(carpeta, "cache"), ttl=0)
+        descargar(servidor, carpeta, cache=cache)
+        servidor.reiniciar_conteo()
+        tiempos = descargar(servidor, carpeta, cache=cache, streaming=True)
+        no_modificados = sum(servidor.estados[f"/region/{r}", 304] for r in REGIONES)
+        registrar("caché: todos los continentes responden 304",
+                  all(exito for exito, _ in tiempos.values()) and no_modificados == len(REGIONES),
+                  f"{no_modificados} respuestas 304")
+
+        # 6. Falla al Escribir el CSV: la caché no se da por al día y la próxima corrida lo rehace
+        ruta_asia = os.path.join(carpeta, "Asia.csv")
+        for streaming in (False, True):
+            paises_asia = json.loads(servidor.respuestas["/region/Asia"])[1:] # Datos nuevos: cambia el ETag.
+            servidor.respuestas["/region/Asia"] = json.dumps(paises_asia, ensure_ascii=False).encode('utf-8')
+            with patch("generarPaises.escritura_atomica", falla_al_reemplazar(escritura_atomica)):
+                fallida = descargar(servidor, carpeta, cache=cache, streaming=streaming)
+            servidor.reiniciar_conteo()
+            tiempos = descargar(servidor, carpeta, cache=cache, streaming=streaming)
+            registrar(f"escritura fallida{' (streaming)' if streaming else ''}: se vuelve a descargar",
+                      not fallida["Asia"][0] and tiempos["Asia"][0] and servidor.estados["/region/Asia", 200] == 1
+                      and contar_filas(ruta_asia) == len(paises_asia))
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita a restcountries.com.")
+    parser.add_argument("--paises", type=int, default=3000, help="Cantidad de países sintéticos.")
+    parser.add_argument("--servir", action="store_true", help="Quedarse atendiendo en lugar de correr las verificaciones.")
+    parser.add_argument("--puerto", type=int, default=0, help="Puerto para --servir (0: uno libre).")
+    argumentos = parser.parse_args()
+
+    if argumentos.servir:
+        with ServidorSimulado(armar_respuestas(argumentos.paises), puerto=argumentos.puerto) as servidor:
+            print(f"Sirviendo {argumentos.paises} países en {servidor.url_base} (Ctrl+C para terminar).")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+        return
+
+    resultados = verificar(argumentos.paises)
+    for caso, ok, detalle in resultados:
+        print(f"  {'OK   ' if ok else 'FALLA'} {caso}" + (f" ({detalle})" if detalle else ""))
+    fallidos = sum(1 for _, ok, _ in resultados if not ok)
+    print(f"\n{len(resultados) - fallidos}/{len(resultados)} casos correctos.")
+    sys.exit(1 if fallidos else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# busquedaPaises.py
+# Este módulo arma un índice de prefijos para buscar países por nombre o capital.
+# Cada texto se normaliza una sola vez (minúsculas y sin tildes) y se guarda en una lista
+# ordenada; una búsqueda son dos bisect más recorrer los k resultados: O(log n + k).
+
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+COLUMNAS_BUSQUEDA = ['nombre_comun_es', 'nombre_oficial_es', 'capital']
+FIN_PREFIJO = chr(0x10FFFF) # Mayor que cualquier carácter: marca el final del rango de un prefijo.
+
+class _TablaSinTildes(dict):
+    """Tabla para str.translate que calcula (y recuerda) cada carácter sin tilde la primera vez."""
+
+    def __missing__(self, codigo):
+        descompuesto = unicodedata.normalize('NFKD', chr(codigo))
+        self[codigo] = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+        return self[codigo]
+
+_SIN_TILDES = _TablaSinTildes()
+
+def normalizar(texto):
+    """Pasa el texto a minúsculas y le quita las tildes ("Perú" -> "peru", "España" -> "espana")."""
+    if texto.isascii(): # Caso más común: no hay tildes que quitar.
+        return texto.lower()
+    return texto.casefold().translate(_SIN_TILDES)
+
+class IndicePrefijos:
+    """
+    Índice de prefijos sobre columnas de texto. Por cada columna guarda las claves
+    normalizadas ordenadas y, en paralelo, el índice de fila de cada clave.
+    Las capitales múltiples ("La Paz, Sucre") se indexan por separado.
+    """
+
+    def __init__(self, textos, columnas=COLUMNAS_BUSQUEDA):
+        self.claves = {} # columna -> lista ordenada de claves normalizadas.
+        self.filas = {} # columna -> array con la fila de cada clave.
+        self.claves_por_fila = {} # columna -> clave normalizada de cada fila (para refinar resultados).
+        for columna in columnas:
+            claves = list(map(normalizar, textos[columna]))
+            self.claves_por_fila[columna] = claves[:]
+            filas = list(range(len(claves)))
+            if columna == 'capital':
+                for fila in range(len(claves)):
+                    if ', ' in claves[fila]: # Cada capital adicional se agrega como otra clave de la misma fila.
+                        primera, *otras = claves[fila].split(', ')
+                        claves[fila] = primera
+                        claves.extend(otras)
+                        filas.extend([fila] * len(otras))
+            orden = sorted(range(len(claves)), key=claves.__getitem__)
+            self.claves[columna] = [claves[i] for i in orden]
+            self.filas[columna] = array('I', [filas[i] for i in orden])
+
+    def buscar(self, texto, columnas=None):
+        """Devuelve el conjunto de filas con algún texto (de las columnas pedidas) que empieza con 'texto'."""
+        prefijo = normalizar(texto)
+        resultado = set()
+        for columna in columnas or self.claves:
+            claves = self.claves[columna]
+            desde = bisect_left(claves, prefijo)
+            hasta = bisect_left(claves, prefijo + FIN_PREFIJO, desde)
+            resultado.update(self.filas[columna][desde:hasta])
+        return resultado
+
+    def coincide(self, fila, prefijo_normalizado, columnas=None):
+        """True si la fila tiene algún texto (de las columnas pedidas) que empieza con el prefijo ya normalizado."""
+        for columna in columnas or self.claves:
+            clave = self.claves_por_fila[columna][fila]
+            if clave.startswith(prefijo_normalizado):
+                return True
+            if columna == 'capital' and ', ' in clave and any(p.startswith(prefijo_normalizado) for p in clave.split(', ')):
+                return True
+        return False
+
+class BusquedaIncremental:
+    """
+    Recuerda la última búsqueda. Si la nueva consulta extiende la anterior ("ar" -> "arg"),
+    solo revisa los resultados anteriores en lugar de volver a consultar el índice, y
+    conserva su orden. Hay que llamar a reiniciar() si cambian los datos o el orden.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.ultimo_prefijo = ''
+        self.ultimos_resultados = None
+
+    def buscar(self, texto, rangos=None):
+        """Devuelve los índices que coinciden con 'texto', en el orden dado por 'rangos'."""
+        prefijo = normalizar(texto.strip())
+        if self.ultimos_resultados is not None and self.ultimo_prefijo and prefijo.startswith(self.ultimo_prefijo):
+            resultados = self.dataset.buscar_prefijo(prefijo, dentro_de=self.ultimos_resultados)
+        else:
+            resultados = self.dataset.buscar_prefijo(prefijo, rangos=rangos)
+        self.ultimo_prefijo, self.ultimos_resultados = prefijo, resultados
+        return resultados
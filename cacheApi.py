@@ -0,0 +1,136 @@
+# cacheApi.py
+# Este módulo guarda en disco las respuestas JSON de la API junto con sus validadores
+# (ETag / Last-Modified) para no volver a descargar ni procesar datos que no cambiaron.
+
+import json
+import os
+import re
+import time
+
+CARPETA_CACHE = ".cache_api" # Carpeta por defecto donde se guardan las respuestas.
+TTL_POR_DEFECTO = 3600 # Segundos durante los cuales una respuesta se considera fresca.
+
+class CacheApi:
+    """
+    Caché de respuestas de la API en disco. Por cada URL guarda el cuerpo JSON crudo
+    y un archivo de metadatos con el ETag, el Last-Modified y la fecha de descarga.
+    """
+
+    def __init__(self, carpeta=CARPETA_CACHE, ttl=TTL_POR_DEFECTO, offline=False):
+        self.carpeta = carpeta
+        self.ttl = ttl # Con ttl=0 siempre se consulta al servidor (con petición condicional).
+        self.offline = offline # En modo offline nunca se usa la red, solo la caché.
+        os.makedirs(self.carpeta, exist_ok=True)
+
+    def _rutas(self, url):
+        """Devuelve las rutas del cuerpo y de los metadatos para una URL."""
+        clave = re.sub(r'[^A-Za-z0-9]+', '_', url.split('://')[-1]).strip('_') # Nombre de archivo seguro.
+        base = os.path.join(self.carpeta, clave)
+        return base + ".json", base + ".meta.json"
+
+    def leer_meta(self, url):
+        """Devuelve los metadatos guardados para la URL, o None si no hay nada en caché."""
+        ruta_cuerpo, ruta_meta = self._rutas(url)
+        if not (os.path.exists(ruta_cuerpo) and os.path.exists(ruta_meta)):
+            return None
+        try:
+            with open(ruta_meta, 'r', encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError): # Metadatos dañados: se tratan como si no hubiera caché.
+            return None
+
+    def tiene(self, url):
+        return self.leer_meta(url) is not None
+
+    def esta_fresca(self, url):
+        """True si la respuesta guardada todavía no superó el TTL."""
+        meta = self.leer_meta(url)
+        return meta is not None and (time.time() - meta.get('guardado', 0)) < self.ttl
+
+    def cabeceras_condicionales(self, url):
+        """Arma las cabeceras If-None-Match / If-Modified-Since para revalidar la caché."""
+        meta = self.leer_meta(url)
+        cabeceras = {}
+        if meta:
+            if meta.get('etag'):
+                cabeceras['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                cabeceras['If-Modified-Since'] = meta['last_modified']
+        return cabeceras
+
+    def leer_json(self, url):
+        """Decodifica el cuerpo JSON guardado para la URL."""
+        ruta_cuerpo, _ = self._rutas(url)
+        with open(ruta_cuerpo, 'r', encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+    def leer_flujo(self, url, tamanio_bloque=65536):
+        """Devuelve (yield) el cuerpo guardado en bloques de bytes, sin cargarlo entero."""
+        ruta_cuerpo, _ = self._rutas(url)
+        with open(ruta_cuerpo, 'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(tamanio_bloque), b''):
+                yield bloque
+
+    def guardar(self, url, contenido, cabeceras):
+        """Guarda el cuerpo crudo (bytes) y los validadores de la respuesta."""
+        ruta_cuerpo, _ = self._rutas(url)
+        _escribir_atomico(ruta_cuerpo, contenido)
+        self._guardar_meta(url, cabeceras)
+
+    def guardar_flujo(self, url, bloques, cabeceras):
+        """
+        Copia a la caché los bloques a medida que pasan y los vuelve a entregar (yield).
+        La entrada solo se confirma si el flujo se leyó completo.
+        """
+        yield from self.copiar_flujo(url, bloques)
+        self.confirmar_flujo(url, cabeceras)
+
+    def copiar_flujo(self, url, bloques):
+        """
+        Como guardar_flujo, pero deja el cuerpo pendiente: la entrada vigente no cambia
+        hasta llamar a confirmar_flujo(). Si el flujo se corta, el pendiente se borra.
+        """
+        ruta_pendiente = self._rutas(url)[0] + ".pendiente"
+        try:
+            with open(ruta_pendiente, 'wb') as archivo:
+                for bloque in bloques:
+                    archivo.write(bloque)
+                    yield bloque
+        except BaseException:
+            if os.path.exists(ruta_pendiente):
+                os.remove(ruta_pendiente)
+            raise
+
+    def confirmar_flujo(self, url, cabeceras):
+        """Reemplaza la entrada de la URL por el cuerpo que dejó copiar_flujo() y guarda sus validadores."""
+        ruta_cuerpo, _ = self._rutas(url)
+        os.replace(ruta_cuerpo + ".pendiente", ruta_cuerpo)
+        self._guardar_meta(url, cabeceras)
+
+    def _guardar_meta(self, url, cabeceras):
+        _, ruta_meta = self._rutas(url)
+        meta = {
+            'url': url,
+            'etag': cabeceras.get('ETag'),
+            'last_modified': cabeceras.get('Last-Modified'),
+            'guardado': time.time(),
+        }
+        _escribir_atomico(ruta_meta, json.dumps(meta).encode('utf-8'))
+
+    def renovar(self, url, cabeceras=None):
+        """Marca la entrada como fresca otra vez (se usa al recibir un 304 Not Modified)."""
+        meta = self.leer_meta(url)
+        if meta is None:
+            return
+        meta['guardado'] = time.time()
+        if cabeceras and cabeceras.get('ETag'): # El servidor puede mandar un ETag nuevo junto al 304.
+            meta['etag'] = cabeceras['ETag']
+        _, ruta_meta = self._rutas(url)
+        _escribir_atomico(ruta_meta, json.dumps(meta).encode('utf-8'))
+
+def _escribir_atomico(ruta, contenido):
+    """Escribe en un archivo temporal y lo renombra, así nunca queda un archivo a medias."""
+    ruta_temporal = ruta + ".tmp"
+    with open(ruta_temporal, 'wb') as archivo:
+        archivo.write(contenido)
+    os.replace(ruta_temporal, ruta)
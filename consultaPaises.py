@@ -0,0 +1,226 @@
+# consultaPaises.py
+# Este módulo responde consultas sobre Todos.csv sin interfaz gráfica: búsqueda por nombre
+# o capital, filtro por continente y rangos de población y superficie, orden por una o
+# varias columnas, paginado y estadísticas. Los resultados se escriben a medida que se
+# generan en CSV, JSON o NDJSON. No importa tkinter, así que arranca rápido y sirve en
+# contenedores o tareas programadas.
+#
+# Uso:
+#   python -m consultaPaises --buscar ar --orden poblacion:desc --limite 5 --formato json
+#   python -m consultaPaises --continente Europe --min-pob 10000000 --formato csv
+#   python -m consultaPaises --continente Asia --estadisticas
+#   python -m consultaPaises --lote < consultas.txt   (una consulta por línea, salida NDJSON)
+
+import argparse
+import csv
+import json
+import os
+import shlex
+import sys
+from itertools import islice
+
+from datosPaises import COLUMNAS, formatear_numero
+from estadisticasPaises import METRICAS, TOP_N
+from formatoPaises import leer_orden
+from snapshotPaises import cargar_dataset
+
+RUTA_POR_DEFECTO = os.path.join("Continentes", "Todos.csv")
+FORMATOS = ['csv', 'json', 'ndjson']
+
+# Consultas
+
+def consultar(dataset, texto=None, continente=None, min_pob=None, max_pob=None, min_area=None, max_area=None, orden=None):
+    """
+    Devuelve los índices de fila que cumplen la búsqueda y el filtro, en el orden pedido.
+    'orden' es una lista [(columna, descendente)] de la clave principal a la secundaria;
+    sin orden se respeta el del CSV.
+    """
+    orden = orden or []
+    hay_filtro = any(v is not None for v in (min_pob, max_pob, min_area, max_area)) or (continente and continente != "Todos")
+
+    # 1. Sin Búsqueda ni Filtro: la Permutación ya Calculada
+    if not texto and not hay_filtro:
+        if len(orden) == 1:
+            return dataset.orden(*orden[0])
+        return dataset.ordenar_multiple(orden) if orden else range(len(dataset))
+
+    # 2. Buscar y Filtrar (el filtro recorre solo lo encontrado)
+    rangos = dataset.rangos(*orden[0]) if len(orden) == 1 else None
+    if texto:
+        filas = dataset.buscar_prefijo(texto, rangos=rangos)
+        if hay_filtro:
+            filas = dataset.filtrar(continente, min_pob, max_pob, min_area, max_area, indices=filas)
+    else:
+        filas = dataset.filtrar(continente, min_pob, max_pob, min_area, max_area, rangos=rangos)
+
+    # 3. Orden por Varias Claves (solo sobre los resultados)
+    if len(orden) > 1:
+        filas = dataset.ordenar_multiple(orden, indices=filas)
+    return filas
+
+def paginar(indices, desde=0, limite=None):
+    """Devuelve (sin copiar) los índices desde la posición 'desde', a lo sumo 'limite'."""
+    return islice(indices, desde, None if limite is None else desde + limite)
+
+def estadisticas(dataset, indices=None, top=TOP_N):
+    """Estadísticas de las filas indicadas (todas si es None) con los rankings de cada métrica."""
+    motor = dataset.motor_estadisticas()
+    resumen = motor.calcular(indices)
+    if resumen is None:
+        return None
+    resumen = dict(resumen)
+    resumen['top'] = {metrica: motor.top(metrica, top) for metrica in METRICAS}
+    return resumen
+
+# Salida
+
+def filas_como_diccionarios(dataset, indices, columnas=COLUMNAS):
+    """Genera un diccionario por fila con los valores ya convertidos (números como números)."""
+    for indice in indices:
+        yield {columna: dataset.valor(indice, columna) for columna in columnas}
+
+def escribir_csv(filas, salida, columnas=COLUMNAS):
+    """Escribe las filas como CSV, con los números igual que en Todos.csv y los valores faltantes vacíos."""
+    escritor = csv.DictWriter(salida, fieldnames=columnas, lineterminator='\n')
+    escritor.writeheader()
+    for fila in filas:
+        escritor.writerow({clave: '' if valor is None else formatear_numero(valor) for clave, valor in fila.items()})
+
+def escribir_ndjson(filas, salida):
+    """Escribe un objeto JSON por línea."""
+    for fila in filas:
+        salida.write(json.dumps(fila, ensure_ascii=False))
+        salida.write('\n')
+
+def escribir_json(filas, salida):
+    """Escribe un arreglo JSON elemento por elemento, sin armar la lista en memoria."""
+    salida.write('[')
+    for numero, fila in enumerate(filas):
+        salida.write(',\n' if numero else '\n')
+        salida.write(json.dumps(fila, ensure_ascii=False))
+    salida.write('\n]\n')
+
+def escribir_estadisticas(resumen, salida, formato):
+    """Escribe las estadísticas: el resumen completo en JSON/NDJSON, o una fila por continente en CSV."""
+    if resumen is None:
+        resumen = {'total_paises': 0}
+    if formato == 'csv':
+        columnas = ['continente', 'paises', 'poblacion', 'area', 'promedio_poblacion', 'mediana_poblacion', 'mediana_area', 'densidad']
+        escribir_csv(({'continente': nombre, **datos} for nombre, datos in sorted(resumen.get('por_continente', {}).items())),
+                     salida, columnas)
+    elif formato == 'json':
+        json.dump(resumen, salida, ensure_ascii=False, indent=2)
+        salida.write('\n')
+    else:
+        escribir_ndjson([resumen], salida)
+
+# Línea de Comandos
+
+class _ParserLote(argparse.ArgumentParser):
+    """Parser del modo lote: los errores de una línea se informan en su respuesta en lugar de terminar."""
+
+    def error(self, message):
+        raise ValueError(message)
+
+    def print_help(self, file=None): # La ayuda ensuciaría la salida NDJSON.
+        pass
+
+    def exit(self, status=0, message=None):
+        raise ValueError(message or "La ayuda (--help) no está disponible en el modo lote.")
+
+def crear_parser(clase=argparse.ArgumentParser):
+    """Opciones de una consulta (las mismas en la línea de comandos y en cada línea del modo lote)."""
+    parser = clase(prog="python -m consultaPaises", description="Consultas sobre Todos.csv sin interfaz gráfica.")
+    parser.add_argument("--archivo", default=RUTA_POR_DEFECTO, help="CSV de países (por defecto Continentes/Todos.csv).")
+    parser.add_argument("--buscar", metavar="TEXTO", help="Países cuyo nombre o capital empieza con el texto.")
+    parser.add_argument("--continente", help="Solo países de este continente.")
+    parser.add_argument("--min-pob", type=int, help="Población mínima (inclusive).")
+    parser.add_argument("--max-pob", type=int, help="Población máxima (inclusive).")
+    parser.add_argument("--min-area", type=float, help="Superficie mínima en km² (inclusive).")
+    parser.add_argument("--max-area", type=float, help="Superficie máxima en km² (inclusive).")
+    parser.add_argument("--orden", action="append", type=leer_orden, metavar="COLUMNA[:desc]",
+                        help="Columna para ordenar; se puede repetir para claves secundarias.")
+    parser.add_argument("--desde", type=int, default=0, help="Cantidad de resultados a saltear.")
+    parser.add_argument("--limite", type=int, help="Cantidad máxima de resultados.")
+    parser.add_argument("--columnas", type=lambda texto: texto.split(','), default=COLUMNAS,
+                        help="Columnas a mostrar, separadas por comas.")
+    parser.add_argument("--formato", choices=FORMATOS, default='csv')
+    parser.add_argument("--estadisticas", action="store_true", help="Mostrar estadísticas de los resultados en lugar de las filas.")
+    parser.add_argument("--top", type=int, default=TOP_N, help="Cantidad de países en los rankings de las estadísticas.")
+    parser.add_argument("--lote", action="store_true", help="Leer una consulta por línea de la entrada estándar (salida NDJSON).")
+    return parser
+
+def ejecutar_consulta(dataset, argumentos):
+    """Resuelve una consulta ya leída. Devuelve (índices, resumen); resumen solo con --estadisticas."""
+    desconocidas = [c for c in argumentos.columnas if c not in COLUMNAS]
+    if desconocidas:
+        raise ValueError(f"Columnas desconocidas: {', '.join(desconocidas)}")
+    indices = consultar(dataset, argumentos.buscar, argumentos.continente, argumentos.min_pob, argumentos.max_pob,
+                        argumentos.min_area, argumentos.max_area, argumentos.orden)
+    if argumentos.estadisticas:
+        todas = len(indices) == len(dataset) # Sin restricciones se usan los agregados globales.
+        return indices, estadisticas(dataset, None if todas else indices, argumentos.top)
+    return indices, None
+
+def responder(dataset, argumentos, salida):
+    """Escribe el resultado de una consulta en el formato pedido."""
+    indices, resumen = ejecutar_consulta(dataset, argumentos)
+    if argumentos.estadisticas:
+        escribir_estadisticas(resumen, salida, argumentos.formato)
+        return
+    filas = filas_como_diccionarios(dataset, paginar(indices, argumentos.desde, argumentos.limite), argumentos.columnas)
+    if argumentos.formato == 'csv':
+        escribir_csv(filas, salida, argumentos.columnas)
+    elif argumentos.formato == 'json':
+        escribir_json(filas, salida)
+    else:
+        escribir_ndjson(filas, salida)
+
+def responder_lote(dataset, parser, entrada, salida):
+    """
+    Modo lote: cada línea de 'entrada' es una consulta con las mismas opciones (sin --archivo:
+    una línea que lo indique responde con error). Por cada una se escribe una línea JSON con
+    la consulta, el total y las filas (o las estadísticas, o el error). Las líneas vacías y
+    las que empiezan con '#' se ignoran.
+    """
+    parser.set_defaults(archivo=None) # Así se distingue un --archivo escrito en la línea.
+    for numero, linea in enumerate(entrada, start=1):
+        linea = linea.strip()
+        if not linea or linea.startswith('#'):
+            continue
+        respuesta = {'linea': numero, 'consulta': linea}
+        try:
+            argumentos = parser.parse_args(shlex.split(linea))
+            if argumentos.archivo is not None:
+                raise ValueError("--archivo no se puede usar en el modo lote: el archivo se elige al lanzar el comando.")
+            indices, resumen = ejecutar_consulta(dataset, argumentos)
+            respuesta['total'] = len(indices)
+            if argumentos.estadisticas:
+                respuesta['estadisticas'] = resumen
+            else:
+                pagina = paginar(indices, argumentos.desde, argumentos.limite)
+                respuesta['filas'] = list(filas_como_diccionarios(dataset, pagina, argumentos.columnas))
+        except ValueError as error:
+            respuesta['error'] = str(error)
+        salida.write(json.dumps(respuesta, ensure_ascii=False))
+        salida.write('\n')
+        salida.flush() # Cada respuesta sale apenas está lista.
+
+def main(argv=None):
+    parser = crear_parser()
+    argumentos = parser.parse_args(argv)
+    if not os.path.exists(argumentos.archivo):
+        parser.exit(1, f"No se encontró el archivo de datos: {argumentos.archivo}\n")
+    dataset = cargar_dataset(argumentos.archivo)
+    try:
+        if argumentos.lote:
+            responder_lote(dataset, crear_parser(_ParserLote), sys.stdin, sys.stdout)
+        else:
+            responder(dataset, argumentos, sys.stdout)
+    except ValueError as error:
+        parser.exit(2, f"Error: {error}\n")
+    except BrokenPipeError: # Por ejemplo, al cortar la salida con 'head'.
+        sys.stderr.close()
+
+if __name__ == "__main__":
+    main()
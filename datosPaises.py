@@ -0,0 +1,334 @@
+# datosPaises.py
+# Este módulo guarda los datos de los países en columnas tipadas (una lista o array por campo)
+# en lugar de un diccionario por país. Los números se convierten una sola vez al cargar,
+# y el ordenamiento, el filtrado y las estadísticas trabajan con índices de fila.
+# No depende de tkinter, así que se puede usar sin interfaz gráfica.
+
+import csv
+from array import array
+
+from busquedaPaises import IndicePrefijos, normalizar
+from filtroPaises import MotorFiltros
+from estadisticasPaises import EstadisticasPaises
+from instrumentacion import tramo
+
+COLUMNAS_TEXTO = ['nombre_comun_es', 'nombre_oficial_es', 'capital']
+COLUMNAS_CATEGORIA = ['region', 'continente']
+COLUMNAS_NUMERICAS = ['poblacion', 'area']
+COLUMNAS = ['nombre_comun_es', 'nombre_oficial_es', 'capital', 'region', 'poblacion', 'area', 'continente'] # Orden del CSV.
+
+def _a_entero(texto):
+    """Convierte el texto del CSV a entero; los valores vacíos o inválidos valen 0."""
+    try:
+        return int(texto)
+    except (ValueError, TypeError):
+        try:
+            return int(float(texto))
+        except (ValueError, TypeError):
+            return 0
+
+def _a_decimal(texto):
+    """Convierte el texto del CSV a float; los valores vacíos o inválidos valen 0.0."""
+    try:
+        return float(texto)
+    except (ValueError, TypeError):
+        return 0.0
+
+def formatear_numero(valor):
+    """Muestra los floats enteros sin '.0', igual que vienen en el CSV."""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+def rangos_de_orden(orden):
+    """Invierte una permutación: devuelve, para cada fila, su posición dentro de 'orden'."""
+    rangos = array('I', bytes(4 * len(orden)))
+    for posicion, fila in enumerate(orden):
+        rangos[fila] = posicion
+    return rangos
+
+class OrdenInvertido:
+    """Vista de una permutación recorrida de atrás hacia adelante, sin copiarla."""
+
+    def __init__(self, base):
+        self.base = base
+
+    def __len__(self):
+        return len(self.base)
+
+    def __getitem__(self, posicion):
+        if posicion < 0:
+            posicion += len(self.base)
+        return self.base[len(self.base) - 1 - posicion]
+
+    def __iter__(self):
+        return reversed(self.base)
+
+class DatasetPaises:
+    """
+    Conjunto de países guardado por columnas:
+    - textos (nombres, capital) en listas de str,
+    - población en array('q') y superficie en array('d'),
+    - región y continente como códigos en array('H') que apuntan a una lista de categorías.
+    """
+
+    def __init__(self):
+        self.textos = {columna: [] for columna in COLUMNAS_TEXTO}
+        self.poblacion = array('q')
+        self.area = array('d')
+        self.categorias = {columna: [] for columna in COLUMNAS_CATEGORIA} # Valores distintos de cada categoría.
+        self.codigos = {columna: array('H') for columna in COLUMNAS_CATEGORIA} # Código de categoría por fila.
+        self._codigo_de = {columna: {} for columna in COLUMNAS_CATEGORIA} # Valor -> código.
+        self._indice_prefijos = None # Índice de búsqueda, se arma la primera vez que se pide.
+        self._permutaciones = {} # columna -> índices en orden ascendente (array), calculados una vez.
+        self._rangos = {} # (columna, descendente) -> posición de cada fila en ese orden.
+        self._rangos_densos = {} # columna -> rango con empates iguales (para ordenar por varias claves).
+        self._motor_filtros = None # Índices de rango para filtrar, se arman la primera vez que se piden.
+        self._motor_estadisticas = None # Estadísticas por estado de la vista, ídem.
+
+    @classmethod
+    def desde_csv(cls, archivo_csv):
+        """Lee un CSV con la forma de Todos.csv y convierte cada columna una sola vez."""
+        dataset = cls()
+        with tramo("leer_csv", archivo=archivo_csv) as medicion:
+            with open(archivo_csv, mode='r', encoding='utf-8', newline='') as archivo:
+                for fila in csv.DictReader(archivo):
+                    dataset.agregar(fila)
+            medicion.contar(escaneadas=len(dataset), devueltas=len(dataset))
+        return dataset
+
+    @classmethod
+    def desde_columnas(cls, textos, poblacion, area, categorias, codigos):
+        """
+        Arma el dataset con columnas ya construidas (por ejemplo, vistas de un snapshot
+        mapeado en memoria). Las columnas pueden ser de solo lectura.
+        """
+        dataset = cls()
+        dataset.textos = dict(textos)
+        dataset.poblacion = poblacion
+        dataset.area = area
+        dataset.categorias = {columna: list(valores) for columna, valores in categorias.items()}
+        dataset.codigos = dict(codigos)
+        dataset._codigo_de = {columna: {valor: codigo for codigo, valor in enumerate(valores)}
+                              for columna, valores in dataset.categorias.items()}
+        return dataset
+
+    @classmethod
+    def desde_filas(cls, filas):
+        """Arma el dataset a partir de diccionarios (por ejemplo, los de csv.DictReader)."""
+        dataset = cls()
+        for fila in filas:
+            dataset.agregar(fila)
+        return dataset
+
+    def agregar(self, fila):
+        """Agrega un país a partir de un diccionario de textos."""
+        self._indice_prefijos = self._motor_filtros = self._motor_estadisticas = None # Los índices y los órdenes quedan desactualizados.
+        if self._permutaciones or self._rangos or self._rangos_densos:
+            self.descartar_ordenes()
+        for columna in COLUMNAS_TEXTO:
+            self.textos[columna].append(fila.get(columna, '') or '')
+        self.poblacion.append(_a_entero(fila.get('poblacion')))
+        self.area.append(_a_decimal(fila.get('area')))
+        for columna in COLUMNAS_CATEGORIA:
+            self.codigos[columna].append(self._codigo(columna, fila.get(columna, '') or ''))
+
+    def _codigo(self, columna, valor):
+        # Devuelve el código de la categoría, creándolo la primera vez que aparece.
+        codigos = self._codigo_de[columna]
+        codigo = codigos.get(valor)
+        if codigo is None:
+            codigo = codigos[valor] = len(self.categorias[columna])
+            self.categorias[columna].append(valor)
+        return codigo
+
+    def __len__(self):
+        return len(self.poblacion)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def indices(self):
+        """Todos los índices de fila, en el orden original."""
+        return list(range(len(self)))
+
+    def valor(self, indice, columna):
+        """Devuelve el valor tipado de una celda."""
+        if columna in self.textos:
+            return self.textos[columna][indice]
+        if columna == 'poblacion':
+            return self.poblacion[indice]
+        if columna == 'area':
+            return self.area[indice]
+        return self.categorias[columna][self.codigos[columna][indice]]
+
+    def valores_fila(self, indice, columnas):
+        """Devuelve los valores de una fila como textos, listos para mostrar."""
+        return [formatear_numero(self.valor(indice, columna)) for columna in columnas]
+
+    def fila(self, indice):
+        """Devuelve una fila como diccionario de textos (la misma forma que el CSV)."""
+        return dict(zip(COLUMNAS, self.valores_fila(indice, COLUMNAS)))
+
+    def continentes(self):
+        """Lista ordenada de continentes presentes en los datos."""
+        return sorted(c for c in self.categorias['continente'] if c)
+
+    # Operaciones sobre Columnas
+
+    def clave_columna(self, columna):
+        """Devuelve una función índice -> clave de orden para la columna."""
+        if columna == 'poblacion':
+            return self.poblacion.__getitem__
+        if columna == 'area':
+            return self.area.__getitem__
+        if columna in self.textos:
+            claves = [texto.lower() for texto in self.textos[columna]]
+            return claves.__getitem__
+        # Categorías: se ordena por el nombre de la categoría, comparando solo enteros.
+        nombres = self.categorias[columna]
+        rango = {codigo: posicion for posicion, codigo in enumerate(sorted(range(len(nombres)), key=lambda c: nombres[c].lower()))}
+        rangos_por_fila = [rango[codigo] for codigo in self.codigos[columna]]
+        return rangos_por_fila.__getitem__
+
+    def descartar_ordenes(self):
+        """Olvida las permutaciones y rangos calculados; se vuelven a calcular al pedirlos."""
+        self._permutaciones, self._rangos, self._rangos_densos = {}, {}, {}
+
+    def precalcular_ordenes(self, columnas):
+        """Calcula de antemano las permutaciones de las columnas (se usa al cargar)."""
+        for columna in columnas:
+            self.permutacion(columna)
+
+    def permutacion(self, columna):
+        """Índices de fila en orden ascendente por la columna; se calcula una sola vez."""
+        if columna not in self._permutaciones:
+            self._permutaciones[columna] = array('I', sorted(range(len(self)), key=self.clave_columna(columna)))
+        return self._permutaciones[columna]
+
+    def orden(self, columna, descendente=False):
+        """Orden completo por la columna. El descendente es la permutación recorrida al revés."""
+        permutacion = self.permutacion(columna)
+        return OrdenInvertido(permutacion) if descendente else permutacion
+
+    def rangos(self, columna, descendente=False):
+        """Posición de cada fila dentro de orden(columna, descendente); se calcula una sola vez."""
+        clave = (columna, descendente)
+        if clave not in self._rangos:
+            self._rangos[clave] = rangos_de_orden(self.orden(columna, descendente))
+        return self._rangos[clave]
+
+    def rangos_densos(self, columna):
+        """Rango de cada fila en orden ascendente, con el mismo rango para valores iguales."""
+        if columna not in self._rangos_densos:
+            clave = self.clave_columna(columna)
+            densos = array('I', bytes(4 * len(self)))
+            rango, anterior = -1, object()
+            for fila in self.permutacion(columna):
+                valor = clave(fila)
+                if valor != anterior:
+                    rango, anterior = rango + 1, valor
+                densos[fila] = rango
+            self._rangos_densos[columna] = densos
+        return self._rangos_densos[columna]
+
+    def ordenar(self, columna, descendente=False, indices=None):
+        """Devuelve los índices ordenados por la columna, sin modificar los datos."""
+        if indices is None:
+            return self.orden(columna, descendente)
+        with tramo("ordenar", columna=columna) as medicion:
+            resultado = sorted(indices, key=self.rangos(columna).__getitem__, reverse=descendente)
+            medicion.contar(escaneadas=len(resultado), devueltas=len(resultado))
+        return resultado
+
+    def ordenar_multiple(self, criterios, indices=None):
+        """
+        Orden estable por varias claves. 'criterios' es una lista de (columna, descendente),
+        de la más importante a la menos importante; por ejemplo
+        [('continente', False), ('poblacion', True)] ordena por continente y, dentro de
+        cada uno, de mayor a menor población.
+        """
+        if len(criterios) == 1:
+            return self.ordenar(criterios[0][0], criterios[0][1], indices)
+        rangos = [(self.rangos_densos(columna), descendente) for columna, descendente in criterios]
+        def clave(fila): # Compara enteros; el signo invierte las claves descendentes.
+            return tuple(-r[fila] if descendente else r[fila] for r, descendente in rangos)
+        with tramo("ordenar", columna=",".join(c for c, _ in criterios)) as medicion:
+            resultado = sorted(range(len(self)) if indices is None else indices, key=clave)
+            medicion.contar(escaneadas=len(resultado), devueltas=len(resultado))
+        return resultado
+
+    def motor_filtros(self):
+        """Devuelve los índices de rango para filtrar (ver filtroPaises); se construyen una sola vez."""
+        if self._motor_filtros is None:
+            self._motor_filtros = MotorFiltros(self)
+        return self._motor_filtros
+
+    def filtrar(self, continente=None, min_pob=None, max_pob=None, min_area=None, max_area=None, indices=None, rangos=None):
+        """
+        Devuelve los índices que cumplen todos los criterios. Los límites son inclusivos;
+        None (o continente 'Todos') significa sin restricción.
+        Sin 'indices' se usan los índices de rango y el resultado sigue 'rangos' (o el orden
+        original); con 'indices' se recorren solo esos y se conserva su orden.
+        """
+        if indices is None:
+            return self.motor_filtros().filtrar(continente, min_pob, max_pob, min_area, max_area, rangos=rangos)
+        with tramo("filtrar", motor="recorrido") as medicion:
+            medicion.contar(escaneadas=len(indices))
+            resultado = indices
+            if continente and continente != "Todos":
+                codigo = self._codigo_de['continente'].get(continente)
+                if codigo is None:
+                    return []
+                codigos = self.codigos['continente']
+                resultado = [i for i in resultado if codigos[i] == codigo]
+            poblacion, area = self.poblacion, self.area
+            if min_pob is not None:
+                resultado = [i for i in resultado if poblacion[i] >= min_pob]
+            if max_pob is not None:
+                resultado = [i for i in resultado if poblacion[i] <= max_pob]
+            if min_area is not None:
+                resultado = [i for i in resultado if area[i] >= min_area]
+            if max_area is not None:
+                resultado = [i for i in resultado if area[i] <= max_area]
+            resultado = list(resultado)
+            medicion.contar(devueltas=len(resultado))
+        return resultado
+
+    def indice_prefijos(self):
+        """Devuelve el índice de prefijos para búsquedas; se construye una sola vez."""
+        if self._indice_prefijos is None:
+            self._indice_prefijos = IndicePrefijos(self.textos)
+        return self._indice_prefijos
+
+    def buscar_prefijo(self, texto, columnas=None, rangos=None, dentro_de=None):
+        """
+        Devuelve los índices con algún texto (nombre común, nombre oficial o capital, o solo
+        las columnas pedidas) que empieza con 'texto', sin distinguir mayúsculas ni tildes.
+        Si se pasan 'rangos' (ver rangos_de_orden) el resultado sigue ese orden;
+        si no, el orden original. Con 'dentro_de' solo se revisan esos índices y se
+        conserva su orden (sirve para refinar una búsqueda anterior).
+        """
+        indice = self.indice_prefijos()
+        with tramo("buscar", texto=texto, refinada=dentro_de is not None) as medicion:
+            if dentro_de is not None:
+                prefijo = normalizar(texto)
+                resultado = [i for i in dentro_de if indice.coincide(i, prefijo, columnas)]
+                medicion.contar(escaneadas=len(dentro_de), devueltas=len(resultado))
+                return resultado
+            resultado = indice.buscar(texto, columnas) # Solo se revisan las claves con el prefijo.
+            medicion.contar(escaneadas=len(resultado), devueltas=len(resultado))
+            return sorted(resultado, key=rangos.__getitem__ if rangos is not None else None)
+
+    def motor_estadisticas(self):
+        """Devuelve el motor de estadísticas (ver estadisticasPaises); se construye una sola vez."""
+        if self._motor_estadisticas is None:
+            self._motor_estadisticas = EstadisticasPaises(self)
+        return self._motor_estadisticas
+
+    def estadisticas(self, indices=None):
+        """
+        Calcula las estadísticas de la ventana para los índices dados (todos si es None).
+        Solo cuentan los países con población mayor a 0. Devuelve None si no hay ninguno.
+        """
+        return self.motor_estadisticas().calcular(indices)
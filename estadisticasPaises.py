@@ -0,0 +1,274 @@
+# estadisticasPaises.py
+# Este módulo calcula las estadísticas de los países (totales, promedios, medianas y
+# densidad por continente, países más y menos poblados, top N por métrica) y las mantiene
+# al día cuando cambia el conjunto de filas visible: en vez de recalcular desde cero solo
+# suma o resta las filas que entraron o salieron. Los resultados se guardan por estado de
+# la vista (búsqueda o filtro), así que volver a abrir la ventana no recalcula nada.
+# No depende de tkinter.
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from itertools import islice
+
+from instrumentacion import TRAMO_NULO, tramo
+
+TAMANIO_CACHE = 32 # Cantidad de estados de vista cuyos resultados se recuerdan.
+TOP_N = 5 # Cantidad de países por defecto en los rankings.
+METRICAS = ['poblacion', 'area', 'densidad']
+
+def _mediana(valores_ordenados):
+    """Mediana de una lista ordenada de pares (valor, fila)."""
+    n = len(valores_ordenados)
+    if not n:
+        return None
+    medio = n // 2
+    if n % 2:
+        return valores_ordenados[medio][0]
+    return (valores_ordenados[medio - 1][0] + valores_ordenados[medio][0]) / 2
+
+class _Grupo:
+    """Agregados de un continente. Las listas ordenadas de (valor, fila) sirven para medianas y extremos."""
+
+    __slots__ = ('paises', 'poblacion', 'area', 'poblaciones', 'areas')
+
+    def __init__(self):
+        self.paises = 0
+        self.poblacion = 0
+        self.area = 0.0
+        self.poblaciones = [] # (población, fila) ordenados.
+        self.areas = [] # (superficie, fila) ordenados.
+
+    def agregar(self, fila, poblacion, area):
+        self.paises += 1
+        self.poblacion += poblacion
+        self.area += area
+        insort(self.poblaciones, (poblacion, fila))
+        insort(self.areas, (area, fila))
+
+    def quitar(self, fila, poblacion, area):
+        self.paises -= 1
+        self.poblacion -= poblacion
+        self.area -= area
+        del self.poblaciones[bisect_left(self.poblaciones, (poblacion, fila))]
+        del self.areas[bisect_left(self.areas, (area, fila))]
+
+class Agregados:
+    """Agregados por continente de un conjunto de filas, que se pueden sumar o restar de a una."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.grupos = {} # código de continente -> _Grupo.
+
+    @classmethod
+    def desde_filas(cls, dataset, filas=None):
+        """
+        Arma los agregados de las filas indicadas (todas si es None). Con todas las filas
+        recorre las permutaciones de población y superficie, así las listas ya salen ordenadas.
+        """
+        agregados = cls(dataset)
+        poblacion, area, codigos = dataset.poblacion, dataset.area, dataset.codigos['continente']
+        if filas is None:
+            orden_pob, orden_area = dataset.permutacion('poblacion'), dataset.permutacion('area')
+        else:
+            filas = [f for f in filas if agregados._valida(f)]
+            orden_pob = sorted(filas, key=lambda f: (poblacion[f], f))
+            orden_area = sorted(filas, key=lambda f: (area[f], f))
+        for fila in orden_pob:
+            p = poblacion[fila]
+            if p <= 0 or area[fila] < 0: # Solo países con datos numéricos válidos.
+                continue
+            grupo = agregados._grupo(codigos[fila])
+            grupo.paises += 1
+            grupo.poblacion += p
+            grupo.area += area[fila]
+            grupo.poblaciones.append((p, fila))
+        for fila in orden_area:
+            if poblacion[fila] > 0 and area[fila] >= 0:
+                agregados.grupos[codigos[fila]].areas.append((area[fila], fila))
+        return agregados
+
+    def _grupo(self, codigo):
+        grupo = self.grupos.get(codigo)
+        if grupo is None:
+            grupo = self.grupos[codigo] = _Grupo()
+        return grupo
+
+    def _valida(self, fila):
+        return self.dataset.poblacion[fila] > 0 and self.dataset.area[fila] >= 0
+
+    def agregar(self, fila):
+        if self._valida(fila):
+            dataset = self.dataset
+            self._grupo(dataset.codigos['continente'][fila]).agregar(fila, dataset.poblacion[fila], dataset.area[fila])
+
+    def quitar(self, fila):
+        if self._valida(fila):
+            dataset = self.dataset
+            codigo = dataset.codigos['continente'][fila]
+            self.grupos[codigo].quitar(fila, dataset.poblacion[fila], dataset.area[fila])
+            if not self.grupos[codigo].paises:
+                del self.grupos[codigo]
+
+    def resumen(self):
+        """
+        Devuelve un diccionario con las estadísticas del conjunto, o None si no hay países
+        con población mayor a 0. Ante empates de población se elige la primera fila.
+        """
+        grupos = [g for g in self.grupos.values() if g.paises]
+        if not grupos:
+            return None
+        nombres_pais = self.dataset.textos['nombre_comun_es']
+        nombres_continente = self.dataset.categorias['continente']
+
+        # 1. Totales y Extremos
+        total = sum(g.paises for g in grupos)
+        poblacion_total = sum(g.poblacion for g in grupos)
+        superficie_total = sum(g.area for g in grupos)
+        p_min, i_min = min(g.poblaciones[0] for g in grupos)
+        p_max = max(g.poblaciones[-1][0] for g in grupos)
+        i_max = min(g.poblaciones[bisect_left(g.poblaciones, (p_max,))][1] for g in grupos if g.poblaciones[-1][0] == p_max)
+
+        # 2. Desglose por Continente
+        por_continente = {}
+        for codigo, grupo in self.grupos.items():
+            por_continente[nombres_continente[codigo]] = {
+                'paises': grupo.paises,
+                'poblacion': grupo.poblacion,
+                'area': grupo.area,
+                'promedio_poblacion': grupo.poblacion / grupo.paises,
+                'mediana_poblacion': _mediana(grupo.poblaciones),
+                'mediana_area': _mediana(grupo.areas),
+                'densidad': grupo.poblacion / grupo.area if grupo.area > 0 else None,
+            }
+
+        return {
+            'total_paises': total,
+            'pais_max_pob': (nombres_pais[i_max], p_max),
+            'pais_min_pob': (nombres_pais[i_min], p_min),
+            'promedio_poblacion': poblacion_total / total,
+            'promedio_superficie': superficie_total / total,
+            'poblacion_total': poblacion_total,
+            'superficie_total': superficie_total,
+            'densidad': poblacion_total / superficie_total if superficie_total > 0 else None,
+            'conteo_continentes': {nombre: datos['paises'] for nombre, datos in por_continente.items()},
+            'por_continente': por_continente,
+        }
+
+    def top(self, metrica='poblacion', n=TOP_N):
+        """Devuelve los n países con mayor población, superficie o densidad como [(nombre, valor)]."""
+        nombres = self.dataset.textos['nombre_comun_es']
+        if metrica == 'densidad':
+            poblacion, area = self.dataset.poblacion, self.dataset.area
+            filas = (fila for g in self.grupos.values() for _, fila in g.poblaciones if area[fila] > 0)
+            mejores = heapq.nlargest(n, filas, key=lambda f: poblacion[f] / area[f])
+            return [(nombres[f], poblacion[f] / area[f]) for f in mejores]
+        if metrica not in ('poblacion', 'area'):
+            raise ValueError(f"Métrica desconocida: {metrica}")
+        # Las listas de cada continente ya están ordenadas: basta mezclar sus extremos.
+        listas = [reversed(g.poblaciones if metrica == 'poblacion' else g.areas) for g in self.grupos.values()]
+        mezcla = heapq.merge(*listas, key=lambda par: par[0], reverse=True)
+        return [(nombres[fila], valor) for valor, fila in islice(mezcla, n)]
+
+class EstadisticasPaises:
+    """
+    Estadísticas del conjunto de filas visible de un DatasetPaises. Los agregados de todas
+    las filas se calculan una vez; al cambiar la vista (actualizar) se aplica solo la
+    diferencia de filas, y los resultados de cada estado se recuerdan por su 'clave'.
+    El trabajo se hace recién al pedir un resumen o un ranking. 'actualizar' se puede
+    llamar desde otro hilo mientras se calcula; los cálculos, de a uno por vez.
+    """
+
+    def __init__(self, dataset, tamanio_cache=TAMANIO_CACHE):
+        self.dataset = dataset
+        self.tamanio_cache = tamanio_cache
+        self.globales = Agregados.desde_filas(dataset) # Todas las filas; no se modifica.
+        self._actual = None # Agregados del subconjunto aplicado (None = todas las filas).
+        self._filas_actuales = None # Conjunto de filas de _actual.
+        self._pendientes = None # Filas visibles (None = todas).
+        self._sin_aplicar = False # True si _pendientes todavía no se aplicó a los agregados.
+        self._clave = None # Estado de la vista visible (None = sin guardar en la caché).
+        self._cache = OrderedDict() # clave -> {'resumen': ..., (métrica, n): ...}.
+        self._resultados_actuales = {} # Resultados del estado visible si no tiene clave.
+        self._lock = threading.Lock() # Protege el estado visible, no los cálculos.
+
+    def actualizar(self, indices=None, clave=None):
+        """
+        Registra las filas visibles (None = todas). 'clave' identifica el estado de la
+        vista (por ejemplo, la búsqueda o el filtro aplicado); el orden no importa.
+        """
+        with self._lock:
+            self._pendientes = indices
+            self._sin_aplicar = True
+            self._clave = ('todos',) if indices is None else clave
+            self._resultados_actuales = {}
+
+    @property
+    def todas_visibles(self):
+        """True si la vista muestra todas las filas (sin búsqueda ni filtro)."""
+        return self._pendientes is None
+
+    def _agregados(self, pendientes, sin_aplicar, medicion=TRAMO_NULO):
+        # Aplica las filas pendientes: desde cero o sumando y restando la diferencia.
+        if not sin_aplicar:
+            return self.globales if self._filas_actuales is None else self._actual
+        if pendientes is None:
+            self._actual, self._filas_actuales = None, None
+            return self.globales
+        nuevas = set(pendientes)
+        if self._actual is not None:
+            quitadas = self._filas_actuales - nuevas
+            agregadas = nuevas - self._filas_actuales
+            if len(quitadas) + len(agregadas) < len(nuevas): # Cambió poco: actualización incremental.
+                medicion.contar(escaneadas=len(quitadas) + len(agregadas), devueltas=len(nuevas))
+                for fila in quitadas:
+                    self._actual.quitar(fila)
+                for fila in agregadas:
+                    self._actual.agregar(fila)
+                self._filas_actuales = nuevas
+                return self._actual
+        medicion.contar(escaneadas=len(nuevas), devueltas=len(nuevas))
+        self._actual, self._filas_actuales = Agregados.desde_filas(self.dataset, nuevas), nuevas
+        return self._actual
+
+    def _resultado(self, nombre, calcular):
+        # Busca el resultado del estado visible en la caché; si no está, lo calcula.
+        with self._lock:
+            if self._clave is None:
+                resultados = self._resultados_actuales
+            else:
+                resultados = self._cache.get(self._clave)
+                if resultados is None:
+                    resultados = self._cache[self._clave] = {}
+                    if len(self._cache) > self.tamanio_cache:
+                        self._cache.popitem(last=False)
+                self._cache.move_to_end(self._clave)
+            if nombre in resultados:
+                return resultados[nombre]
+            pendientes, sin_aplicar = self._pendientes, self._sin_aplicar
+            self._sin_aplicar = False
+        with tramo("estadisticas", calculo=str(nombre)) as medicion:
+            try:
+                agregados = self._agregados(pendientes, sin_aplicar, medicion)
+            except BaseException: # Cortado a mitad de camino: la diferencia queda pendiente y se rehace desde cero.
+                if sin_aplicar:
+                    with self._lock:
+                        self._actual, self._filas_actuales = None, None
+                        self._sin_aplicar = True
+                raise
+            resultados[nombre] = calcular(agregados)
+        return resultados[nombre]
+
+    def resumen(self):
+        """Estadísticas de las filas visibles (ver Agregados.resumen)."""
+        return self._resultado('resumen', Agregados.resumen)
+
+    def top(self, metrica='poblacion', n=TOP_N):
+        """Los n países visibles con mayor valor de la métrica ('poblacion', 'area' o 'densidad')."""
+        return self._resultado((metrica, n), lambda agregados: agregados.top(metrica, n))
+
+    def calcular(self, indices=None):
+        """Atajo sin caché: registra las filas y devuelve su resumen."""
+        self.actualizar(indices)
+        return self.resumen()
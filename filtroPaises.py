@@ -0,0 +1,99 @@
+# filtroPaises.py
+# Este módulo resuelve los filtros por continente, población y superficie sin recorrer
+# todo el dataset. Para población y superficie guarda los valores ordenados (un rango son
+# dos bisect) y para cada continente la lista de filas que le pertenecen. Al combinar
+# criterios se parte del conjunto de candidatos más chico y solo se revisan esos.
+# No depende de tkinter.
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+from instrumentacion import tramo
+
+class MotorFiltros:
+    """
+    Índices para filtrar un DatasetPaises. Se construye una sola vez (al cargar) y
+    después cada consulta cuesta O(log n + k), donde k es el candidato más chico.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.filas_ordenadas = {} # columna numérica -> filas ordenadas por su valor.
+        self.valores_ordenados = {} # columna numérica -> valores en ese mismo orden.
+        for columna, tipo in (('poblacion', 'q'), ('area', 'd')):
+            filas = dataset.permutacion(columna)
+            valores = getattr(dataset, columna)
+            self.filas_ordenadas[columna] = filas
+            self.valores_ordenados[columna] = array(tipo, (valores[fila] for fila in filas))
+        # Filas de cada continente (en orden de fila), indexadas por su código de categoría.
+        self.filas_continente = [array('I') for _ in dataset.categorias['continente']]
+        for fila, codigo in enumerate(dataset.codigos['continente']):
+            self.filas_continente[codigo].append(fila)
+
+    def rango(self, columna, minimo=None, maximo=None):
+        """Devuelve (desde, hasta) dentro de los valores ordenados de la columna; límites inclusivos."""
+        valores = self.valores_ordenados[columna]
+        desde = 0 if minimo is None else bisect_left(valores, minimo)
+        hasta = len(valores) if maximo is None else bisect_right(valores, maximo)
+        return desde, max(desde, hasta)
+
+    def filtrar(self, continente=None, min_pob=None, max_pob=None, min_area=None, max_area=None, rangos=None):
+        """
+        Devuelve las filas que cumplen todos los criterios (límites inclusivos; None o
+        continente 'Todos' significan sin restricción). Si se pasan 'rangos' (posición de
+        cada fila en el orden actual) el resultado sigue ese orden; si no, el de las filas.
+        """
+        with tramo("filtrar", motor="indices") as medicion:
+            resultado = self._filtrar(continente, min_pob, max_pob, min_area, max_area, rangos, medicion)
+            medicion.contar(devueltas=len(resultado))
+        return resultado
+
+    def _filtrar(self, continente, min_pob, max_pob, min_area, max_area, rangos, medicion):
+        # Cuerpo de filtrar; en 'medicion' se cuentan las filas revisadas.
+        dataset = self.dataset
+
+        # 1. Armar los Candidatos de Cada Criterio Activo (solo su tamaño, sin copiarlos)
+        candidatos = [] # (cantidad, nombre, filas)
+        if continente and continente != "Todos":
+            codigo = dataset._codigo_de['continente'].get(continente)
+            if codigo is None:
+                return []
+            filas = self.filas_continente[codigo]
+            candidatos.append((len(filas), 'continente', filas))
+        for columna, minimo, maximo in (('poblacion', min_pob, max_pob), ('area', min_area, max_area)):
+            if minimo is not None or maximo is not None:
+                desde, hasta = self.rango(columna, minimo, maximo)
+                candidatos.append((hasta - desde, columna, (self.filas_ordenadas[columna], desde, hasta)))
+
+        if not candidatos: # Sin criterios: todas las filas.
+            resultado = range(len(dataset))
+            medicion.contar(escaneadas=len(resultado))
+            return sorted(resultado, key=rangos.__getitem__) if rangos is not None else list(resultado)
+
+        # 2. Partir del Conjunto más Chico y Verificar el Resto Sobre las Columnas
+        candidatos.sort(key=lambda c: c[0])
+        _, nombre, filas = candidatos[0]
+        if nombre != 'continente':
+            ordenadas, desde, hasta = filas
+            filas = ordenadas[desde:hasta]
+        medicion.contar(escaneadas=len(filas)) # Solo se revisa el candidato más chico.
+        resultado = filas
+        for _, nombre, _ in candidatos[1:]:
+            if nombre == 'continente':
+                codigo_buscado, codigos = dataset._codigo_de['continente'][continente], dataset.codigos['continente']
+                resultado = [f for f in resultado if codigos[f] == codigo_buscado]
+            elif nombre == 'poblacion':
+                resultado = _en_rango(resultado, dataset.poblacion, min_pob, max_pob)
+            else:
+                resultado = _en_rango(resultado, dataset.area, min_area, max_area)
+
+        # 3. Ordenar Solo los Resultados
+        return sorted(resultado, key=rangos.__getitem__ if rangos is not None else None)
+
+def _en_rango(filas, valores, minimo, maximo):
+    """Deja las filas cuyo valor está entre minimo y maximo (inclusivos, None = sin límite)."""
+    if minimo is not None and maximo is not None:
+        return [f for f in filas if minimo <= valores[f] <= maximo]
+    if minimo is not None:
+        return [f for f in filas if valores[f] >= minimo]
+    return [f for f in filas if valores[f] <= maximo]
@@ -0,0 +1,49 @@
+# formatoPaises.py
+# Este módulo define la forma de los CSV de países (campos, conversión desde la API,
+# columnas por las que se puede ordenar) y cómo se escriben sin dejar archivos a medias.
+# No depende de requests ni de la interfaz: lo usan generarPaises, ingestaParalela (en
+# cada proceso de trabajo) y consultaPaises, sin cargar nada más.
+
+import argparse
+import os
+from contextlib import contextmanager
+
+CAMPOS_CSV = ['nombre_comun_es', 'nombre_oficial_es', 'capital', 'region', 'poblacion', 'area']
+COLUMNAS_TODOS = CAMPOS_CSV + ['continente'] # Todos.csv agrega el continente de cada fila.
+TAMANIO_BUFFER_ESCRITURA = 1 << 20 # Buffer del archivo unido: escribe en bloques grandes.
+
+def fila_desde_pais(pais):
+    """Convierte un país tal como lo devuelve la API en una fila del CSV."""
+    return {
+        'nombre_comun_es': pais.get('translations', {}).get('spa', {}).get('common', 'N/A'),
+        'nombre_oficial_es': pais.get('translations', {}).get('spa', {}).get('official', 'N/A'),
+        'capital': ', '.join(pais.get('capital', ['N/A'])),
+        'region': pais.get('region', 'N/A'),
+        'poblacion': pais.get('population', 0),
+        'area': int(pais.get('area', 0.0))
+    }
+
+@contextmanager
+def escritura_atomica(ruta, **opciones):
+    """
+    Abre 'ruta.tmp' para escribir y lo renombra a 'ruta' solo si el bloque termina sin
+    errores. Si algo falla a mitad de camino se borra el temporal y queda el archivo anterior.
+    """
+    ruta_temporal = ruta + ".tmp"
+    try:
+        with open(ruta_temporal, 'w', **opciones) as archivo:
+            yield archivo
+        os.replace(ruta_temporal, ruta)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+def leer_orden(texto):
+    """Convierte 'columna' o 'columna:desc' en (columna, descendente)."""
+    columna, _, sentido = texto.partition(':')
+    if columna not in COLUMNAS_TODOS:
+        raise argparse.ArgumentTypeError(f"Columna desconocida para ordenar: {columna}")
+    if sentido not in ('', 'asc', 'desc'):
+        raise argparse.ArgumentTypeError(f"Sentido de orden desconocido: {sentido} (usar 'asc' o 'desc')")
+    return columna, sentido == 'desc'
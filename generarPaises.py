@@ -1,92 +1,355 @@
 # generarPaises.py
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 import csv
+import json
 import os
+import time
+from formatoPaises import CAMPOS_CSV, TAMANIO_BUFFER_ESCRITURA, escritura_atomica, fila_desde_pais
+from jsonIncremental import iterar_array_json
+from datosPaises import DatasetPaises
+from snapshotPaises import escribir_snapshot, guardar_snapshot_desde_csv, hash_archivo
 
-def obtener_y_guardar_paises(url, nombre_archivo, carpeta_salida):
+URL_BASE_API = "https://restcountries.com/v3.1" # Dirección base de la API (se puede cambiar por un servidor local).
+TIEMPO_ESPERA = 10 # Segundos máximos de espera por cada petición.
+TAMANIO_BLOQUE = 65536 # Bytes leídos por vez en el modo streaming.
+VERSION_MANIFIESTO = 1 # Formato del manifiesto de unir_csvs_en_uno.
+
+def crear_sesion(max_conexiones=6, reintentos=3, factor_espera=0.5):
+    """
+    Crea una sesión HTTP que reutiliza las conexiones (keep-alive) y reintenta
+    las peticiones fallidas esperando cada vez más entre intentos.
+    """
+    politica_reintentos = Retry(
+        total=reintentos,
+        backoff_factor=factor_espera, # Espera 0.5s, 1s, 2s... entre reintentos.
+        status_forcelist=(429, 500, 502, 503, 504), # Códigos HTTP que vale la pena reintentar.
+        allowed_methods=frozenset(["GET"]),
+    )
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexiones, max_retries=politica_reintentos)
+    sesion = requests.Session()
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    return sesion
+
+CAMPOS_API = "translations,capital,region,population,area" # Campos que se piden a /all para achicar la respuesta.
+
+def escribir_csv_paises(paises, ruta_completa_archivo):
+    """
+    Escribe los países de la API (lista o iterador) en un archivo CSV, una fila por
+    país a medida que llegan. El archivo se reemplaza recién cuando el iterador terminó
+    bien: un corte de red o un JSON roto a mitad del flujo deja el CSV anterior.
+    Devuelve la cantidad de filas escritas.
+    """
+    cantidad = 0
+    with escritura_atomica(ruta_completa_archivo, newline='', encoding='utf-8') as archivo_csv:
+        escritor = csv.DictWriter(archivo_csv, fieldnames=CAMPOS_CSV)
+        escritor.writeheader()
+        for pais in paises:
+            escritor.writerow(fila_desde_pais(pais))
+            cantidad += 1
+    return cantidad
+
+def obtener_json(url, rutas_salida, sesion=None, timeout=TIEMPO_ESPERA, cache=None, streaming=False):
+    """
+    Descarga la lista de países de la URL, usando la caché si se pasa una.
+    Devuelve (paises, confirmar). 'paises' es None cuando los archivos de 'rutas_salida'
+    ya están al día y no hace falta reescribirlos. Con streaming=True es un iterador que
+    decodifica cada país a medida que llegan los bytes, en lugar de una lista.
+    'confirmar' guarda la respuesta en la caché: hay que llamarla recién cuando todos los
+    archivos de 'rutas_salida' se escribieron bien, porque si no la próxima corrida vería
+    la caché al día (304 o TTL vigente) y conservaría los archivos viejos para siempre.
+    Los errores de red se propagan a quien llama.
+    """
+    def sin_cambios(): # No hay nada que guardar en la caché.
+        pass
+
+    def desde_cache():
+        if streaming:
+            return iterar_array_json(cache.leer_flujo(url, TAMANIO_BLOQUE))
+        return cache.leer_json(url)
+
+    salidas_existen = all(os.path.exists(ruta) for ruta in rutas_salida)
+
+    # 1. Resolver desde la Caché si es Posible
+    if cache is not None:
+        if cache.offline: # Modo offline: nunca se toca la red.
+            if not cache.tiene(url):
+                raise FileNotFoundError(f"Modo offline: no hay datos en caché para {url}.")
+            print(f"Modo offline: usando la caché de {url}.")
+            return (None if salidas_existen else desde_cache()), sin_cambios
+        if salidas_existen and cache.esta_fresca(url): # Dentro del TTL ni siquiera preguntamos al servidor.
+            print(f"Caché vigente para {url}, se conservan los archivos.")
+            return None, sin_cambios
+
+    print(f"Obteniendo datos desde {url}...")
+    cabeceras = cache.cabeceras_condicionales(url) if cache is not None else {}
+    cliente = sesion if sesion is not None else requests # Sin sesión, usamos una conexión nueva.
+    response = cliente.get(url, timeout=timeout, headers=cabeceras, stream=streaming)
+
+    # 2. El Servidor Indica que Nada Cambió (304 Not Modified)
+    if response.status_code == 304 and cache is not None:
+        renovar = partial(cache.renovar, url, response.headers)
+        if salidas_existen:
+            print(f"Sin cambios en {url}, se conservan los archivos.")
+            renovar()
+            return None, sin_cambios
+        return desde_cache(), renovar # Falta algún archivo: lo regeneramos desde la caché.
+
+    response.raise_for_status()
+    if streaming:
+        bloques = response.iter_content(chunk_size=TAMANIO_BLOQUE)
+        if cache is None:
+            return iterar_array_json(bloques), sin_cambios
+        bloques = cache.copiar_flujo(url, bloques) # Se copia a la caché mientras se lee.
+        return iterar_array_json(bloques), partial(cache.confirmar_flujo, url, response.headers)
+
+    paises = response.json()
+    if cache is None:
+        return paises, sin_cambios
+    return paises, partial(cache.guardar, url, response.content, response.headers)
+
+def obtener_y_guardar_paises(url, nombre_archivo, carpeta_salida, sesion=None, timeout=TIEMPO_ESPERA, cache=None,
+                             streaming=False):
     """
     Obtiene datos de la API y los guarda en un CSV dentro de una carpeta específica.
+    Si se pasa una sesión, se reutilizan sus conexiones. Si se pasa una CacheApi, se
+    evita descargar y reescribir el CSV cuando los datos no cambiaron. Con
+    streaming=True cada fila se escribe apenas llega su país.
+    Devuelve True si tuvo éxito.
     """
     if not os.path.exists(carpeta_salida):
-        os.makedirs(carpeta_salida)
+        os.makedirs(carpeta_salida, exist_ok=True) # exist_ok evita errores si otro hilo la crea a la vez.
         print(f"Carpeta '{carpeta_salida}' creada exitosamente.")
 
     ruta_completa_archivo = os.path.join(carpeta_salida, nombre_archivo)
-    
-    print(f"Obteniendo datos desde {url}...")
-    
+
     try:
-        response = requests.get(url) 
-        response.raise_for_status()
-        
-        paises = response.json()
-        print(f"Se encontraron {len(paises)} territorios. Procesando...")
+        paises, confirmar = obtener_json(url, [ruta_completa_archivo], sesion=sesion, timeout=timeout, cache=cache,
+                                         streaming=streaming)
+        if paises is None: # El CSV ya está al día.
+            return True
 
-        with open(ruta_completa_archivo, 'w', newline='', encoding='utf-8') as archivo_csv:
-            campos = ['nombre_comun_es', 'nombre_oficial_es', 'capital', 'region', 'poblacion', 'area']
-            escritor = csv.DictWriter(archivo_csv, fieldnames=campos)
-            escritor.writeheader()
-            
-            for pais in paises:
-                escritor.writerow({
-                    'nombre_comun_es': pais.get('translations', {}).get('spa', {}).get('common', 'N/A'),
-                    'nombre_oficial_es': pais.get('translations', {}).get('spa', {}).get('official', 'N/A'),
-                    'capital': ', '.join(pais.get('capital', ['N/A'])),
-                    'region': pais.get('region', 'N/A'),
-                    'poblacion': pais.get('population', 0),
-                    'area': int(pais.get('area', 0.0))
-                })
-        print(f"¡Éxito! Los datos han sido guardados en el archivo '{ruta_completa_archivo}'.")
+        if not streaming: # En streaming no sabemos el total hasta terminar.
+            print(f"Se encontraron {len(paises)} territorios. Procesando...")
+        cantidad = escribir_csv_paises(paises, ruta_completa_archivo)
+        confirmar() # El CSV ya está escrito: recién ahora la caché puede darlo por al día.
+        print(f"¡Éxito! {cantidad} territorios guardados en el archivo '{ruta_completa_archivo}'.")
+        return True
+    except requests.exceptions.RequestException as e:
+        print(f"Error al conectar con la API: {e}")
+    except FileNotFoundError as e:
+        print(e)
+    except Exception as e:
+        print(f"Ocurrió un error inesperado: {e}")
+    return False
+
+def obtener_y_guardar_todos(continentes, carpeta_salida, archivo_salida, url_base=URL_BASE_API,
+                            sesion=None, timeout=TIEMPO_ESPERA, cache=None, streaming=False):
+    """
+    Descarga todos los países con una sola petición a /all (pidiendo solo los campos
+    necesarios), los reparte por región en memoria y escribe en la misma pasada los
+    CSV de cada continente y el archivo unificado con la columna 'continente'.
+    Con streaming=True solo se guardan en memoria las filas ya convertidas, nunca el JSON entero.
+    Solo se escriben los 'continentes' pedidos (los países de otras regiones se descartan),
+    cada archivo se reemplaza de una vez y se actualizan el manifiesto y el snapshot, así
+    que Todos.csv queda igual que si lo hubiera armado unir_csvs_en_uno.
+    Devuelve True si tuvo éxito.
+    """
+    os.makedirs(carpeta_salida, exist_ok=True)
+    url = f"{url_base}/all?fields={CAMPOS_API}"
+    rutas_continentes = [os.path.join(carpeta_salida, f"{c}.csv") for c in continentes]
+
+    try:
+        paises, confirmar = obtener_json(url, rutas_continentes + [archivo_salida], sesion=sesion, timeout=timeout,
+                                         cache=cache, streaming=streaming)
+        if paises is None: # Todos los archivos ya están al día.
+            return True
+        print("Repartiendo los territorios por continente...")
+
+        # 1. Convertir una Sola Vez y Agrupar por Región
+        filas_por_continente = {continente: [] for continente in sorted(continentes)} # Mismo orden que unir_csvs_en_uno.
+        total = descartados = 0
+        for pais in paises:
+            fila = fila_desde_pais(pais)
+            if fila['region'] not in filas_por_continente: # Región que no se pidió: no se crea un CSV para ella.
+                descartados += 1
+                continue
+            filas_por_continente[fila['region']].append(fila)
+            total += 1
+        if descartados:
+            print(f"Se descartaron {descartados} territorios de regiones no pedidas.")
+
+        # 2. Escribir los CSV de Cada Continente y el Unificado con las Mismas Filas
+        dataset = DatasetPaises() # Se arma a la vez para el snapshot binario.
+        with escritura_atomica(archivo_salida, newline='', encoding='utf-8', buffering=TAMANIO_BUFFER_ESCRITURA) as f_todos:
+            escritor_todos = csv.DictWriter(f_todos, fieldnames=CAMPOS_CSV + ['continente'])
+            escritor_todos.writeheader()
+            for continente, filas in filas_por_continente.items():
+                ruta_continente = os.path.join(carpeta_salida, f"{continente}.csv")
+                with escritura_atomica(ruta_continente, newline='', encoding='utf-8') as f_continente:
+                    escritor = csv.DictWriter(f_continente, fieldnames=CAMPOS_CSV)
+                    escritor.writeheader()
+                    escritor.writerows(filas)
+                for fila in filas:
+                    fila['continente'] = continente # Añadimos la columna solo para el archivo unificado.
+                    dataset.agregar(fila)
+                escritor_todos.writerows(filas)
+                print(f"  - {continente}: {len(filas)} territorios.")
+        confirmar() # Todos los CSV están escritos: recién ahora la caché puede darlos por al día.
+
+        # 3. Manifiesto y Snapshot (una corrida en modo regiones no vuelve a unir lo mismo)
+        guardar_manifiesto(archivo_salida, {os.path.basename(ruta): _firma_archivo(ruta) for ruta in rutas_continentes})
+        print(f"¡Éxito! Archivo '{archivo_salida}' creado con {total} territorios.")
+        _guardar_snapshot(escribir_snapshot, dataset, archivo_salida)
+        return True
     except requests.exceptions.RequestException as e:
         print(f"Error al conectar con la API: {e}")
+    except FileNotFoundError as e:
+        print(e)
     except Exception as e:
         print(f"Ocurrió un error inesperado: {e}")
+    return False
+
+def descargar_continentes_concurrente(continentes, carpeta_salida, url_base=URL_BASE_API,
+                                      max_trabajadores=4, timeout=TIEMPO_ESPERA, reintentos=3, cache=None,
+                                      streaming=False):
+    """
+    Descarga varios continentes a la vez con un pool de hilos que comparte una
+    única sesión HTTP. Devuelve un diccionario {continente: (exito, segundos)}.
+    """
+    tiempos = {}
+
+    def descargar(continente): # Tarea que ejecuta cada hilo.
+        inicio = time.perf_counter()
+        url = f"{url_base}/region/{continente}"
+        exito = obtener_y_guardar_paises(url, f"{continente}.csv", carpeta_salida, sesion=sesion, timeout=timeout, cache=cache,
+                                         streaming=streaming)
+        return continente, exito, time.perf_counter() - inicio
+
+    with crear_sesion(max_conexiones=max_trabajadores, reintentos=reintentos) as sesion:
+        with ThreadPoolExecutor(max_workers=max_trabajadores) as ejecutor: # Limita cuántas descargas corren a la vez.
+            futuros = [ejecutor.submit(descargar, c) for c in continentes]
+            for futuro in as_completed(futuros):
+                continente, exito, segundos = futuro.result()
+                tiempos[continente] = (exito, segundos)
+    return tiempos
+
+def _guardar_snapshot(escribir, *argumentos):
+    # Escribe el snapshot binario e informa dónde. Si no se puede (por ejemplo, porque la
+    # interfaz todavía tiene mapeado el anterior) no es un error: se regenera al cargar.
+    try:
+        print(f"Snapshot binario guardado en '{escribir(*argumentos)}'.")
+    except OSError as e:
+        print(f"No se pudo guardar el snapshot binario ({e}); se regenerará en la próxima carga.")
 
 # Nueva Función Añadida
-def unir_csvs_en_uno(carpeta_entrada, archivo_salida):
+def ruta_manifiesto(archivo_salida):
+    """Devuelve la ruta del manifiesto que acompaña al CSV unido (Todos.csv -> Todos.manifiesto.json)."""
+    return os.path.splitext(archivo_salida)[0] + ".manifiesto.json"
+
+def _leer_manifiesto(ruta):
+    try:
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            manifiesto = json.load(archivo)
+    except (OSError, ValueError):
+        return None
+    return manifiesto if manifiesto.get('version') == VERSION_MANIFIESTO else None
+
+def guardar_manifiesto(archivo_salida, entradas):
+    """Escribe el manifiesto de 'archivo_salida' con las firmas de sus 'entradas' {nombre: firma} y la de la salida."""
+    manifiesto = {'version': VERSION_MANIFIESTO, 'entradas': entradas, 'salida': _firma_archivo(archivo_salida)}
+    with escritura_atomica(ruta_manifiesto(archivo_salida), encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, indent=2)
+
+def _firma_archivo(ruta, anterior=None):
+    """
+    Tamaño, fecha y hash de un archivo. Si el tamaño y la fecha coinciden con la firma
+    anterior se reutiliza su hash sin volver a leer el archivo.
+    """
+    info = os.stat(ruta)
+    firma = {'tamanio': info.st_size, 'mtime': info.st_mtime_ns}
+    if anterior and anterior.get('tamanio') == firma['tamanio'] and anterior.get('mtime') == firma['mtime']:
+        firma['sha256'] = anterior['sha256']
+    else:
+        firma['sha256'] = hash_archivo(ruta).hex()
+    return firma
+
+def unir_csvs_en_uno(carpeta_entrada, archivo_salida, procesos=None):
     """
     Busca todos los archivos .csv en una carpeta, les añade una columna 'continente',
-    y los une en un único archivo.
+    y los une en un único archivo, en orden alfabético de archivo.
+    Un manifiesto guarda tamaño, fecha y hash de cada entrada: si ninguna cambió (y la
+    salida sigue siendo la que se escribió) no se rehace nada. Con 'procesos' la unión
+    la hace ingestaParalela con esa cantidad de procesos (mismas entradas, misma salida).
+    Devuelve True si se reescribió.
     """
     nombre_archivo_salida = os.path.basename(archivo_salida)
-    archivos_csv_a_unir = [
+    archivos_csv_a_unir = sorted( # Orden fijo: la salida no depende del sistema de archivos.
         f for f in os.listdir(carpeta_entrada)
         if f.endswith('.csv') and f != nombre_archivo_salida
-    ]
+    )
 
     if not archivos_csv_a_unir:
         print("No se encontraron archivos de continentes para unir.")
-        return
+        return False
+
+    # 1. Comparar con el Manifiesto de la Última Unión
+    manifiesto = _leer_manifiesto(ruta_manifiesto(archivo_salida)) or {}
+    anteriores = manifiesto.get('entradas', {})
+    entradas = {nombre: _firma_archivo(os.path.join(carpeta_entrada, nombre), anteriores.get(nombre))
+                for nombre in archivos_csv_a_unir}
+    salida_intacta = (os.path.exists(archivo_salida)
+                      and manifiesto.get('salida') == _firma_archivo(archivo_salida, manifiesto.get('salida')))
+    if salida_intacta and {n: e['sha256'] for n, e in entradas.items()} == {n: e['sha256'] for n, e in anteriores.items()}:
+        print(f"\n'{archivo_salida}' ya está al día; no hay continentes modificados.")
+        return False
 
     print(f"\nUniendo {len(archivos_csv_a_unir)} archivos en '{archivo_salida}'...")
+    if procesos:
+        from ingestaParalela import ingerir_en_paralelo # Solo se importa si se pide.
+        total = ingerir_en_paralelo([os.path.join(carpeta_entrada, nombre) for nombre in archivos_csv_a_unir],
+                                    archivo_salida, procesos=procesos)
+        guardar_manifiesto(archivo_salida, entradas)
+        print(f"¡Éxito! {total} filas unidas en '{archivo_salida}' con {procesos} procesos.")
+        _guardar_snapshot(guardar_snapshot_desde_csv, archivo_salida)
+        return True
     
-    with open(archivo_salida, 'w', newline='', encoding='utf-8') as f_salida:
+    # 2. Escribir en un Temporal que Reemplaza la Salida de una Vez (con buffer grande y de a un archivo por vez)
+    dataset = DatasetPaises() # Se arma a la vez para el snapshot binario.
+    cabecera = None
+    with escritura_atomica(archivo_salida, newline='', encoding='utf-8', buffering=TAMANIO_BUFFER_ESCRITURA) as f_salida:
         escritor = csv.writer(f_salida)
         
-        # Leemos el primer archivo para obtener la cabecera
-        primer_archivo = os.path.join(carpeta_entrada, archivos_csv_a_unir[0])
-        with open(primer_archivo, 'r', encoding='utf-8') as f_entrada:
-            lector = csv.reader(f_entrada)
-            cabecera = next(lector)
-            
-            # Añadimos la Nueva Columna a la Cabecera
-            cabecera.append('continente')
-            escritor.writerow(cabecera)
-        
         # Recorremos todos los archivos CSV para añadir su contenido
         for nombre_archivo in archivos_csv_a_unir:
-            print(f"  - Procesando y añadiendo: {nombre_archivo}")
+            estado = "modificado" if anteriores.get(nombre_archivo, {}).get('sha256') != entradas[nombre_archivo]['sha256'] else "sin cambios"
+            print(f"  - Procesando y añadiendo: {nombre_archivo} ({estado})")
             # Extraemos el nombre del continente del nombre del archivo
             continente = nombre_archivo.replace('.csv', '')
             
             ruta_completa = os.path.join(carpeta_entrada, nombre_archivo)
-            with open(ruta_completa, 'r', encoding='utf-8') as f_entrada:
+            with open(ruta_completa, 'r', encoding='utf-8', newline='') as f_entrada:
                 lector = csv.reader(f_entrada)
-                next(lector) # Saltamos la Cabecera de este Archivo
-                for fila in lector:
-                    # Añadimos el Nombre del Continente a Cada Fila
-                    fila.append(continente)
-                    escritor.writerow(fila)
-                    
-    print(f"¡Éxito! Archivo '{archivo_salida}' creado correctamente con la columna 'continente'.")
\ No newline at end of file
+                cabecera_archivo = next(lector, None)
+                if cabecera_archivo is None: # Archivo vacío.
+                    continue
+                if cabecera is None: # Añadimos la Nueva Columna a la Cabecera del primer archivo
+                    cabecera = cabecera_archivo + ['continente']
+                    escritor.writerow(cabecera)
+                # Añadimos el Nombre del Continente a Cada Fila y las escribimos juntas
+                filas = [fila + [continente] for fila in lector]
+                escritor.writerows(filas)
+                for fila in filas:
+                    dataset.agregar(dict(zip(cabecera, fila)))
+
+    # 3. Manifiesto (quien lea Todos.csv nunca ve un archivo a medias: escritura_atomica ya lo reemplazó)
+    guardar_manifiesto(archivo_salida, entradas)
+
+    print(f"¡Éxito! Archivo '{archivo_salida}' creado correctamente con la columna 'continente'.")
+    _guardar_snapshot(escribir_snapshot, dataset, archivo_salida)
+    return True
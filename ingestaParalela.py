@@ -0,0 +1,261 @@
+# ingestaParalela.py
+# Este módulo arma Todos.csv a partir de muchos archivos grandes usando varios procesos.
+# Cada archivo de entrada (un array JSON con la forma de la API o un CSV por continente)
+# se corta en bloques de bytes; cada proceso decodifica y transforma su bloque y escribe
+# una partición. Al final las particiones se unen en orden en Todos.csv (con --orden,
+# cada partición se ordena y se hace una mezcla de k vías).
+#
+# Los cortes se buscan sin decodificar: en JSON, donde termina un objeto y empieza otro
+# ('},{'); en CSV, al final de una línea. Cada proceso comprueba que su bloque empiece y
+# termine justo en un límite entre elementos (en CSV, que tenga una cantidad par de
+# comillas); si algún corte cayó dentro de un elemento, ese archivo se procesa entero
+# en un solo bloque. Sin orden, el resultado es idéntico al de unir_csvs_en_uno.
+#
+# Uso:
+#   python -m ingestaParalela Continentes/Africa.csv Continentes/Asia.csv --salida Continentes/Todos.csv
+#   python -m ingestaParalela datos/*.json --salida Todos.csv --procesos 8 --orden poblacion:desc
+
+import argparse
+import csv
+import heapq
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from formatoPaises import CAMPOS_CSV, COLUMNAS_TODOS, TAMANIO_BUFFER_ESCRITURA, escritura_atomica, fila_desde_pais, leer_orden
+from instrumentacion import tramo
+
+TAMANIO_BLOQUE = 8 << 20 # Bytes de entrada por tarea.
+VENTANA_CORTE = 1 << 16 # Bytes que se leen para buscar el próximo límite a partir de un corte.
+CABECERA = COLUMNAS_TODOS
+FORMATOS = {'.json': 'json', '.csv': 'csv'}
+COLUMNAS_NUMERICAS = ('poblacion', 'area')
+_LIMITE_JSON = re.compile(rb'\}\s*,\s*(\{)') # Fin de un objeto y comienzo del siguiente.
+_ESPACIOS = ' \t\n\r'
+
+class BloqueDesalineado(Exception):
+    """El bloque no empieza o no termina en un límite entre elementos."""
+
+# Planificación
+
+def formato_de(ruta):
+    """'json' o 'csv' según la extensión del archivo."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension not in FORMATOS:
+        raise ValueError(f"Formato de entrada desconocido: {ruta} (se esperaba .json o .csv)")
+    return FORMATOS[extension]
+
+def _proximo_limite(archivo, posicion, formato):
+    # Primera posición >= 'posicion' donde empieza un elemento, o None si no hay más.
+    archivo.seek(posicion)
+    ventana = b''
+    while True:
+        bloque = archivo.read(VENTANA_CORTE)
+        if not bloque:
+            return None
+        ventana += bloque
+        if formato == 'json':
+            encontrado = _LIMITE_JSON.search(ventana)
+            if encontrado:
+                return posicion + encontrado.start(1)
+        else:
+            fin_linea = ventana.find(b'\n')
+            if fin_linea >= 0:
+                return posicion + fin_linea + 1
+        ventana = ventana[-16:] # Un límite puede quedar partido entre dos lecturas.
+        posicion = archivo.tell() - len(ventana)
+
+def planificar(ruta, tamanio_bloque=TAMANIO_BLOQUE):
+    """Devuelve los cortes [(desde, hasta)] de un archivo en bloques de más o menos 'tamanio_bloque' bytes."""
+    formato = formato_de(ruta)
+    tamanio = os.path.getsize(ruta)
+    inicios = [0]
+    with open(ruta, 'rb') as archivo:
+        while inicios[-1] + tamanio_bloque < tamanio:
+            limite = _proximo_limite(archivo, inicios[-1] + tamanio_bloque, formato)
+            if limite is None or limite >= tamanio:
+                break
+            inicios.append(limite)
+    return list(zip(inicios, inicios[1:] + [tamanio]))
+
+# Trabajo de cada Proceso
+
+def _paises_del_bloque(texto, primero, ultimo):
+    # Decodifica los objetos de un trozo de array JSON y comprueba que el trozo esté alineado.
+    decodificador = json.JSONDecoder()
+    posicion, largo = 0, len(texto)
+
+    def saltar_espacios(posicion):
+        while posicion < largo and texto[posicion] in _ESPACIOS:
+            posicion += 1
+        return posicion
+
+    posicion = saltar_espacios(posicion)
+    if primero:
+        if texto[posicion:posicion + 1] != '[':
+            raise ValueError("El archivo JSON no es un array.")
+        posicion = saltar_espacios(posicion + 1)
+    while posicion < largo:
+        if texto[posicion] == ']':
+            if not ultimo or saltar_espacios(posicion + 1) != largo:
+                raise BloqueDesalineado()
+            return
+        if texto[posicion] != '{':
+            raise BloqueDesalineado()
+        try:
+            pais, posicion = decodificador.raw_decode(texto, posicion)
+        except ValueError: # Objeto cortado: el bloque termina dentro de un elemento.
+            raise BloqueDesalineado()
+        yield pais
+        posicion = saltar_espacios(posicion)
+        if posicion < largo and texto[posicion] == ',':
+            posicion = saltar_espacios(posicion + 1)
+        elif posicion == largo or texto[posicion] != ']':
+            raise BloqueDesalineado() # Un bloque intermedio termina siempre después de una coma.
+    if ultimo:
+        raise ValueError("El array JSON no está cerrado.")
+
+def _filas_del_bloque(datos, formato, continente, primero, ultimo):
+    # Filas de salida (con la columna 'continente') de un bloque de bytes ya leído.
+    if formato == 'json':
+        for pais in _paises_del_bloque(datos.decode('utf-8'), primero, ultimo):
+            fila = fila_desde_pais(pais)
+            yield [fila[campo] for campo in CAMPOS_CSV] + [continente]
+        return
+    if datos.count(b'"') % 2: # Con comillas impares, el corte quedó dentro de un campo.
+        raise BloqueDesalineado()
+    lector = csv.reader(io.StringIO(datos.decode('utf-8'), newline=''))
+    if primero:
+        next(lector, None) # Cabecera.
+    for fila in lector:
+        yield fila + [continente]
+
+def clave_de_orden(columna):
+    """Clave para ordenar filas de salida (listas) por una columna; los números se comparan como números."""
+    posicion = CABECERA.index(columna)
+    if columna in COLUMNAS_NUMERICAS:
+        return lambda fila: float(fila[posicion] or 0)
+    return lambda fila: fila[posicion].casefold()
+
+def procesar_bloque(tarea):
+    """
+    Transforma un bloque y escribe su partición. 'tarea' es (ruta, formato, continente,
+    desde, hasta, primero, ultimo, ruta_particion, orden). Devuelve la cantidad de filas,
+    o None si el bloque no estaba alineado (la partición no sirve).
+    """
+    ruta, formato, continente, desde, hasta, primero, ultimo, ruta_particion, orden = tarea
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(desde)
+        datos = archivo.read(hasta - desde)
+    try:
+        filas = list(_filas_del_bloque(datos, formato, continente, primero, ultimo))
+    except BloqueDesalineado:
+        return None
+    if orden is not None:
+        columna, descendente = orden
+        filas.sort(key=clave_de_orden(columna), reverse=descendente)
+    with open(ruta_particion, 'w', newline='', encoding='utf-8') as salida:
+        csv.writer(salida).writerows(filas)
+    return len(filas)
+
+# Unión
+
+def _unir_particiones(particiones, archivo_salida, orden):
+    # Escribe la cabecera y las particiones en orden; con 'orden', mezcla de k vías. Quien
+    # lea Todos.csv nunca ve un archivo a medias y, si algo falla, no queda el temporal.
+    with escritura_atomica(archivo_salida, newline='', encoding='utf-8', buffering=TAMANIO_BUFFER_ESCRITURA) as salida:
+        csv.writer(salida).writerow(CABECERA)
+        if orden is None: # Las particiones son tramos consecutivos de la entrada: basta con concatenarlas.
+            for ruta in particiones:
+                with open(ruta, 'r', newline='', encoding='utf-8') as entrada:
+                    shutil.copyfileobj(entrada, salida, TAMANIO_BUFFER_ESCRITURA)
+        else:
+            entradas = [open(ruta, 'r', newline='', encoding='utf-8') for ruta in particiones]
+            try:
+                columna, descendente = orden
+                csv.writer(salida).writerows(heapq.merge(*map(csv.reader, entradas), key=clave_de_orden(columna),
+                                                         reverse=descendente))
+            finally:
+                for entrada in entradas:
+                    entrada.close()
+
+def ingerir_en_paralelo(entradas, archivo_salida, procesos=None, tamanio_bloque=TAMANIO_BLOQUE, orden=None):
+    """
+    Une 'entradas' (archivos .json con la forma de la API o .csv por continente; el
+    continente es el nombre del archivo) en 'archivo_salida', con la misma forma que
+    Todos.csv. Los archivos se toman en orden alfabético, como en unir_csvs_en_uno.
+    'procesos' es la cantidad de procesos (por defecto, uno por núcleo; con 1 no se crea
+    el pool). 'orden' es (columna, descendente) o None para respetar el orden de entrada.
+    Devuelve la cantidad de filas escritas. No escribe el snapshot binario: lo regenera
+    la primera carga.
+    """
+    entradas = sorted(entradas, key=os.path.basename)
+    procesos = procesos or os.cpu_count() or 1
+    if orden is not None and orden[0] not in CABECERA:
+        raise ValueError(f"Columna desconocida para ordenar: {orden[0]}")
+    formatos = [formato_de(ruta) for ruta in entradas] # Valida las extensiones antes de empezar.
+
+    with tramo("ingesta_paralela", procesos=procesos) as medicion:
+        carpeta = tempfile.mkdtemp(prefix="particiones_", dir=os.path.dirname(os.path.abspath(archivo_salida)))
+        try:
+            # 1. Cortar Cada Archivo en Bloques
+            tareas = [] # Una por bloque, en el orden de la salida.
+            for numero, (ruta, formato) in enumerate(zip(entradas, formatos)):
+                continente = os.path.splitext(os.path.basename(ruta))[0]
+                cortes = planificar(ruta, tamanio_bloque)
+                for parte, (desde, hasta) in enumerate(cortes):
+                    particion = os.path.join(carpeta, f"{numero:05d}_{parte:05d}.csv")
+                    tareas.append((ruta, formato, continente, desde, hasta, parte == 0, parte == len(cortes) - 1,
+                                   particion, orden))
+
+            # 2. Transformar los Bloques en Paralelo
+            if procesos == 1:
+                cantidades = list(map(procesar_bloque, tareas))
+            else:
+                with ProcessPoolExecutor(max_workers=procesos) as pool:
+                    cantidades = list(pool.map(procesar_bloque, tareas, chunksize=max(1, len(tareas) // (4 * procesos))))
+
+            # 3. Rehacer Entero Cada Archivo con Algún Corte Mal Ubicado
+            desalineados = {tarea[0] for tarea, cantidad in zip(tareas, cantidades) if cantidad is None}
+            particiones, total = [], 0
+            for tarea, cantidad in zip(tareas, cantidades):
+                ruta = tarea[0]
+                if ruta in desalineados:
+                    if not tarea[5]: # Solo el primer bloque del archivo lo procesa entero.
+                        continue
+                    completo = (ruta, tarea[1], tarea[2], 0, os.path.getsize(ruta), True, True, tarea[7], orden)
+                    cantidad = procesar_bloque(completo)
+                    if cantidad is None:
+                        raise ValueError(f"No se pudo leer '{ruta}': el archivo está mal formado.")
+                particiones.append(tarea[7])
+                total += cantidad
+
+            # 4. Unir las Particiones en Orden
+            _unir_particiones(particiones, archivo_salida, orden)
+            medicion.contar(escaneadas=total, devueltas=total)
+        finally:
+            shutil.rmtree(carpeta, ignore_errors=True)
+    return total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ingestaParalela",
+                                     description="Arma Todos.csv desde archivos JSON o CSV grandes usando varios procesos.")
+    parser.add_argument("entradas", nargs='+', help="Archivos .json (array de la API) o .csv por continente.")
+    parser.add_argument("--salida", default=os.path.join("Continentes", "Todos.csv"), help="CSV unido a escribir.")
+    parser.add_argument("--procesos", type=int, help="Cantidad de procesos (por defecto, uno por núcleo).")
+    parser.add_argument("--bloque-mib", type=float, default=TAMANIO_BLOQUE / 2**20, help="Tamaño de cada bloque en MiB.")
+    parser.add_argument("--orden", type=leer_orden, metavar="COLUMNA[:desc]", help="Ordenar la salida por esta columna.")
+    argumentos = parser.parse_args(argv)
+    try:
+        total = ingerir_en_paralelo(argumentos.entradas, argumentos.salida, argumentos.procesos,
+                                    int(argumentos.bloque_mib * 2**20), argumentos.orden)
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"Error: {error}\n")
+    print(f"¡Éxito! {total} filas escritas en '{argumentos.salida}'.")
+
+if __name__ == "__main__":
+    main()
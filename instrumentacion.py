@@ -0,0 +1,194 @@
+# instrumentacion.py
+# Este módulo mide en qué se va el tiempo del visor: cada operación importante (carga,
+# búsqueda, filtro, orden, estadísticas, dibujo de la tabla) abre un tramo que guarda su
+# duración, su hilo y contadores como filas revisadas y filas devueltas. Se activa con la
+# variable de entorno PAISES_DIAGNOSTICO=1 (o =perfil para correr además cProfile) o con
+# la opción --diagnostico de main.py. Los tramos se exportan en JSON y en el formato de
+# trazas de Chrome (chrome://tracing o https://ui.perfetto.dev).
+# Desactivado, tramo() devuelve siempre el mismo objeto vacío: no mide ni guarda nada.
+# No depende de tkinter.
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+
+VARIABLE_ENTORNO = "PAISES_DIAGNOSTICO" # "1" activa los tramos; "perfil" además cProfile.
+CARPETA_SALIDA = "diagnostico" # Donde se escriben las exportaciones al terminar.
+MAX_TRAMOS = 5000 # Se conservan solo los últimos tramos terminados.
+
+activa = False
+_tramos = deque(maxlen=MAX_TRAMOS) # Tramos terminados, del más viejo al más nuevo.
+_perfil = None # cProfile.Profile mientras se perfila.
+_inicio_ns = time.perf_counter_ns() # Origen de los tiempos de la traza.
+_exportar_al_salir = False
+
+class _TramoNulo:
+    """Lo que devuelve tramo() con la instrumentación apagada: no hace nada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+    def contar(self, **contadores):
+        pass
+
+TRAMO_NULO = _TramoNulo()
+
+class Tramo:
+    """Una operación medida: nombre, datos descriptivos, contadores, hilo, inicio y duración (ns)."""
+    __slots__ = ('nombre', 'datos', 'hilo', 'nombre_hilo', 'inicio', 'duracion')
+
+    def __init__(self, nombre, datos):
+        self.nombre = nombre
+        self.datos = datos
+        self.duracion = None
+
+    def __enter__(self):
+        hilo = threading.current_thread()
+        self.hilo, self.nombre_hilo = hilo.ident, hilo.name
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo, *_):
+        self.duracion = time.perf_counter_ns() - self.inicio
+        if tipo is not None:
+            self.datos['error'] = tipo.__name__
+        _tramos.append(self)
+        return False
+
+    def contar(self, **contadores):
+        """Suma contadores al tramo, por ejemplo contar(escaneadas=1000, devueltas=12)."""
+        for nombre, cantidad in contadores.items():
+            self.datos[nombre] = self.datos.get(nombre, 0) + cantidad
+
+    @property
+    def milisegundos(self):
+        return self.duracion / 1e6
+
+    def como_diccionario(self):
+        return {'nombre': self.nombre, 'inicio_ms': (self.inicio - _inicio_ns) / 1e6, 'ms': self.milisegundos,
+                'hilo': self.nombre_hilo, **self.datos}
+
+def tramo(nombre, **datos):
+    """
+    Mide un bloque: 'with tramo("filtrar", continente=c) as t: ... t.contar(devueltas=n)'.
+    Con la instrumentación apagada devuelve TRAMO_NULO.
+    """
+    if not activa:
+        return TRAMO_NULO
+    return Tramo(nombre, datos)
+
+# Activación
+
+def activar(perfil=False, exportar_al_salir=True):
+    """
+    Empieza a registrar tramos. Con perfil=True corre además cProfile (solo ve el hilo
+    que lo activa, normalmente el de la interfaz). Con exportar_al_salir=True los
+    resultados se escriben en CARPETA_SALIDA al terminar el programa.
+    """
+    global activa, _perfil, _exportar_al_salir
+    activa = True
+    if perfil and _perfil is None:
+        import cProfile # Solo hace falta al perfilar.
+        _perfil = cProfile.Profile()
+        _perfil.enable()
+    if exportar_al_salir and not _exportar_al_salir:
+        _exportar_al_salir = True
+        atexit.register(_exportar_al_terminar)
+
+def desactivar():
+    """Deja de registrar tramos y detiene cProfile (lo ya medido se conserva)."""
+    global activa
+    activa = False
+    if _perfil is not None:
+        _perfil.disable()
+
+def activar_desde_entorno():
+    """Activa la instrumentación si la variable de entorno lo pide. Devuelve True si quedó activa."""
+    valor = os.environ.get(VARIABLE_ENTORNO, "").strip().lower()
+    if valor in ("", "0", "no", "false"):
+        return activa
+    activar(perfil=valor == "perfil")
+    return True
+
+def limpiar():
+    """Olvida los tramos registrados."""
+    _tramos.clear()
+
+# Consultas
+
+def ultimos(cantidad=None):
+    """Los últimos tramos terminados, del más nuevo al más viejo."""
+    tramos = list(_tramos)
+    tramos.reverse()
+    return tramos if cantidad is None else tramos[:cantidad]
+
+def resumen():
+    """Por nombre de tramo: cantidad, tiempo total, promedio y máximo (ms) y la suma de sus contadores."""
+    por_nombre = {}
+    for t in list(_tramos):
+        datos = por_nombre.setdefault(t.nombre, {'cantidad': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        datos['cantidad'] += 1
+        datos['total_ms'] += t.milisegundos
+        datos['max_ms'] = max(datos['max_ms'], t.milisegundos)
+        for clave, valor in t.datos.items():
+            if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                datos[clave] = datos.get(clave, 0) + valor
+    for datos in por_nombre.values():
+        datos['promedio_ms'] = datos['total_ms'] / datos['cantidad']
+    return por_nombre
+
+# Exportación
+
+def exportar_json(ruta):
+    """Escribe los tramos y el resumen en JSON."""
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({'tramos': [t.como_diccionario() for t in list(_tramos)], 'resumen': resumen()},
+                  archivo, ensure_ascii=False, indent=1, default=str)
+    return ruta
+
+def exportar_chrome(ruta):
+    """Escribe los tramos en el formato de trazas de Chrome (eventos completos 'X', en microsegundos)."""
+    proceso = os.getpid()
+    eventos, hilos = [], {}
+    for t in list(_tramos):
+        hilos[t.hilo] = t.nombre_hilo
+        eventos.append({'name': t.nombre, 'ph': 'X', 'pid': proceso, 'tid': t.hilo,
+                        'ts': (t.inicio - _inicio_ns) / 1000, 'dur': t.duracion / 1000, 'args': t.datos})
+    for hilo, nombre in hilos.items(): # Nombres legibles para cada fila de la traza.
+        eventos.append({'name': 'thread_name', 'ph': 'M', 'pid': proceso, 'tid': hilo, 'args': {'name': nombre}})
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, archivo, ensure_ascii=False, default=str)
+    return ruta
+
+def guardar_perfil(ruta):
+    """Guarda lo medido por cProfile (para abrir con pstats o snakeviz). Devuelve None si no se perfiló."""
+    if _perfil is None:
+        return None
+    _perfil.create_stats()
+    _perfil.dump_stats(ruta)
+    return ruta
+
+def exportar(carpeta=CARPETA_SALIDA):
+    """Escribe en 'carpeta' el JSON, la traza de Chrome y, si hubo, el perfil. Devuelve las rutas."""
+    os.makedirs(carpeta, exist_ok=True)
+    rutas = [exportar_json(os.path.join(carpeta, "tramos.json")),
+             exportar_chrome(os.path.join(carpeta, "traza_chrome.json"))]
+    perfil = guardar_perfil(os.path.join(carpeta, "perfil.pstats"))
+    if perfil is not None:
+        rutas.append(perfil)
+    return rutas
+
+def _exportar_al_terminar():
+    if _tramos or _perfil is not None:
+        if _perfil is not None:
+            _perfil.disable()
+        print(f"Diagnóstico guardado en: {', '.join(exportar())}")
+
+activar_desde_entorno()
@@ -4,49 +4,130 @@
 
 import tkinter as tk # Importa la biblioteca principal de Tkinter.
 from tkinter import ttk, messagebox # Importa widgets temáticos (ttk) y cuadros de diálogo.
-import csv # Importa el módulo para leer archivos CSV.
 import os # Importa el módulo para interactuar con el sistema operativo (e.g., rutas de archivos).
-from collections import Counter # Importa la clase Counter para realizar conteos (usada en estadísticas).
+from functools import partial # Fija argumentos de las funciones que se mandan al hilo de fondo.
+from datosPaises import DatasetPaises, rangos_de_orden # Importa el almacenamiento por columnas de los países.
+from snapshotPaises import preparar_dataset, cerrar_snapshot, escribir_snapshot, snapshot_vigente # Carga desde el snapshot binario (o el CSV) y arma los índices.
+from busquedaPaises import BusquedaIncremental, normalizar # Búsqueda que refina los resultados anteriores al seguir escribiendo.
+from estadisticasPaises import TOP_N, METRICAS # Rankings de la ventana de estadísticas.
+from tareasFondo import EjecutorTareas # Ejecuta la carga, el filtro, el orden y las estadísticas fuera del hilo de Tk.
+from tablaVirtual import TablaVirtual # Tabla que solo materializa las filas visibles.
+import instrumentacion # Tramos de tiempo y contadores para el panel de diagnóstico.
+from instrumentacion import tramo
+
+RETARDO_BUSQUEDA_MS = 150 # Pausa de escritura (ms) antes de lanzar la búsqueda en vivo.
+COLUMNAS_VISIBLES = ["nombre_comun_es", "poblacion", "area", "continente"] # Columnas de la tabla principal.
+UMBRAL_TABLA_VIRTUAL = 5000 # A partir de esta cantidad de países se usa la tabla virtual.
+INTERVALO_DIAGNOSTICO_MS = 1000 # Cada cuánto se refresca el panel de diagnóstico abierto.
+TRAMOS_EN_PANEL = 200 # Cantidad de tramos recientes que muestra el panel.
+ENCABEZADOS = {"nombre_comun_es": "Nombre", "poblacion": "Población", "area": "Superficie", "continente": "Continente"}
+MAX_CRITERIOS_ORDEN = 3 # Cantidad máxima de claves al ordenar con clics en los encabezados.
 
 # Variables Globales
 # Estas variables son accesibles y modificables desde cualquier función.
-dataset_paises = [] # Lista principal que almacena todos los datos de los países cargados del CSV
+dataset_paises = None # Dataset por columnas con todos los países cargados del CSV.
+orden_actual = None # Índices de fila en el orden elegido (None = orden original del CSV).
+rangos_orden = None # Posición de cada fila dentro de orden_actual (para ordenar resultados de búsqueda).
+criterios_orden = [] # Claves del orden actual [(columna, descendente)], de la principal a la secundaria.
 texto_busqueda_var = None # Variable de control para el campo de búsqueda rápida.
-tree = None # Referencia al widget de tabla (Treeview) para manipular su contenido.
+tree = None # Referencia a la tabla (Treeview, o TablaVirtual con datasets grandes) para manipular su contenido.
 ventana = None # Referencia a la ventana principal de la aplicación.
 combo_ordenar = None # Referencia al menú desplegable para ordenar.
+estado_busqueda_var = None # Texto de la línea de estado bajo el campo de búsqueda.
+busqueda_incremental = None # Recuerda la última búsqueda para refinarla.
+busqueda_pendiente = None # Identificador del after() de la búsqueda en vivo programada.
+items_por_tabla = {} # Treeview -> (dataset, columnas) cuyos ítems ya están creados (un ítem fijo por país).
+ventana_estadisticas = None # Contenido de la ventana de estadísticas abierta (se refresca al cambiar la vista).
+ejecutor = None # Ejecutor de tareas de fondo (None = se ejecutan en el momento, sin hilos).
+barra_progreso = None # Barra de progreso de la carga y de las tareas de fondo.
+barra_vertical = None # Barra de desplazamiento de la tabla (la usa la tabla virtual).
+cargando = False # True mientras se cargan los datos en segundo plano.
+ejecutor_refresco = None # Ejecutor aparte para la actualización desde la red (no demora filtros ni órdenes).
+funcion_actualizar = None # Descarga y arma Todos.csv; devuelve True si cambió (la pasa main.py).
+refrescar_al_cargar = False # Si hay que actualizar los datos en segundo plano después de la primera carga.
+estado_datos_var = None # Texto bajo el botón "Actualizar Datos".
+ruta_datos = os.path.join("Continentes", "Todos.csv") # Archivo que se muestra (y se recarga al actualizar).
+medir_arranque = False # Con True se informan los hitos del arranque y la ventana se cierra sola.
+ventana_diagnostico = None # Panel de diagnóstico abierto: {'ventana', 'resumen', 'tramos'} (se refresca solo).
 
 # Funciones de Datos y Lógica
-#Carga los datos del archivo CSV en la variable global 'dataset_paises'.
-#Cada país se almacena como un diccionario.
-def cargar_datos_en_memoria(archivo_csv):
-    dataset = [] # Inicializa una lista vacía para los datos.
-    try: # Inicia el bloque de manejo de excepciones.
-        if not os.path.exists(archivo_csv): # Verifica si el archivo existe.
-            # Lanza un error si el archivo no existe.
-            raise FileNotFoundError
-        with open(archivo_csv, mode='r', encoding='utf-8') as archivo: # Abre el archivo.
-            # El DictReader lee cada fila como un diccionario, usando la cabecera como claves.
-            lector_csv = csv.DictReader(archivo) # Crea un lector que trata las filas como diccionarios.
-            for fila in lector_csv: # Itera sobre cada fila del CSV.
-                # Intenta convertir a número los campos 'poblacion' y 'area'
-                dataset.append(fila) # Agrega la fila (diccionario de país) a la lista.
-        return dataset # Devuelve la lista cargada.
-    except FileNotFoundError: # Captura si el archivo no existe.
-        messagebox.showerror("Error", f"No se encontró el archivo de datos:\n{archivo_csv}") # Muestra un error.
-        return None
-    except Exception as e: # Captura cualquier otro error de lectura.
-        messagebox.showerror("Error", f"Ocurrió un error al leer el archivo: {e}")
+# Los datos se cargan con cargar_en_segundo_plano (preparar_dataset en el hilo de fondo).
+def en_segundo_plano(funcion, *argumentos, grupo=None, al_terminar=None, al_fallar=None, al_progresar=None, con_tarea=False):
+    """
+    Ejecuta la función en el hilo de fondo y llama a 'al_terminar' (o 'al_fallar') en el
+    hilo de Tk. Sin ejecutor (por ejemplo, antes de iniciar la interfaz) la ejecuta en el momento.
+    """
+    if ejecutor is not None:
+        return ejecutor.enviar(funcion, *argumentos, grupo=grupo, al_terminar=al_terminar,
+                               al_fallar=al_fallar, al_progresar=al_progresar, con_tarea=con_tarea)
+    try:
+        resultado = funcion(*argumentos, None) if con_tarea else funcion(*argumentos)
+    except Exception as error:
+        if al_fallar is None:
+            raise
+        al_fallar(error)
         return None
+    if al_terminar is not None:
+        al_terminar(resultado)
+    return None
+
+def cancelar_tareas(grupo):
+    """Cancela la tarea de fondo del grupo (si la nueva acción del usuario la deja sin sentido)."""
+    if ejecutor is not None:
+        ejecutor.cancelar_grupo(grupo)
+
+def indicar_actividad(ocupado):
+    """Mueve la barra de progreso mientras haya tareas de fondo (la carga usa su propio avance)."""
+    if barra_progreso is None or cargando:
+        return
+    if ocupado:
+        barra_progreso.configure(mode="indeterminate")
+        barra_progreso.start(15)
+    else:
+        barra_progreso.stop()
+        barra_progreso.configure(mode="determinate", value=0)
+
+def mostrar_datos_en_treeview(tree, dataset, columnas, indices=None):
+    """
+    Muestra en el Treeview las filas del dataset indicadas por 'indices' (todas si es None).
+    Cada país tiene un ítem fijo (su iid es el índice de fila) que se crea una sola vez;
+    después, ordenar o filtrar solo reordena, oculta y vuelve a mostrar esos ítems,
+    conservando la selección y la posición de desplazamiento.
+    """
+    with tramo("dibujar", tabla="virtual" if isinstance(tree, TablaVirtual) else "treeview") as medicion:
+        medicion.contar(devueltas=len(dataset) if indices is None else len(indices))
+        if isinstance(tree, TablaVirtual): # La tabla virtual solo dibuja las filas visibles.
+            tree.mostrar(dataset, indices)
+            return
 
-def mostrar_datos_en_treeview(tree, dataset, columnas):
-    """Limpia el Treeview y lo llena con los datos del dataset filtrado/ordenado."""
+        anterior = items_por_tabla.get(tree)
+        if not dataset: # Si el dataset está vacío, borra todo y sale de la función.
+            borrar_items_de_tabla(tree)
+            return
+
+        # 1. Crear los Ítems una Sola Vez por Dataset
+        if anterior != (dataset, columnas):
+            borrar_items_de_tabla(tree)
+            for indice in range(len(dataset)): # Inserta cada país con un identificador estable.
+                tree.insert("", "end", iid=str(indice), values=dataset.valores_fila(indice, columnas))
+            items_por_tabla[tree] = (dataset, columnas)
+            medicion.contar(insertadas=len(dataset))
+
+        # 2. Reordenar y Ocultar con una Sola Llamada
+        if indices is None:
+            indices = range(len(dataset))
+        posicion = tree.yview()[0] # Guarda el desplazamiento actual.
+        # set_children deja como hijos visibles exactamente estos ítems, en este orden,
+        # y desengancha (detach) el resto sin destruirlos.
+        tree.set_children("", *map(str, indices))
+        tree.yview_moveto(posicion)
+
+def borrar_items_de_tabla(tree):
+    """Destruye todos los ítems del Treeview, incluidos los ocultos con detach."""
+    anterior = items_por_tabla.pop(tree, None)
+    if anterior is not None:
+        tree.set_children("", *map(str, range(len(anterior[0])))) # Reengancha los ocultos para poder borrarlos.
     tree.delete(*tree.get_children()) # Borra todas las filas del Treeview.
-    if not dataset: # Si el dataset está vacío,
-        return # sale de la función.
-    for fila_dict in dataset: # Itera sobre los países del dataset.
-        valores = [fila_dict.get(col, '') for col in columnas] # Prepara la lista de valores para la fila.
-        tree.insert("", "end", values=valores) # Inserta la nueva fila en la tabla.
 
 # Función de Ordenamiento
 def ordenar_desde_controles(es_descendente):
@@ -64,56 +145,166 @@ def ordenar_desde_controles(es_descendente):
         return
         
     columna_a_ordenar = mapa_columnas[opcion_elegida] # Obtiene la clave interna para ordenar.
-    columnas_visibles = list(mapa_columnas.values()) # Obtiene la lista de claves para mostrar.
-    
-    # 1. Función Clave para Ordenar (maneja números y texto)
-    def clave_orden(item): # Función para determinar cómo se comparan los elementos.
-        valor = item.get(columna_a_ordenar, '')
-        try: # Intenta convertir a número (para ordenar por valor numérico).
-            return float(valor)
-        except (ValueError, TypeError): # Si no es numérico, lo trata como texto.
-            return str(valor).lower()
-            
-    # 2. Ordena el dataset_paises Global
-    dataset_paises.sort(key=clave_orden, reverse=es_descendente) # Ordena el dataset usando la clave y la dirección (asc/desc).
-    
-    # 3. Actualiza la Vista (Treeview)
+    aplicar_orden([(columna_a_ordenar, es_descendente)]) # Los botones ordenan por una sola clave.
+
+def ordenar_por_encabezado(columna):
+    """
+    Clic en un encabezado de la tabla: ordena por esa columna y otro clic invierte el sentido.
+    Las columnas elegidas antes quedan como claves secundarias, así que hacer clic en
+    Población y después en Continente ordena por continente y, dentro de él, por población.
+    """
+    if criterios_orden and criterios_orden[0][0] == columna:
+        nuevos = [(columna, not criterios_orden[0][1])] + criterios_orden[1:]
+    else:
+        nuevos = [(columna, False)] + [c for c in criterios_orden if c[0] != columna]
+    aplicar_orden(nuevos[:MAX_CRITERIOS_ORDEN])
+
+def aplicar_orden(criterios):
+    """
+    Aplica un orden de una o varias claves y actualiza la vista. Con una sola clave se usa
+    la permutación calculada al cargar (el descendente es la misma recorrida al revés),
+    así que cambiar de orden solo cuesta volver a dibujar. El orden por varias claves
+    se calcula en el hilo de fondo y reemplaza a uno anterior que no haya terminado.
+    """
+    global criterios_orden
+
+    # 1. Obtener el Orden sin Modificar los Datos
+    criterios_orden = criterios
+    actualizar_encabezados()
+    if len(criterios) == 1:
+        cancelar_tareas("orden") # Un orden por varias claves pendiente ya no corresponde.
+        columna, descendente = criterios[0]
+        orden_listo((dataset_paises.orden(columna, descendente),
+                     dataset_paises.rangos(columna, descendente))) # Posiciones, para ordenar las búsquedas.
+    else:
+        dataset = dataset_paises
+        en_segundo_plano(ordenar_por_criterios, dataset, criterios, grupo="orden",
+                         al_terminar=lambda resultado: orden_listo(resultado) if dataset is dataset_paises else None, # Descarta órdenes de un dataset anterior.
+                         al_fallar=lambda e: messagebox.showerror("Error", f"Ocurrió un error al ordenar: {e}"))
+
+def ordenar_por_criterios(dataset, criterios):
+    """Orden estable por varias claves y la posición de cada fila en él (corre en el hilo de fondo)."""
+    orden = dataset.ordenar_multiple(criterios)
+    return orden, rangos_de_orden(orden)
+
+def orden_listo(resultado):
+    """Recibe (orden, rangos) y vuelve a mostrar la búsqueda o todo el dataset en ese orden."""
+    global orden_actual, rangos_orden
+    orden_actual, rangos_orden = resultado
+    if busqueda_incremental is not None:
+        busqueda_incremental.reiniciar() # Los resultados guardados tenían el orden anterior.
+
+    # Actualiza la Vista (Treeview)
     if texto_busqueda_var and texto_busqueda_var.get(): # Verifica si hay un filtro de búsqueda aplicado.
           # Si hay texto de búsqueda, aplicamos el filtro de nuevo para mostrar el resultado ordenado
-          buscar_pais(tree, dataset_paises, columnas_visibles, texto_busqueda_var) # Si hay búsqueda, la aplica al dataset ordenado.
+          buscar_pais(tree, dataset_paises, COLUMNAS_VISIBLES, texto_busqueda_var) # Si hay búsqueda, la aplica al dataset ordenado.
     else:
           # Si no hay texto de búsqueda, mostramos todo el dataset ordenado
-          mostrar_datos_en_treeview(tree, dataset_paises, columnas_visibles) # Si no hay búsqueda, muestra todo el dataset ordenado.
+          mostrar_datos_en_treeview(tree, dataset_paises, COLUMNAS_VISIBLES, orden_actual) # Si no hay búsqueda, muestra todo el dataset ordenado.
+
+def actualizar_encabezados():
+    """Marca en los encabezados las columnas del orden actual (▲ ascendente, ▼ descendente)."""
+    widget = tree.tree if isinstance(tree, TablaVirtual) else tree
+    for columna, titulo in ENCABEZADOS.items():
+        marca = ""
+        for posicion, (columna_orden, descendente) in enumerate(criterios_orden):
+            if columna_orden == columna:
+                marca = " ▼" if descendente else " ▲"
+                if len(criterios_orden) > 1: # Con varias claves se indica su prioridad.
+                    marca += str(posicion + 1)
+        widget.heading(columna, text=titulo + marca)
 
 # Función de Búsqueda
 def buscar_pais(tree, dataset, columnas_visibles, texto_busqueda_var):
-    #Filtra el dataset de países y actualiza el Treeview
-    #para mostrar solo aquellos cuyo nombre comienza con el texto buscado.
+    #Filtra el dataset de países y actualiza el Treeview para mostrar solo aquellos
+    #cuyo nombre común, nombre oficial o capital comienza con el texto buscado.
+    #Usa el índice de prefijos, así que no distingue mayúsculas ni tildes ("peru" encuentra "Perú").
  
     texto_busqueda = texto_busqueda_var.get().strip().lower() # Obtiene el texto de búsqueda y lo normaliza.
+    cancelar_tareas("filtro") # Un filtro que todavía no terminó quedaría encima de la búsqueda.
 
     if not texto_busqueda: # Si la búsqueda está vacía,
         # Si la búsqueda está vacía, muestra todos los datos
-        mostrar_datos_en_treeview(tree, dataset, columnas_visibles) # Muestra todo el dataset.
+        mostrar_estado("")
+        if busqueda_incremental is not None:
+            busqueda_incremental.reiniciar()
+        mostrar_datos_en_treeview(tree, dataset, columnas_visibles, orden_actual) # Muestra todo el dataset.
+        registrar_vista(dataset, None, None) # Estadísticas globales.
         return
 
-    # Filtra los Países
-    resultados = [ # Filtra los países.
-        pais for pais in dataset 
-        if pais.get('nombre_comun_es', '').lower().startswith(texto_busqueda) # Compara si el nombre empieza por el texto buscado.
-    ]
+    # Filtra los Países (respetando el orden elegido)
+    if busqueda_incremental is not None and busqueda_incremental.dataset is dataset:
+        resultados = busqueda_incremental.buscar(texto_busqueda, rangos=rangos_orden) # Refina la búsqueda anterior si puede.
+    else:
+        resultados = dataset.buscar_prefijo(texto_busqueda, rangos=rangos_orden) # Índices cuyo texto empieza por el buscado.
 
-    if not resultados and texto_busqueda: # Si no hay resultados y la búsqueda no está vacía.
-        messagebox.showinfo("Búsqueda", f"No se encontraron países que comiencen con '{texto_busqueda}'.")
+    if not resultados: # Si no hay resultados, lo avisamos en la línea de estado (sin bloquear).
+        mostrar_estado(f"No se encontraron países que comiencen con '{texto_busqueda}'.")
+    else:
+        mostrar_estado(f"{len(resultados)} países encontrados.")
     
     # Muestra los resultados en el Treeview
-    mostrar_datos_en_treeview(tree, resultados, columnas_visibles) # Muestra los resultados en la tabla.
+    mostrar_datos_en_treeview(tree, dataset, columnas_visibles, resultados) # Muestra los resultados en la tabla.
+    registrar_vista(dataset, resultados, ('busqueda', normalizar(texto_busqueda))) # Estadísticas de lo encontrado.
+
+def registrar_vista(dataset, indices, clave):
+    """
+    Avisa al motor de estadísticas qué filas quedaron visibles (None = todas) y con qué
+    estado ('clave'). Los agregados se actualizan con la diferencia de filas recién cuando
+    se piden: en el hilo de fondo si la ventana de estadísticas está abierta, o al abrirla.
+    """
+    if not dataset:
+        return
+    dataset.motor_estadisticas().actualizar(indices, clave) # Solo registra las filas; no calcula.
+    if ventana_estadisticas is not None and dataset is dataset_paises:
+        en_segundo_plano(calcular_estadisticas, dataset.motor_estadisticas(), grupo="estadisticas",
+                         al_terminar=refrescar_ventana_estadisticas)
+
+def mostrar_estado(mensaje):
+    """Muestra un mensaje en la línea de estado de la búsqueda."""
+    if estado_busqueda_var is not None:
+        estado_busqueda_var.set(mensaje)
+
+# Búsqueda en Vivo
+def programar_busqueda(*_):
+    """
+    Se ejecuta con cada cambio del campo de búsqueda. Cancela la búsqueda que estaba
+    pendiente y programa una nueva para cuando el usuario haga una pausa al escribir.
+    """
+    global busqueda_pendiente
+    cancelar_busqueda_pendiente()
+    busqueda_pendiente = ventana.after(RETARDO_BUSQUEDA_MS, ejecutar_busqueda_pendiente)
+
+def cancelar_busqueda_pendiente():
+    """Cancela la búsqueda en vivo programada, si había una."""
+    global busqueda_pendiente
+    if busqueda_pendiente is not None:
+        ventana.after_cancel(busqueda_pendiente)
+        busqueda_pendiente = None
+
+def ejecutar_busqueda_pendiente():
+    """Ejecuta la búsqueda en vivo programada por programar_busqueda."""
+    global busqueda_pendiente
+    busqueda_pendiente = None
+    buscar_pais(tree, dataset_paises, COLUMNAS_VISIBLES, texto_busqueda_var)
+
+def buscar_ahora():
+    """Botón Buscar: ejecuta la búsqueda sin esperar la pausa de escritura."""
+    cancelar_busqueda_pendiente()
+    buscar_pais(tree, dataset_paises, COLUMNAS_VISIBLES, texto_busqueda_var)
+
+def mostrar_todos():
+    """Botón Mostrar Todos: borra la búsqueda y muestra todo el dataset en el orden elegido."""
+    texto_busqueda_var.set("")
+    cancelar_busqueda_pendiente() # El set("") programó una búsqueda; la resolvemos ya.
+    buscar_pais(tree, dataset_paises, COLUMNAS_VISIBLES, texto_busqueda_var)
 
 # Función de Filtrado
 def aplicar_filtro(tree, dataset, columnas_visibles, ventana_filtro,
                    continente_var, min_pob_var, max_pob_var, min_area_var, max_area_var): # Función que aplica los criterios de filtrado.
     """
     Filtra el dataset de países basándose en los criterios de Continente, Población y Superficie.
+    El filtrado corre en el hilo de fondo y filtro_listo muestra el resultado.
     """
     try:
         # 1. Obtener y Validar Valores de Entrada
@@ -126,45 +317,29 @@ def aplicar_filtro(tree, dataset, columnas_visibles, ventana_filtro,
         min_area = float(min_area_var.get().replace('.', '')) if min_area_var.get() else None # Obtiene y convierte el área mínima.
         max_area = float(max_area_var.get().replace('.', '')) if max_area_var.get() else None # Obtiene y convierte el área máxima.
 
-        # 2. Aplicar el Filtro
-        resultados = []
-        for pais in dataset: # Itera sobre cada país.
-            cumple_filtro = True # Bandera para el cumplimiento de criterios.
-            
-            # 1: Continente
-            if continente_elegido and continente_elegido != "Todos" and pais.get('continente') != continente_elegido: # Comprueba el continente.
-                cumple_filtro = False
-            
-            # 2: Rango de Población
-            poblacion = int(pais.get('poblacion', 0))
-            if cumple_filtro and min_pob is not None and poblacion < min_pob: # Comprueba población mínima.
-                cumple_filtro = False
-            if cumple_filtro and max_pob is not None and poblacion > max_pob: # Comprueba población máxima.
-                cumple_filtro = False
-
-            # 3: Rango de Superficie
-            area = float(pais.get('area', 0.0)) 
-            if cumple_filtro and min_area is not None and area < min_area: # Comprueba superficie mínima.
-                cumple_filtro = False
-            if cumple_filtro and max_area is not None and area > max_area: # Comprueba superficie máxima.
-                cumple_filtro = False
-
-            if cumple_filtro: # Si cumple todos los criterios.
-                resultados.append(pais) # Añade el país a los resultados.
-
-        # 3. Mostrar Resultados
-        if not resultados:
-            messagebox.showinfo("Filtro", "No se encontraron países que cumplan con todos los criterios de filtro.")
-            mostrar_datos_en_treeview(tree, [], columnas_visibles) # Limpia la tabla si no hay resultados.
-        else:
-            mostrar_datos_en_treeview(tree, resultados, columnas_visibles) # Muestra los resultados filtrados.
-        
-        ventana_filtro.destroy() # Cierra la ventana de filtro al aplicar.
-
     except ValueError: # Captura errores si se introducen valores no numéricos.
         messagebox.showerror("Error de Entrada", "Por favor, introduce números válidos. Asegúrate de no usar comas como separador de miles.")
-    except Exception as e: # Captura otros errores inesperados.
-        messagebox.showerror("Error", f"Ocurrió un error inesperado al filtrar: {e}")
+        return
+
+    # 2. Aplicar el Filtro en el Hilo de Fondo (con los índices de rango, respetando el orden elegido)
+    clave = ('filtro', continente_elegido, min_pob, max_pob, min_area, max_area) # Estado de la vista, para las estadísticas.
+    en_segundo_plano(partial(dataset.filtrar, continente_elegido, min_pob, max_pob, min_area, max_area, rangos=rangos_orden),
+                     grupo="filtro", # Un filtro nuevo reemplaza al que no haya terminado.
+                     al_terminar=lambda resultados: filtro_listo(tree, dataset, columnas_visibles, resultados, clave),
+                     al_fallar=lambda e: messagebox.showerror("Error", f"Ocurrió un error inesperado al filtrar: {e}"))
+    ventana_filtro.destroy() # Cierra la ventana de filtro al aplicar.
+
+def filtro_listo(tree, dataset, columnas_visibles, resultados, clave):
+    """Muestra los resultados del filtro cuando vuelven del hilo de fondo."""
+    if dataset is not dataset_paises: # Se filtró el dataset anterior a la carga.
+        return
+    # 3. Mostrar Resultados
+    if not resultados:
+        messagebox.showinfo("Filtro", "No se encontraron países que cumplan con todos los criterios de filtro.")
+        mostrar_datos_en_treeview(tree, dataset, columnas_visibles, []) # Limpia la tabla si no hay resultados.
+    else:
+        mostrar_datos_en_treeview(tree, dataset, columnas_visibles, resultados) # Muestra los resultados filtrados.
+    registrar_vista(dataset, resultados, clave)
 
 # Ventana de Filtrado
 def mostrar_ventana_filtro():
@@ -176,7 +351,7 @@ def mostrar_ventana_filtro():
         return
 
     # Obtener la Lista Única de Continentes
-    continentes = sorted(list(set(p.get('continente') for p in dataset_paises if p.get('continente')))) # Extrae la lista de continentes únicos.
+    continentes = dataset_paises.continentes() # Extrae la lista de continentes únicos.
     opciones_continentes = ["Todos"] + continentes # Agrega la opción "Todos".
     
     # 1. Crear la Ventana de Diálogo (Toplevel)
@@ -243,71 +418,196 @@ def mostrar_ventana_filtro():
     frame_filtro.grid_columnconfigure(0, weight=1)
     frame_filtro.grid_columnconfigure(1, weight=1)
 
-# Función para la Ventana de Estadística
 def mostrar_ventana_estadisticas():
-    """Calcula las estadísticas y las muestra en una nueva ventana."""
-    global dataset_paises, ventana
+    """Abre la ventana de estadísticas de las filas visibles (o la trae al frente si ya está abierta)."""
     if not dataset_paises:
         messagebox.showinfo("Estadísticas", "No hay datos cargados para mostrar estadísticas.")
         return
+    if ventana_estadisticas is not None:
+        ventana_estadisticas.winfo_toplevel().lift()
+        return
 
-    # 1. Realizar los Cálculos
-    try:
-        for pais in dataset_paises: # Itera y convierte los campos numéricos.
-            pais['poblacion_num'] = float(pais.get('poblacion', 0)) if pais.get('poblacion') else 0
-            pais['area_num'] = float(pais.get('area', 0.0)) if pais.get('area') else 0.0
+    # 1. Realizar los Cálculos en el Hilo de Fondo (salen de la caché si esta vista ya se calculó)
+    en_segundo_plano(calcular_estadisticas, dataset_paises.motor_estadisticas(), grupo="estadisticas",
+                     al_terminar=abrir_ventana_estadisticas,
+                     al_fallar=lambda e: messagebox.showerror("Error", f"Ocurrió un error al calcular las estadísticas: {e}"))
 
-        paises_con_datos = [p for p in dataset_paises if p['poblacion_num'] > 0 and p['area_num'] >= 0] # Filtra solo países con datos numéricos válidos.
-        if not paises_con_datos:
-            messagebox.showinfo("Estadísticas", "No hay países con datos numéricos válidos para calcular estadísticas.")
-            return
+def calcular_estadisticas(motor):
+    """Resumen y rankings de las filas visibles (corre en el hilo de fondo)."""
+    return {'resumen': motor.resumen(), 'top': {m: motor.top(m, TOP_N) for m in METRICAS}, 'todas': motor.todas_visibles}
 
-        pais_max_pob = max(paises_con_datos, key=lambda p: p['poblacion_num']) # Encuentra el país con la población máxima.
-        pais_min_pob = min(paises_con_datos, key=lambda p: p['poblacion_num']) # Encuentra el país con la población mínima.
-        
-        total_paises = len(paises_con_datos)
-        promedio_poblacion = sum(p['poblacion_num'] for p in paises_con_datos) / total_paises # Calcula el promedio de población.
-        promedio_superficie = sum(p['area_num'] for p in paises_con_datos) / total_paises # Calcula el promedio de superficie.
-        
-        conteo_continentes = Counter(p['continente'] for p in paises_con_datos) # Cuenta los países por continente.
-
-    except (ValueError, TypeError) as e:
-        messagebox.showerror("Error de Datos", f"No se pudieron calcular las estadísticas. Revisa los datos en el CSV.\nError: {e}")
+def abrir_ventana_estadisticas(calculo):
+    """Crea la ventana de estadísticas con los resultados de calcular_estadisticas."""
+    global ventana_estadisticas
+    if calculo['resumen'] is None:
+        messagebox.showinfo("Estadísticas", "No hay países con datos numéricos válidos para calcular estadísticas.")
+        return
+    if ventana_estadisticas is not None: # Se pidió dos veces antes de que terminara el cálculo.
+        refrescar_ventana_estadisticas(calculo)
         return
 
     # 2. Crear la Nueva ventana (Toplevel)
     ventana_stats = tk.Toplevel(ventana) # Crea la ventana de estadísticas.
-    ventana_stats.title("Estadísticas Globales")
-    ventana_stats.geometry("450x400")
-    ventana_stats.resizable(False, False)
+    ventana_stats.title("Estadísticas")
+    ventana_stats.geometry("640x620")
+
+    def cerrar(): # Al cerrar se deja de refrescar.
+        global ventana_estadisticas
+        ventana_estadisticas = None
+        ventana_stats.destroy()
+    ventana_stats.protocol("WM_DELETE_WINDOW", cerrar)
+    ttk.Button(ventana_stats, text="Cerrar", command=cerrar).pack(side="bottom", pady=10) # Botón para cerrar la ventana de estadísticas.
 
-    frame_stats = ttk.Frame(ventana_stats, padding="10")
-    frame_stats.pack(fill="both", expand=True)
+    ventana_estadisticas = ttk.Frame(ventana_stats, padding="10") # Se vuelve a llenar con cada cambio de la vista.
+    ventana_estadisticas.pack(fill="both", expand=True)
 
     # 3. Mostrar los Resultados
-    ttk.Label(frame_stats, text="Estadísticas de Países", font=("Helvetica", 14, "bold")).pack(pady=(0,10))
-    
-    frame_resultados = ttk.Frame(frame_stats)
-    frame_resultados.pack(fill="x")
+    refrescar_ventana_estadisticas(calculo)
+
+def refrescar_ventana_estadisticas(calculo):
+    """Vuelve a dibujar la ventana de estadísticas con los resultados de calcular_estadisticas."""
+    if ventana_estadisticas is None: # Se cerró mientras se calculaba.
+        return
+    estadisticas = calculo['resumen']
+    for widget in ventana_estadisticas.winfo_children(): # Borra el contenido anterior.
+        widget.destroy()
+
+    def numero(valor, decimales=0): # Formato con punto de miles, como el resto de la interfaz.
+        if valor is None:
+            return "-"
+        return f"{valor:,.{decimales}f}".replace(',', 'X').replace('.', ',').replace('X', '.')
 
     def crear_linea_stat(parent, etiqueta, valor): # Función auxiliar para mostrar un par de etiqueta/valor en la estadística.
         ttk.Label(parent, text=etiqueta, font=("Helvetica", 10, "bold")).grid(row=parent.grid_size()[1], column=0, sticky="w", pady=2)
         ttk.Label(parent, text=valor).grid(row=parent.grid_size()[1]-1, column=1, sticky="w", padx=5)
 
-    crear_linea_stat(frame_resultados, "País más poblado:", f"{pais_max_pob['nombre_comun_es']} ({pais_max_pob['poblacion_num']:,.0f})".replace(',', '.'))
-    crear_linea_stat(frame_resultados, "País menos poblado:", f"{pais_min_pob['nombre_comun_es']} ({pais_min_pob['poblacion_num']:,.0f})".replace(',', '.'))
-    crear_linea_stat(frame_resultados, "Promedio de población:", f"{promedio_poblacion:,.0f}".replace(',', '.'))
-    crear_linea_stat(frame_resultados, "Promedio de superficie:", f"{promedio_superficie:,.2f} km²".replace(',', '.'))
+    if estadisticas is None:
+        ttk.Label(ventana_estadisticas, text="No hay países visibles con datos numéricos válidos.").pack(pady=10)
+        return
+    titulo = "Estadísticas Globales" if calculo['todas'] else f"Estadísticas de los {estadisticas['total_paises']} Países Visibles"
+    ttk.Label(ventana_estadisticas, text=titulo, font=("Helvetica", 14, "bold")).pack(pady=(0,10))
 
-    ttk.Separator(frame_stats, orient='horizontal').pack(fill='x', pady=10)
-    ttk.Label(frame_stats, text="Países por Continente", font=("Helvetica", 12, "bold")).pack()
-    
-    frame_continentes = ttk.Frame(frame_stats)
-    frame_continentes.pack(fill="x", pady=5)
-    for continente, cantidad in sorted(conteo_continentes.items()): # Muestra el conteo de países por continente ordenado.
-        crear_linea_stat(frame_continentes, f"{continente}:", str(cantidad))
-    
-    ttk.Button(frame_stats, text="Cerrar", command=ventana_stats.destroy).pack(side="bottom", pady=10) # Botón para cerrar la ventana de estadísticas.
+    # Resumen General
+    frame_resultados = ttk.Frame(ventana_estadisticas)
+    frame_resultados.pack(fill="x")
+    nombre_max_pob, pob_max = estadisticas['pais_max_pob'] # País con la población máxima.
+    nombre_min_pob, pob_min = estadisticas['pais_min_pob'] # País con la población mínima.
+    crear_linea_stat(frame_resultados, "País más poblado:", f"{nombre_max_pob} ({numero(pob_max)})")
+    crear_linea_stat(frame_resultados, "País menos poblado:", f"{nombre_min_pob} ({numero(pob_min)})")
+    crear_linea_stat(frame_resultados, "Promedio de población:", numero(estadisticas['promedio_poblacion']))
+    crear_linea_stat(frame_resultados, "Promedio de superficie:", f"{numero(estadisticas['promedio_superficie'], 2)} km²")
+    crear_linea_stat(frame_resultados, "Densidad:", f"{numero(estadisticas['densidad'], 2)} hab/km²")
+
+    # Desglose por Continente
+    ttk.Separator(ventana_estadisticas, orient='horizontal').pack(fill='x', pady=10)
+    ttk.Label(ventana_estadisticas, text="Por Continente", font=("Helvetica", 12, "bold")).pack()
+    columnas = ("continente", "paises", "poblacion", "promedio", "mediana", "densidad")
+    titulos = ("Continente", "Países", "Población", "Promedio", "Mediana", "Hab/km²")
+    tabla = ttk.Treeview(ventana_estadisticas, columns=columnas, show="headings", height=len(estadisticas['por_continente']))
+    for columna, texto in zip(columnas, titulos):
+        tabla.heading(columna, text=texto)
+        tabla.column(columna, width=95, anchor="w" if columna == "continente" else "e")
+    for continente, datos in sorted(estadisticas['por_continente'].items()): # Continentes en orden alfabético.
+        tabla.insert("", "end", values=(continente, datos['paises'], numero(datos['poblacion']),
+                                        numero(datos['promedio_poblacion']), numero(datos['mediana_poblacion']),
+                                        numero(datos['densidad'], 2)))
+    tabla.pack(fill="x", pady=5)
+
+    # Rankings
+    ttk.Separator(ventana_estadisticas, orient='horizontal').pack(fill='x', pady=10)
+    frame_top = ttk.Frame(ventana_estadisticas)
+    frame_top.pack(fill="x")
+    for posicion, (metrica, texto, decimales) in enumerate((("poblacion", "Más Poblados", 0), ("area", "Más Extensos", 0), ("densidad", "Más Densos", 1))):
+        ttk.Label(frame_top, text=f"Top {TOP_N}: {texto}", font=("Helvetica", 10, "bold")).grid(row=0, column=posicion, sticky="w", padx=5)
+        for fila, (nombre, valor) in enumerate(calculo['top'][metrica], start=1):
+            ttk.Label(frame_top, text=f"{nombre} ({numero(valor, decimales)})").grid(row=fila, column=posicion, sticky="w", padx=5)
+
+# Panel de Diagnóstico
+def mostrar_ventana_diagnostico():
+    """Abre el panel con los últimos tramos medidos y el resumen por operación (o lo trae al frente)."""
+    global ventana_diagnostico
+    if ventana_diagnostico is not None:
+        ventana_diagnostico['ventana'].lift()
+        return
+
+    ventana_diag = tk.Toplevel(ventana)
+    ventana_diag.title("Diagnóstico")
+    ventana_diag.geometry("760x560")
+
+    def cerrar(): # Al cerrar se deja de refrescar.
+        global ventana_diagnostico
+        ventana_diagnostico = None
+        ventana_diag.destroy()
+    ventana_diag.protocol("WM_DELETE_WINDOW", cerrar)
+
+    def limpiar(): # Olvida los tramos medidos hasta ahora.
+        instrumentacion.limpiar()
+        refrescar_ventana_diagnostico()
+
+    # Botones
+    frame_botones = ttk.Frame(ventana_diag, padding=(10, 0, 10, 10))
+    frame_botones.pack(side="bottom", fill="x")
+    ttk.Button(frame_botones, text="Exportar", command=exportar_diagnostico).pack(side="left", padx=5) # JSON, traza de Chrome y perfil.
+    ttk.Button(frame_botones, text="Limpiar", command=limpiar).pack(side="left", padx=5)
+    ttk.Button(frame_botones, text="Cerrar", command=cerrar).pack(side="right", padx=5)
+
+    frame_tablas = ttk.Frame(ventana_diag, padding="10")
+    frame_tablas.pack(fill="both", expand=True)
+
+    # Resumen por Operación
+    ttk.Label(frame_tablas, text="Por Operación", font=("Helvetica", 12, "bold")).pack()
+    columnas = ("nombre", "cantidad", "total", "promedio", "maximo", "escaneadas", "devueltas")
+    titulos = ("Operación", "Veces", "Total ms", "Prom. ms", "Máx. ms", "Revisadas", "Devueltas")
+    tabla_resumen = ttk.Treeview(frame_tablas, columns=columnas, show="headings", height=8)
+    for columna, texto in zip(columnas, titulos):
+        tabla_resumen.heading(columna, text=texto)
+        tabla_resumen.column(columna, width=95, anchor="w" if columna == "nombre" else "e")
+    tabla_resumen.pack(fill="x", pady=5)
+
+    # Últimos Tramos
+    ttk.Label(frame_tablas, text="Últimas Operaciones", font=("Helvetica", 12, "bold")).pack(pady=(10, 0))
+    columnas = ("nombre", "ms", "escaneadas", "devueltas", "hilo", "detalle")
+    titulos = ("Operación", "ms", "Revisadas", "Devueltas", "Hilo", "Detalle")
+    tabla_tramos = ttk.Treeview(frame_tablas, columns=columnas, show="headings")
+    for columna, texto in zip(columnas, titulos):
+        tabla_tramos.heading(columna, text=texto)
+        tabla_tramos.column(columna, width=200 if columna == "detalle" else 90,
+                            anchor="e" if columna in ("ms", "escaneadas", "devueltas") else "w")
+    tabla_tramos.pack(fill="both", expand=True, pady=5)
+
+    ventana_diagnostico = {'ventana': ventana_diag, 'resumen': tabla_resumen, 'tramos': tabla_tramos}
+    refrescar_ventana_diagnostico(periodico=ventana_diagnostico)
+
+def refrescar_ventana_diagnostico(periodico=None):
+    """
+    Vuelve a llenar el panel con los tramos actuales. Con 'periodico' (el panel abierto)
+    se reprograma con after() mientras ese mismo panel siga abierto.
+    """
+    if ventana_diagnostico is None or (periodico is not None and periodico is not ventana_diagnostico): # Se cerró.
+        return
+    tabla = ventana_diagnostico['resumen']
+    tabla.delete(*tabla.get_children())
+    por_nombre = instrumentacion.resumen()
+    for nombre, datos in sorted(por_nombre.items(), key=lambda par: -par[1]['total_ms']): # Lo más costoso primero.
+        tabla.insert("", "end", values=(nombre, datos['cantidad'], f"{datos['total_ms']:.1f}", f"{datos['promedio_ms']:.2f}",
+                                        f"{datos['max_ms']:.1f}", datos.get('escaneadas', ""), datos.get('devueltas', "")))
+    tabla = ventana_diagnostico['tramos']
+    tabla.delete(*tabla.get_children())
+    for t in instrumentacion.ultimos(TRAMOS_EN_PANEL):
+        detalle = ", ".join(f"{clave}={valor}" for clave, valor in t.datos.items() if clave not in ("escaneadas", "devueltas"))
+        tabla.insert("", "end", values=(t.nombre, f"{t.milisegundos:.2f}", t.datos.get('escaneadas', ""),
+                                        t.datos.get('devueltas', ""), t.nombre_hilo, detalle))
+    if periodico is not None:
+        ventana.after(INTERVALO_DIAGNOSTICO_MS, refrescar_ventana_diagnostico, periodico)
+
+def exportar_diagnostico():
+    """Escribe los tramos (JSON y traza de Chrome) y el perfil, si lo hay, y avisa dónde quedaron."""
+    try:
+        rutas = instrumentacion.exportar()
+    except OSError as e:
+        messagebox.showerror("Error", f"No se pudo exportar el diagnóstico: {e}")
+        return
+    messagebox.showinfo("Diagnóstico", "Archivos guardados:\n" + "\n".join(rutas))
 
 # Función de Créditos
 def mostrar_creditos():
@@ -317,20 +617,147 @@ def mostrar_creditos():
         "Programa de Visor de Datos de Países\n\nHecho por:\n- Genaro Senatore\n- Exequiel Castro"
     )
 
+# Carga en Segundo Plano
+def mostrar_progreso_carga(fraccion, mensaje):
+    """Muestra el avance de la carga de datos."""
+    barra_progreso.configure(value=fraccion)
+    mostrar_estado(mensaje)
+
+def cargar_en_segundo_plano(ruta_csv, al_mostrar=None):
+    """
+    Carga e indexa el CSV en el hilo de fondo; la tabla sigue mostrando los datos anteriores
+    hasta que termina. 'al_mostrar' se llama después de mostrar el dataset nuevo.
+    """
+    global cargando
+    cargando = True
+    barra_progreso.stop()
+    barra_progreso.configure(mode="determinate", value=0)
+
+    def cargado(dataset):
+        dataset_cargado(dataset)
+        if al_mostrar is not None:
+            al_mostrar()
+
+    en_segundo_plano(partial(preparar_dataset, columnas_orden=COLUMNAS_VISIBLES), ruta_csv, grupo="carga", con_tarea=True,
+                     al_terminar=cargado, al_fallar=lambda e: carga_fallida(ruta_csv, e),
+                     al_progresar=mostrar_progreso_carga)
+
+def dataset_cargado(dataset):
+    """Recibe el dataset ya indexado del hilo de fondo y lo muestra (reemplaza al anterior si lo había)."""
+    global dataset_paises, busqueda_incremental, tree, refrescar_al_cargar, orden_actual, rangos_orden
+    terminar_carga()
+    anterior = dataset_paises
+    dataset_paises = dataset
+    orden_actual = rangos_orden = None # Las posiciones del orden eran del dataset anterior.
+    busqueda_incremental = BusquedaIncremental(dataset_paises)
+    if len(dataset_paises) > UMBRAL_TABLA_VIRTUAL and not isinstance(tree, TablaVirtual): # Con muchos países, solo se materializan las filas visibles.
+        borrar_items_de_tabla(tree) # La tabla virtual no conoce los ítems que el Treeview tenía del dataset anterior.
+        tree = TablaVirtual(tree, barra_vertical, COLUMNAS_VISIBLES)
+    mostrar_estado(f"{len(dataset_paises)} países cargados.")
+    buscar_pais(tree, dataset_paises, COLUMNAS_VISIBLES, texto_busqueda_var) # Muestra todo o lo ya buscado (la tabla deja de usar el anterior).
+    if criterios_orden: # Si el usuario ya eligió un orden (antes o durante la carga), se aplica ahora.
+        aplicar_orden(criterios_orden)
+    if anterior is not None and anterior is not dataset: # Detrás de las tareas que todavía lo usaban.
+        en_segundo_plano(liberar_dataset_anterior, anterior, dataset, ruta_datos)
+    if medir_arranque:
+        informar_hito("datos_visibles")
+        ventana.after_idle(cerrar_aplicacion)
+    elif refrescar_al_cargar: # Primero se muestran los datos que ya había; después se buscan los nuevos.
+        refrescar_al_cargar = False
+        actualizar_datos()
+
+def liberar_dataset_anterior(anterior, nuevo, ruta_csv):
+    """
+    Cierra el mmap del dataset reemplazado por una actualización y, si por eso el snapshot
+    no se pudo reescribir (en Windows un archivo mapeado no se reemplaza), lo escribe ahora
+    con el dataset nuevo. Corre en el hilo de fondo, después de las tareas ya enviadas.
+    """
+    if cerrar_snapshot(anterior) and not snapshot_vigente(ruta_csv):
+        escribir_snapshot(nuevo, ruta_csv)
+
+def carga_fallida(archivo_csv, error):
+    """Informa el error de la carga; la ventana queda con el dataset que tenía (vacío en la primera carga)."""
+    terminar_carga()
+    mostrar_estado("")
+    if isinstance(error, FileNotFoundError):
+        messagebox.showerror("Error", f"No se encontró el archivo de datos:\n{archivo_csv}") # Muestra un error.
+    else:
+        messagebox.showerror("Error", f"Ocurrió un error al leer el archivo: {error}")
+
+def terminar_carga():
+    """Deja la barra de progreso a cargo de las tareas de fondo."""
+    global cargando
+    cargando = False
+    indicar_actividad(ejecutor is not None and ejecutor.ocupado)
+
+def cerrar_aplicacion():
+    """Cancela las tareas de fondo y cierra la ventana."""
+    for ejecutor_fondo in (ejecutor, ejecutor_refresco):
+        if ejecutor_fondo is not None:
+            ejecutor_fondo.cerrar()
+    ventana.destroy()
+
+# Actualización de los Datos
+def actualizar_datos():
+    """
+    Descarga los datos en segundo plano (botón "Actualizar Datos" o al arrancar). Mientras
+    tanto se sigue usando la tabla; si Todos.csv cambió, las filas nuevas la reemplazan
+    cuando terminan de cargarse.
+    """
+    if funcion_actualizar is None:
+        messagebox.showinfo("Actualizar Datos", "La actualización no está disponible en este modo.")
+        return
+    if ejecutor_refresco.ocupado: # Ya hay una actualización en curso.
+        return
+    estado_datos_var.set("Actualizando datos...")
+    ejecutor_refresco.enviar(funcion_actualizar, grupo="refresco", al_terminar=datos_actualizados,
+                             al_fallar=actualizacion_fallida)
+
+def datos_actualizados(cambiaron):
+    """Recibe el resultado de la actualización y, si hay datos nuevos, los carga."""
+    if cambiaron:
+        estado_datos_var.set("Datos nuevos: cargando...")
+        cargar_en_segundo_plano(ruta_datos, al_mostrar=lambda: estado_datos_var.set("Datos actualizados."))
+    else:
+        estado_datos_var.set("Los datos ya estaban al día.")
+
+def actualizacion_fallida(error):
+    """La actualización falló: se siguen mostrando los datos que había."""
+    estado_datos_var.set(f"No se pudo actualizar: {error}")
+
+def informar_hito(nombre):
+    """Escribe un hito del arranque para benchmarks/arranque.py (solo con medir_arranque)."""
+    print(f"ARRANQUE {nombre}", flush=True)
+
 # Función Principal de la Interfaz
-def iniciar_interfaz():
-    """Crea y ejecuta la interfaz gráfica principal."""
-    global dataset_paises, combo_ordenar, tree, ventana, texto_busqueda_var
+def iniciar_interfaz(actualizar=None, refrescar=False, medir=False, archivo_csv=None):
+    """
+    Crea y ejecuta la interfaz gráfica principal. 'actualizar' es la función que descarga
+    los datos y devuelve True si Todos.csv cambió (habilita el botón "Actualizar Datos");
+    con refrescar=True se llama en segundo plano apenas se muestran los datos existentes.
+    Con medir=True se informan los hitos del arranque y la ventana se cierra sola.
+    """
+    global dataset_paises, combo_ordenar, tree, ventana, texto_busqueda_var, estado_busqueda_var, busqueda_incremental
+    global ejecutor, barra_progreso, barra_vertical, ejecutor_refresco, funcion_actualizar, refrescar_al_cargar
+    global estado_datos_var, ruta_datos, medir_arranque
     
     ventana = tk.Tk() # Crea la ventana principal.
     ventana.title("Visor de Datos de Países")
     ventana.geometry("1000x600")
-
-    ruta_csv = os.path.join("Continentes", "Todos.csv") # Define la ruta del archivo de datos.
-    dataset_paises = cargar_datos_en_memoria(ruta_csv) # Carga los datos.
-    
-    if dataset_paises is None: # Si falla la carga, inicializa vacío.
-        dataset_paises = []
+    funcion_actualizar, refrescar_al_cargar, medir_arranque = actualizar, refrescar, medir
+    ruta_datos = archivo_csv or ruta_datos
+    if medir_arranque: # Hito: la ventana ya está en pantalla.
+        ventana.bind("<Map>", lambda evento: informar_hito("primera_ventana") if evento.widget is ventana else None)
+
+    # Los datos se cargan en el hilo de fondo; mientras tanto la ventana usa un dataset vacío.
+    dataset_paises = DatasetPaises()
+    busqueda_incremental = BusquedaIncremental(dataset_paises)
+    ejecutor = EjecutorTareas()
+    ejecutor.al_cambiar_actividad = indicar_actividad
+    ejecutor.sondear(ventana) # Revisa con after() los resultados que llegan del hilo de fondo.
+    ejecutor_refresco = EjecutorTareas(demonio=True) # La descarga no se puede cortar: al cerrar no se la espera.
+    ejecutor_refresco.sondear(ventana)
+    ventana.protocol("WM_DELETE_WINDOW", cerrar_aplicacion)
 
     # Paneles
     frame_izquierda = ttk.Frame(ventana, width=200) # Crea el marco para los controles (panel izquierdo).
@@ -344,22 +771,24 @@ def iniciar_interfaz():
     ttk.Separator(frame_izquierda, orient='horizontal').pack(fill='x', pady=10)
 
     # Búsqueda de un país
-    ttk.Label(frame_izquierda, text="Buscar País por Nombre:").pack(pady=(5,0))
+    ttk.Label(frame_izquierda, text="Buscar País por Nombre o Capital:").pack(pady=(5,0))
     texto_busqueda_var = tk.StringVar() # Inicializa la variable de control para la búsqueda.
     entry_busqueda = ttk.Entry(frame_izquierda, textvariable=texto_busqueda_var) # Campo de entrada de búsqueda.
     entry_busqueda.pack(fill="x", padx=5)
-
-    columnas_a_mostrar_busqueda = {"nombre_comun_es": "Nombre", "poblacion": "Población", "area": "Superficie", "continente": "Continente"}
-    nombres_internos_columnas_busqueda = list(columnas_a_mostrar_busqueda.keys())
+    texto_busqueda_var.trace_add("write", programar_busqueda) # Búsqueda en vivo mientras se escribe.
+    estado_busqueda_var = tk.StringVar() # Línea de estado con la cantidad de resultados.
+    ttk.Label(frame_izquierda, textvariable=estado_busqueda_var, foreground="gray", wraplength=180).pack(fill="x", padx=5)
+    barra_progreso = ttk.Progressbar(frame_izquierda, mode="determinate", maximum=1.0) # Avance de la carga y de las tareas de fondo.
+    barra_progreso.pack(fill="x", padx=5, pady=(2, 0))
 
     ttk.Button(frame_izquierda, 
                text="Buscar", 
-               command=lambda: buscar_pais(tree, dataset_paises, nombres_internos_columnas_busqueda, texto_busqueda_var) # Botón para iniciar la búsqueda.
+               command=buscar_ahora # Botón para iniciar la búsqueda sin esperar.
     ).pack(fill="x", pady=5)
     
     ttk.Button(frame_izquierda, 
                text="Mostrar Todos", 
-               command=lambda: [texto_busqueda_var.set(""), mostrar_datos_en_treeview(tree, dataset_paises, nombres_internos_columnas_busqueda)] # Botón para borrar la búsqueda y mostrar todos los datos.
+               command=mostrar_todos # Botón para borrar la búsqueda y mostrar todos los datos.
     ).pack(fill="x", pady=5)
     
     ttk.Separator(frame_izquierda, orient='horizontal').pack(fill='x', pady=10)
@@ -394,6 +823,15 @@ def iniciar_interfaz():
     # Botón de Estadísticas
     ttk.Button(frame_izquierda, text="Mostrar Estadísticas", command=mostrar_ventana_estadisticas).pack(fill="x", pady=5) # Botón que abre la ventana de estadísticas.
     
+    # Botón de Actualización (descarga en segundo plano)
+    ttk.Button(frame_izquierda, text="Actualizar Datos", command=actualizar_datos).pack(fill="x", pady=5) # Vuelve a descargar los datos.
+    estado_datos_var = tk.StringVar() # Estado de la última actualización.
+    ttk.Label(frame_izquierda, textvariable=estado_datos_var, foreground="gray", wraplength=180).pack(fill="x", padx=5)
+
+    # Botón de Diagnóstico (solo con la instrumentación activa)
+    if instrumentacion.activa:
+        ttk.Button(frame_izquierda, text="Diagnóstico", command=mostrar_ventana_diagnostico).pack(fill="x", pady=5) # Abre el panel de tiempos.
+
     # Botón de Créditos
     ttk.Button(frame_izquierda, text="Créditos", command=mostrar_creditos).pack(fill="x", pady=5) # Botón que muestra los créditos.
     
@@ -403,7 +841,8 @@ def iniciar_interfaz():
     nombres_internos_columnas = list(columnas_a_mostrar.keys())
     tree = ttk.Treeview(frame_derecha, columns=nombres_internos_columnas, show="headings") # Crea el widget de tabla (Treeview).
     for internal_name, display_name in columnas_a_mostrar.items():
-        tree.heading(internal_name, text=display_name) # Configura el encabezado de cada columna.
+        tree.heading(internal_name, text=display_name, # Configura el encabezado de cada columna.
+                     command=lambda columna=internal_name: ordenar_por_encabezado(columna)) # Clic para ordenar.
         tree.column(internal_name, width=150, anchor='center')
     vsb = ttk.Scrollbar(frame_derecha, orient="vertical", command=tree.yview) # Crea la barra de desplazamiento vertical.
     hsb = ttk.Scrollbar(frame_derecha, orient="horizontal", command=tree.xview) # Crea la barra de desplazamiento horizontal.
@@ -411,8 +850,9 @@ def iniciar_interfaz():
     vsb.pack(side='right', fill='y')
     hsb.pack(side='bottom', fill='x')
     tree.pack(side='left', fill='both', expand=True)
+    barra_vertical = vsb
 
-    if dataset_paises:
-        mostrar_datos_en_treeview(tree, dataset_paises, nombres_internos_columnas) # Carga los datos iniciales en la tabla.
+    # Carga de Datos (en el hilo de fondo, con avance en la barra de progreso)
+    cargar_en_segundo_plano(ruta_datos)
 
     ventana.mainloop() # Inicia el bucle principal de la aplicación gráfica.
\ No newline at end of file
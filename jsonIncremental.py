@@ -0,0 +1,104 @@
+# jsonIncremental.py
+# Este módulo lee un array JSON que llega en bloques de bytes (por ejemplo, desde la red)
+# y entrega cada elemento apenas termina de llegar, sin tener todo el documento en memoria.
+
+import codecs
+import json
+
+ESPACIOS = ' \t\r\n' # Caracteres que JSON permite entre elementos.
+MAXIMO_ELEMENTO = 8 << 20 # Caracteres máximos de un elemento (un país ocupa alrededor de 1 KB).
+MARGEN_TOKEN = 16 # Un error más lejos que esto del final del buffer no se arregla con más datos.
+
+def _es_numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+def iterar_array_json(bloques, maximo_elemento=MAXIMO_ELEMENTO):
+    """
+    Recorre un array JSON de nivel superior leído desde un iterable de bloques de bytes
+    y devuelve (yield) cada elemento ya decodificado. La memoria usada queda acotada
+    por el tamaño de un elemento más un bloque. Lanza ValueError si el JSON es inválido:
+    apenas aparece un error que más datos no pueden corregir, o cuando un elemento supera
+    'maximo_elemento' caracteres, sin seguir leyendo el resto de la respuesta.
+    """
+    decodificador = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')() # Soporta caracteres partidos entre dos bloques.
+    bloques = iter(bloques)
+    buffer = ''
+    pos = 0
+    agotado = False # True cuando ya no quedan bloques por leer.
+    empezo = False # True después de leer el '[' inicial.
+    espera_valor = True # True si lo próximo debe ser un elemento (o el ']' de un array vacío).
+    hubo_elementos = False
+
+    def leer_mas():
+        # Descarta lo ya procesado y agrega el siguiente bloque al buffer.
+        nonlocal buffer, pos, agotado
+        bloque = next(bloques, None)
+        if bloque is None:
+            agotado = True
+            buffer = buffer[pos:] + utf8.decode(b'', final=True)
+        else:
+            buffer = buffer[pos:] + utf8.decode(bloque)
+        pos = 0
+
+    while True:
+        # 1. Saltar Espacios y Pedir Más Datos si Hace Falta
+        while pos < len(buffer) and buffer[pos] in ESPACIOS:
+            pos += 1
+        if pos == len(buffer):
+            if agotado:
+                raise ValueError("El JSON terminó antes de cerrar el array.")
+            leer_mas()
+            continue
+
+        caracter = buffer[pos]
+
+        # 2. Apertura del Array
+        if not empezo:
+            if caracter != '[':
+                raise ValueError("Se esperaba un array JSON en el nivel superior.")
+            empezo = True
+            pos += 1
+            continue
+
+        # 3. Separadores y Cierre
+        if caracter == ']' and (not espera_valor or not hubo_elementos):
+            pos += 1
+            break
+        if caracter == ',' and not espera_valor:
+            espera_valor = True
+            pos += 1
+            continue
+        if not espera_valor:
+            raise ValueError(f"Carácter inesperado '{caracter}' entre elementos del array.")
+
+        # 4. Decodificar un Elemento Completo
+        try:
+            elemento, fin = decodificador.raw_decode(buffer, pos)
+        except json.JSONDecodeError as error:
+            if agotado:
+                raise ValueError("Elemento JSON inválido o incompleto.")
+            # Un texto sin cerrar puede seguir en el próximo bloque; cualquier otro error
+            # que no esté al final del buffer ya es definitivo.
+            if not error.msg.startswith("Unterminated string") and len(buffer) - error.pos > MARGEN_TOKEN:
+                raise ValueError(f"Elemento JSON inválido: {error.msg}.")
+            if len(buffer) - pos > maximo_elemento:
+                raise ValueError(f"Un elemento del array JSON supera los {maximo_elemento} caracteres.")
+            leer_mas() # El elemento todavía no llegó completo.
+            continue
+        if not agotado and (fin == len(buffer) or (_es_numero(elemento) and buffer[fin] in '.eE')):
+            leer_mas() # Un número al final del buffer ('1', '1.', '1e') podría seguir en el próximo bloque.
+            continue
+        pos = fin
+        espera_valor = False
+        hubo_elementos = True
+        yield elemento
+
+    # 5. Consumir el Resto (solo se admiten espacios después del ']')
+    while True:
+        if buffer[pos:].strip(ESPACIOS):
+            raise ValueError("Hay datos después del cierre del array JSON.")
+        if agotado:
+            return
+        pos = len(buffer)
+        leer_mas()
@@ -1,36 +1,111 @@
 # main.py
+# Arranca el visor. Si Continentes/Todos.csv ya existe, la ventana se abre enseguida con
+# esos datos y la descarga se hace después (en segundo plano o con el botón "Actualizar
+# Datos"); los módulos pesados (requests, tkinter) se importan recién cuando hacen falta.
 import os
-import interfaz
-# Importa AMBAS funciones del archivo 'generarPaises.py'
-from generarPaises import obtener_y_guardar_paises, unir_csvs_en_uno
-
-def procesar_todos_los_continentes():
-    # Esta función no cambia
-    continentes = ['Africa', 'Americas', 'Asia', 'Europe', 'Oceania', 'Antarctic']
-    carpeta_salida = "Continentes"
+import argparse
+from functools import partial
+import instrumentacion
+from instrumentacion import tramo
+from cacheApi import TTL_POR_DEFECTO
+
+CONTINENTES = ['Africa', 'Americas', 'Asia', 'Europe', 'Oceania', 'Antarctic']
+CARPETA_CONTINENTES = "Continentes"
+RUTA_TODOS = os.path.join(CARPETA_CONTINENTES, "Todos.csv")
+
+def procesar_todos_los_continentes(concurrente=True, max_trabajadores=4, url_base=None, cache=None, streaming=False):
+    # Descarga cada continente; en modo concurrente se hacen varias peticiones a la vez.
+    from generarPaises import obtener_y_guardar_paises, descargar_continentes_concurrente, URL_BASE_API # Importa requests.
+    url_base = url_base or URL_BASE_API
+    carpeta_salida = CARPETA_CONTINENTES
     print("--- INICIANDO PROCESO DE DESCARGA DE DATOS ---")
-    for continente in continentes:
-        print(f"\nProcesando {continente}...")
-        url = f"https://restcountries.com/v3.1/region/{continente}"
-        nombre_archivo = f"{continente}.csv"
-        obtener_y_guardar_paises(url, nombre_archivo, carpeta_salida)
+    if concurrente:
+        tiempos = descargar_continentes_concurrente(CONTINENTES, carpeta_salida, url_base=url_base, max_trabajadores=max_trabajadores,
+                                                    cache=cache, streaming=streaming)
+        print("\nTiempos por continente:")
+        for continente in CONTINENTES: # Mostramos los tiempos en el orden original.
+            exito, segundos = tiempos[continente]
+            estado = "OK" if exito else "ERROR"
+            print(f"  - {continente}: {segundos:.2f}s ({estado})")
+    else:
+        for continente in CONTINENTES:
+            print(f"\nProcesando {continente}...")
+            url = f"{url_base}/region/{continente}"
+            nombre_archivo = f"{continente}.csv"
+            obtener_y_guardar_paises(url, nombre_archivo, carpeta_salida, cache=cache, streaming=streaming)
     print("\n--- ¡PROCESO DE DESCARGA COMPLETADO! ---")
 
+def firma_archivo(ruta):
+    """Tamaño y fecha de modificación de 'ruta' (None si no existe); sirve para saber si cambió."""
+    try:
+        datos = os.stat(ruta)
+    except OSError:
+        return None
+    return datos.st_size, datos.st_mtime_ns
+
+def actualizar_datos(argumentos):
+    """
+    Descarga los continentes y arma Todos.csv según las opciones. Devuelve True si
+    Todos.csv cambió. Puede correr en un hilo de fondo mientras la ventana está abierta.
+    """
+    from cacheApi import CacheApi
+    from generarPaises import obtener_y_guardar_todos, unir_csvs_en_uno, URL_BASE_API
+    cache = None if argumentos.sin_cache else CacheApi(ttl=argumentos.ttl, offline=argumentos.offline)
+    firma_anterior = firma_archivo(RUTA_TODOS)
+    url_base = argumentos.url_base or URL_BASE_API # Con --url-base se puede usar un servidor local.
+
+    if argumentos.modo == "unico":
+        # Una sola descarga que escribe los CSV de continentes y Todos.csv en la misma pasada.
+        print("--- INICIANDO PROCESO DE DESCARGA DE DATOS ---")
+        with tramo("descarga", modo="unico"):
+            obtener_y_guardar_todos(CONTINENTES, CARPETA_CONTINENTES, RUTA_TODOS, cache=cache,
+                                    streaming=argumentos.streaming, url_base=url_base)
+        print("\n--- ¡PROCESO DE DESCARGA COMPLETADO! ---")
+    else:
+        # Genera los CSVs individuales para cada continente.
+        with tramo("descarga", modo="regiones"):
+            procesar_todos_los_continentes(cache=cache, streaming=argumentos.streaming, url_base=url_base)
+
+        # Le pasamos la ruta completa a la función para unirlos todos.
+        with tramo("unir_csvs"):
+            unir_csvs_en_uno(CARPETA_CONTINENTES, RUTA_TODOS, procesos=argumentos.procesos)
+    return firma_archivo(RUTA_TODOS) != firma_anterior
+
+def leer_argumentos():
+    """Lee las opciones de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Visor de Datos de Países")
+    origen = parser.add_mutually_exclusive_group() # --offline solo tiene sentido con la caché.
+    origen.add_argument("--offline", action="store_true", help="No usar la red, arrancar solo desde la caché.")
+    parser.add_argument("--ttl", type=int, default=TTL_POR_DEFECTO, help="Segundos durante los cuales la caché se considera fresca.")
+    parser.add_argument("--modo", choices=["regiones", "unico"], default="regiones",
+                        help="'regiones': una petición por continente; 'unico': una sola petición a /all.")
+    parser.add_argument("--streaming", action="store_true", help="Procesar cada país a medida que llega, sin cargar todo el JSON.")
+    parser.add_argument("--url-base", help="Dirección de la API (por ejemplo, la de benchmarks/servidor_simulado.py).")
+    origen.add_argument("--sin-cache", action="store_true", help="Descargar siempre todo, sin caché.")
+    parser.add_argument("--procesos", type=int,
+                        help="Unir los continentes con varios procesos (ingestaParalela); útil con archivos muy grandes.")
+    parser.add_argument("--refresco", choices=["fondo", "manual", "antes"], default="fondo",
+                        help="'fondo': abrir con los datos existentes y actualizarlos en segundo plano; 'manual': solo con el "
+                             "botón \"Actualizar Datos\"; 'antes': descargar antes de abrir la ventana. Sin Todos.csv siempre es 'antes'.")
+    parser.add_argument("--medir-arranque", action="store_true",
+                        help="Informar los hitos del arranque y cerrar la ventana al mostrar los datos (benchmarks/arranque.py).")
+    parser.add_argument("--diagnostico", action="store_true",
+                        help="Medir cada operación (panel de diagnóstico; al salir se exporta a la carpeta 'diagnostico').")
+    parser.add_argument("--perfil", action="store_true", help="Como --diagnostico, y además correr cProfile.")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    
-    # Genera los CSVs individuales para cada continente.
-    procesar_todos_los_continentes()
-    
-    # Llama a la nueva función para unirlos todos.
-    carpeta_continentes = "Continentes"
-    nombre_archivo_final = "Todos.csv"
-    
-    # Línea Corregida
-    # Unimos la carpeta y el nombre para crear la ruta completa.
-    ruta_archivo_final = os.path.join(carpeta_continentes, nombre_archivo_final)
-    
-    # Le pasamos la ruta completa a la función.
-    unir_csvs_en_uno(carpeta_continentes, ruta_archivo_final)
+    argumentos = leer_argumentos()
+    if argumentos.diagnostico or argumentos.perfil: # También se activa con la variable PAISES_DIAGNOSTICO.
+        instrumentacion.activar(perfil=argumentos.perfil)
+    actualizar = partial(actualizar_datos, argumentos)
+
+    refresco = argumentos.refresco
+    if refresco == "antes" or not os.path.exists(RUTA_TODOS): # Sin datos previos no hay nada que mostrar todavía.
+        actualizar()
+        refresco = "manual"
 
     # Iniciamos la Interfaz
-    interfaz.iniciar_interfaz()
\ No newline at end of file
+    import interfaz # Importa tkinter: recién ahora hace falta.
+    interfaz.iniciar_interfaz(actualizar=actualizar, refrescar=refresco == "fondo",
+                              medir=argumentos.medir_arranque, archivo_csv=RUTA_TODOS)
@@ -0,0 +1,360 @@
+# servicioPaises.py
+# Este módulo expone las consultas de consultaPaises como un servicio HTTP local hecho con
+# asyncio (solo biblioteca estándar). El dataset se carga una vez; las respuestas se guardan
+# en una caché LRU con ETag según la consulta normalizada, y si Todos.csv cambia se vuelve
+# a cargar en segundo plano y se descarta la caché.
+#
+# Concurrencia: el bucle de asyncio solo lee pedidos, responde desde la caché y escribe.
+# Buscar, filtrar, ordenar y serializar corren en un único hilo aparte: una consulta
+# pesada no frena a los clientes que piden respuestas ya guardadas, /salud o un 304. Las
+# consultas que no están en la caché se resuelven de a una (el dataset guarda estado de
+# sus estadísticas y, con el GIL, más hilos no harían más rápido el cálculo); si llegan
+# varias iguales a la vez se calcula una sola vez.
+#
+# Rutas (todas GET, responden JSON):
+#   /paises        búsqueda, filtro, orden y paginado combinados
+#   /buscar        igual, pero exige 'q'
+#   /filtrar       igual, pero exige algún criterio de filtro
+#   /estadisticas  estadísticas de los países que cumplen la consulta
+#   /salud         estado del servicio
+# Parámetros: q, continente, min_pob, max_pob, min_area, max_area, orden (repetible,
+# 'columna' o 'columna:desc'), columnas (separadas por comas), desde, limite, top.
+#
+# Uso: python -m servicioPaises [--puerto 8080] [--archivo Continentes/Todos.csv]
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from busquedaPaises import normalizar
+from consultaPaises import RUTA_POR_DEFECTO, consultar, estadisticas, filas_como_diccionarios, leer_orden, paginar
+from datosPaises import COLUMNAS
+from estadisticasPaises import TOP_N
+from snapshotPaises import preparar_dataset
+
+PUERTO_POR_DEFECTO = 8080
+TAMANIO_CACHE = 512 # Respuestas guardadas.
+LIMITE_POR_DEFECTO = 50 # Filas por página si no se pide otra cantidad.
+LIMITE_MAXIMO = 1000
+INTERVALO_RECARGA = 2.0 # Segundos entre revisiones de Todos.csv.
+TAMANIO_MAXIMO_CABECERAS = 16384
+RUTAS_CONSULTA = ['/paises', '/buscar', '/filtrar', '/estadisticas']
+PARAMETROS_FILTRO = ['continente', 'min_pob', 'max_pob', 'min_area', 'max_area']
+ESTADOS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 431: "Request Header Fields Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+class ErrorConsulta(Exception):
+    """Parámetros inválidos: se responde 400 con el mensaje."""
+
+def _entero(parametros, nombre, defecto=None, minimo=None):
+    valor = parametros.get(nombre)
+    if valor is None:
+        return defecto
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ErrorConsulta(f"'{nombre}' debe ser un número entero.")
+    if minimo is not None and numero < minimo:
+        raise ErrorConsulta(f"'{nombre}' debe ser al menos {minimo}.")
+    return numero
+
+def _decimal(parametros, nombre):
+    valor = parametros.get(nombre)
+    if valor is None:
+        return None
+    try:
+        return float(valor)
+    except ValueError:
+        raise ErrorConsulta(f"'{nombre}' debe ser un número.")
+
+def leer_consulta(ruta, query):
+    """
+    Convierte la ruta y el query string en una consulta normalizada (tupla ordenable y
+    hasheable): dos URLs que piden lo mismo con otro orden de parámetros, mayúsculas o
+    tildes en la búsqueda dan la misma clave de caché.
+    """
+    crudos = parse_qs(query, keep_blank_values=False)
+    parametros = {nombre: valores[-1] for nombre, valores in crudos.items()}
+    try:
+        orden = tuple(leer_orden(texto) for texto in crudos.get('orden', []))
+    except argparse.ArgumentTypeError as error:
+        raise ErrorConsulta(str(error))
+    columnas = tuple(parametros['columnas'].split(',')) if 'columnas' in parametros else tuple(COLUMNAS)
+    desconocidas = [c for c in columnas if c not in COLUMNAS]
+    if desconocidas:
+        raise ErrorConsulta(f"Columnas desconocidas: {', '.join(desconocidas)}")
+    texto = normalizar(parametros.get('q', '').strip()) or None
+    continente = parametros.get('continente')
+    consulta = {
+        'ruta': ruta,
+        'q': texto,
+        'continente': None if continente in (None, '', 'Todos') else continente,
+        'min_pob': _entero(parametros, 'min_pob'),
+        'max_pob': _entero(parametros, 'max_pob'),
+        'min_area': _decimal(parametros, 'min_area'),
+        'max_area': _decimal(parametros, 'max_area'),
+        'orden': orden,
+        'columnas': columnas,
+        'desde': _entero(parametros, 'desde', 0, minimo=0),
+        'limite': min(_entero(parametros, 'limite', LIMITE_POR_DEFECTO, minimo=0), LIMITE_MAXIMO),
+        'top': min(_entero(parametros, 'top', TOP_N, minimo=0), LIMITE_MAXIMO),
+    }
+    if ruta == '/buscar' and not consulta['q']:
+        raise ErrorConsulta("Falta el parámetro 'q'.")
+    if ruta == '/filtrar' and all(consulta[p] is None for p in PARAMETROS_FILTRO):
+        raise ErrorConsulta(f"Falta algún criterio de filtro ({', '.join(PARAMETROS_FILTRO)}).")
+    if ruta != '/estadisticas': # Los parámetros que no afectan la respuesta no separan entradas de caché.
+        consulta.pop('top')
+    else:
+        for nombre in ('orden', 'columnas', 'desde', 'limite'):
+            consulta.pop(nombre)
+    return consulta
+
+def _clave(consulta):
+    return tuple(sorted(consulta.items()))
+
+class ServicioPaises:
+    """Estado del servicio: dataset cargado, versión y caché de respuestas."""
+
+    def __init__(self, ruta_csv, tamanio_cache=TAMANIO_CACHE):
+        self.ruta_csv = ruta_csv
+        self.tamanio_cache = tamanio_cache
+        self.dataset = None
+        self.version = 0 # Cambia con cada recarga; forma parte de los ETag.
+        self.firma = None # (tamaño, mtime) del CSV cargado.
+        self.cargado_en = None
+        self.cache = OrderedDict() # clave de consulta -> (etag, cuerpo).
+        self.en_curso = {} # clave de consulta -> futuro de la respuesta que se está calculando.
+        self.aciertos = self.fallos = 0
+        self._consultas = ThreadPoolExecutor(max_workers=1, thread_name_prefix="consultas") # Fuera del bucle de eventos.
+
+    # Carga
+
+    def _firma_actual(self):
+        try:
+            info = os.stat(self.ruta_csv)
+        except OSError:
+            return None
+        return info.st_size, info.st_mtime_ns
+
+    @staticmethod
+    def _preparar(ruta_csv):
+        # Corre en un hilo: carga y arma los índices antes de publicar el dataset.
+        return preparar_dataset(ruta_csv, columnas_orden=COLUMNAS)
+
+    async def cargar(self):
+        """Carga (o recarga) el dataset en un hilo y lo reemplaza de una sola vez."""
+        firma = self._firma_actual()
+        dataset = await asyncio.get_running_loop().run_in_executor(None, self._preparar, self.ruta_csv)
+        self.dataset, self.firma = dataset, firma
+        self.version += 1
+        self.cargado_en = time.time()
+        self.cache.clear() # Las respuestas guardadas eran del dataset anterior.
+
+    async def vigilar_archivo(self, intervalo=INTERVALO_RECARGA):
+        """Revisa periódicamente Todos.csv y lo vuelve a cargar si cambió."""
+        informada = None # Firma del último error informado (no se repite el mensaje en cada revisión).
+        while True:
+            await asyncio.sleep(intervalo)
+            firma = self._firma_actual()
+            if firma is not None and firma != self.firma:
+                try:
+                    await self.cargar()
+                    print(f"Recargado {self.ruta_csv}: {len(self.dataset)} países (versión {self.version}).")
+                except Exception as error: # Archivo a medio escribir (OSError, csv.Error, struct.error, UnicodeDecodeError...):
+                    # se informa y se reintenta en la próxima revisión, sin terminar la vigilancia.
+                    if firma != informada:
+                        print(f"No se pudo recargar {self.ruta_csv}: {error!r}")
+                        informada = firma
+
+    # Respuestas
+
+    async def responder(self, ruta, query, si_no_coincide=None):
+        """Devuelve (estado, cuerpo, etag) para una consulta GET."""
+        if ruta == '/salud':
+            cuerpo = {'paises': len(self.dataset) if self.dataset is not None else 0, 'version': self.version,
+                      'cargado_en': self.cargado_en, 'cache': len(self.cache), 'aciertos': self.aciertos, 'fallos': self.fallos}
+            return 200, _json(cuerpo), None
+        if ruta not in RUTAS_CONSULTA:
+            return 404, _json({'error': f"Ruta desconocida: {ruta}"}), None
+        if self.dataset is None:
+            return 503, _json({'error': "El dataset todavía se está cargando."}), None
+        try:
+            consulta = leer_consulta(ruta, query)
+        except ErrorConsulta as error:
+            return 400, _json({'error': str(error)}), None
+
+        # 1. Buscar en la Caché
+        clave = _clave(consulta)
+        guardada = self.cache.get(clave)
+        if guardada is not None:
+            self.aciertos += 1
+            self.cache.move_to_end(clave)
+        elif clave in self.en_curso: # La misma consulta ya se está calculando: se espera esa.
+            self.aciertos += 1
+            guardada = await asyncio.shield(self.en_curso[clave])
+        else:
+            # 2. Resolver en el Hilo de Consultas y Guardar
+            self.fallos += 1
+            dataset, version = self.dataset, self.version
+            futuro = self.en_curso[clave] = asyncio.get_running_loop().run_in_executor(
+                self._consultas, self._resolver_etiquetado, dataset, version, consulta)
+            try:
+                guardada = await asyncio.shield(futuro)
+            finally:
+                self.en_curso.pop(clave, None)
+            if version == self.version: # Si se recargó mientras tanto, la respuesta no se guarda.
+                self.cache[clave] = guardada
+                if len(self.cache) > self.tamanio_cache:
+                    self.cache.popitem(last=False)
+        etag, cuerpo = guardada
+        if si_no_coincide is not None and coincide_etag(etag, si_no_coincide):
+            return 304, b'', etag
+        return 200, cuerpo, etag
+
+    def cerrar(self):
+        """Libera el hilo de consultas."""
+        self._consultas.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def _resolver_etiquetado(cls, dataset, version, consulta):
+        # Corre en el hilo de consultas: resuelve, serializa y calcula el ETag.
+        cuerpo = _json(cls._resolver(dataset, consulta))
+        return f'"{version}-{hashlib.blake2b(cuerpo, digest_size=8).hexdigest()}"', cuerpo
+
+    @staticmethod
+    def _resolver(dataset, consulta):
+        indices = consultar(dataset, consulta['q'], consulta['continente'], consulta['min_pob'], consulta['max_pob'],
+                            consulta['min_area'], consulta['max_area'], list(consulta.get('orden', ())))
+        if consulta['ruta'] == '/estadisticas':
+            todas = len(indices) == len(dataset)
+            return {'total': len(indices), 'estadisticas': estadisticas(dataset, None if todas else indices, consulta['top'])}
+        pagina = paginar(indices, consulta['desde'], consulta['limite'])
+        return {
+            'total': len(indices),
+            'desde': consulta['desde'],
+            'limite': consulta['limite'],
+            'filas': list(filas_como_diccionarios(dataset, pagina, consulta['columnas'])),
+        }
+
+def coincide_etag(etag, si_no_coincide):
+    """
+    Compara con If-None-Match como indica la RFC 9110 (comparación débil): '*' coincide
+    con cualquier versión y se ignora el prefijo W/ de los dos lados.
+    """
+    if si_no_coincide.strip() == '*':
+        return True
+    fuerte = etag[2:] if etag.startswith('W/') else etag
+    candidatos = (e.strip() for e in si_no_coincide.split(','))
+    return any((c[2:] if c.startswith('W/') else c) == fuerte for c in candidatos)
+
+def _json(objeto):
+    return json.dumps(objeto, ensure_ascii=False).encode('utf-8')
+
+# HTTP
+
+async def _leer_pedido(lector):
+    """Lee la línea de pedido y las cabeceras. Devuelve (método, destino, versión, cabeceras) o None si se cerró."""
+    try:
+        bloque = await lector.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise ValueError(431)
+    lineas = bloque.decode('latin-1').split('\r\n')
+    partes = lineas[0].split()
+    if len(partes) != 3:
+        raise ValueError(400)
+    cabeceras = {}
+    for linea in lineas[1:]:
+        if ':' in linea:
+            nombre, _, valor = linea.partition(':')
+            cabeceras[nombre.strip().lower()] = valor.strip()
+    return partes[0], partes[1], partes[2], cabeceras
+
+def _respuesta(estado, cuerpo, etag=None, mantener=True, incluir_cuerpo=True):
+    cabeceras = [f"HTTP/1.1 {estado} {ESTADOS.get(estado, '')}",
+                 "Content-Type: application/json; charset=utf-8",
+                 f"Connection: {'keep-alive' if mantener else 'close'}"]
+    if estado != 304: # Un 304 no lleva cuerpo ni indica su largo (RFC 9110, sección 15.4.5).
+        cabeceras.insert(2, f"Content-Length: {len(cuerpo)}")
+    if etag is not None:
+        cabeceras.append(f"ETag: {etag}")
+        cabeceras.append("Cache-Control: no-cache") # El cliente puede guardarla, pero revalida con If-None-Match.
+    return ('\r\n'.join(cabeceras) + '\r\n\r\n').encode('latin-1') + (cuerpo if incluir_cuerpo else b'')
+
+async def atender_conexion(servicio, lector, escritor):
+    """Atiende los pedidos de una conexión (con keep-alive) hasta que el cliente la cierre."""
+    try:
+        while True:
+            try:
+                pedido = await _leer_pedido(lector)
+            except ValueError as error:
+                estado = error.args[0]
+                escritor.write(_respuesta(estado, _json({'error': ESTADOS[estado]}), mantener=False))
+                break
+            if pedido is None:
+                break
+            metodo, destino, version, cabeceras = pedido
+            mantener = cabeceras.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+            try:
+                if metodo not in ('GET', 'HEAD'):
+                    estado, cuerpo, etag = 405, _json({'error': "Solo se admiten GET y HEAD."}), None
+                else:
+                    partes = urlsplit(destino)
+                    estado, cuerpo, etag = await servicio.responder(partes.path.rstrip('/') or '/', partes.query,
+                                                                    cabeceras.get('if-none-match'))
+                respuesta = _respuesta(estado, cuerpo, etag, mantener, incluir_cuerpo=metodo != 'HEAD')
+            except Exception as error: # Un error inesperado se responde con 500 en lugar de cortar la conexión.
+                print(f"Error al responder {metodo} {destino}: {error!r}")
+                mantener = False
+                respuesta = _respuesta(500, _json({'error': ESTADOS[500]}), mantener=False,
+                                       incluir_cuerpo=metodo != 'HEAD')
+            escritor.write(respuesta)
+            await escritor.drain()
+            if not mantener:
+                break
+    except ConnectionError: # El cliente cortó la conexión.
+        pass
+    finally:
+        escritor.close()
+
+async def servir(ruta_csv=RUTA_POR_DEFECTO, host="127.0.0.1", puerto=PUERTO_POR_DEFECTO, intervalo_recarga=INTERVALO_RECARGA):
+    """Carga el dataset, empieza a vigilar el CSV y atiende pedidos hasta que se cancele."""
+    servicio = ServicioPaises(ruta_csv)
+    await servicio.cargar()
+    vigilancia = asyncio.create_task(servicio.vigilar_archivo(intervalo_recarga))
+    servidor = await asyncio.start_server(lambda l, e: atender_conexion(servicio, l, e), host, puerto,
+                                          limit=TAMANIO_MAXIMO_CABECERAS)
+    print(f"Sirviendo {len(servicio.dataset)} países en http://{host}:{puerto}/paises")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        vigilancia.cancel()
+        servicio.cerrar()
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP de consultas sobre Todos.csv.")
+    parser.add_argument("--archivo", default=RUTA_POR_DEFECTO, help="CSV de países (por defecto Continentes/Todos.csv).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+    parser.add_argument("--intervalo-recarga", type=float, default=INTERVALO_RECARGA,
+                        help="Segundos entre revisiones del CSV para recargarlo si cambió.")
+    argumentos = parser.parse_args()
+    if not os.path.exists(argumentos.archivo):
+        parser.exit(1, f"No se encontró el archivo de datos: {argumentos.archivo}\n")
+    try:
+        asyncio.run(servir(argumentos.archivo, argumentos.host, argumentos.puerto, argumentos.intervalo_recarga))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
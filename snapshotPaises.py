@@ -0,0 +1,257 @@
+# snapshotPaises.py
+# Este módulo guarda el dataset de países en un archivo binario compacto (snapshot) y lo
+# vuelve a abrir con mmap: las columnas numéricas se leen directamente del archivo sin
+# copiarlas ni convertir texto. Si el snapshot no corresponde al CSV actual se usa el CSV.
+#
+# Formato (orden de bytes nativo, indicado en la cabecera):
+#   cabecera  : magia 'PAIS', versión, orden de bytes, cantidad de filas, tamaño y mtime
+#               del CSV de origen, SHA-256 del CSV y cantidad de secciones.
+#   tabla     : (desplazamiento, longitud) de cada sección.
+#   secciones : columnas numéricas de ancho fijo y, por cada columna de texto, un arreglo
+#               de desplazamientos (uint32, n+1) más el montón de bytes UTF-8.
+#               Cada sección empieza alineada a 8 bytes.
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from datosPaises import DatasetPaises, COLUMNAS_TEXTO, COLUMNAS_CATEGORIA
+from instrumentacion import tramo
+
+MAGIA = b'PAIS'
+VERSION_ESQUEMA = 1
+CABECERA = struct.Struct('<4sHcxIQq32sI') # magia, versión, orden de bytes, filas, tamaño, mtime, sha256, secciones.
+ENTRADA_TABLA = struct.Struct('<QQ') # desplazamiento, longitud.
+EXTENSION = ".bin"
+
+# Secciones en el orden en que se escriben: (nombre, código de tipo de array).
+SECCIONES_NUMERICAS = [('poblacion', 'q'), ('area', 'd')] + [(f"codigos_{c}", 'H') for c in COLUMNAS_CATEGORIA]
+SECCIONES_TEXTO = COLUMNAS_TEXTO + [f"categorias_{c}" for c in COLUMNAS_CATEGORIA]
+
+class ColumnaTexto:
+    """Columna de textos leída del montón de bytes del snapshot; cada valor se decodifica al pedirlo."""
+
+    def __init__(self, desplazamientos, monton):
+        self._desplazamientos = desplazamientos # memoryview de uint32 con n+1 posiciones.
+        self._monton = monton # memoryview de bytes UTF-8.
+
+    def __len__(self):
+        return len(self._desplazamientos) - 1
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += len(self)
+        inicio, fin = self._desplazamientos[indice], self._desplazamientos[indice + 1]
+        return str(self._monton[inicio:fin], 'utf-8')
+
+    def __iter__(self):
+        # Decodifica todo el montón de una vez y lo corta, más rápido que valor por valor.
+        texto = bytes(self._monton)
+        desplazamientos = self._desplazamientos
+        for i in range(len(self)):
+            yield texto[desplazamientos[i]:desplazamientos[i + 1]].decode('utf-8')
+
+def ruta_snapshot(ruta_csv):
+    """Devuelve la ruta del snapshot que acompaña a un CSV (Todos.csv -> Todos.bin)."""
+    return os.path.splitext(ruta_csv)[0] + EXTENSION
+
+def hash_archivo(ruta, tamanio_bloque=1 << 20):
+    """SHA-256 de un archivo, leído por bloques."""
+    resumen = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(tamanio_bloque), b''):
+            resumen.update(bloque)
+    return resumen.digest()
+
+def _codificar_textos(valores):
+    """Devuelve (desplazamientos uint32, montón de bytes) para una lista de textos."""
+    desplazamientos = array('I', [0])
+    partes = []
+    total = 0
+    for valor in valores:
+        codificado = valor.encode('utf-8')
+        total += len(codificado)
+        if total > 0xFFFFFFFF:
+            raise ValueError("La columna de texto supera los 4 GiB que admite el snapshot.")
+        partes.append(codificado)
+        desplazamientos.append(total)
+    return desplazamientos.tobytes(), b''.join(partes)
+
+def escribir_snapshot(dataset, ruta_csv, ruta_salida=None):
+    """
+    Escribe el snapshot binario del dataset. Guarda en la cabecera el tamaño, la fecha
+    y el hash del CSV de origen para poder detectar si quedó desactualizado.
+    """
+    ruta_salida = ruta_salida or ruta_snapshot(ruta_csv)
+    info = os.stat(ruta_csv)
+
+    # 1. Armar las Secciones en Memoria
+    secciones = [
+        array('q', dataset.poblacion).tobytes(),
+        array('d', dataset.area).tobytes(),
+    ] + [array('H', dataset.codigos[c]).tobytes() for c in COLUMNAS_CATEGORIA]
+    for valores in [dataset.textos[c] for c in COLUMNAS_TEXTO] + [dataset.categorias[c] for c in COLUMNAS_CATEGORIA]:
+        secciones.extend(_codificar_textos(valores))
+
+    # 2. Calcular Desplazamientos Alineados a 8 Bytes
+    posicion = CABECERA.size + ENTRADA_TABLA.size * len(secciones)
+    tabla = []
+    for seccion in secciones:
+        posicion = (posicion + 7) & ~7
+        tabla.append((posicion, len(seccion)))
+        posicion += len(seccion)
+
+    # 3. Escribir en un Temporal y Renombrar
+    cabecera = CABECERA.pack(MAGIA, VERSION_ESQUEMA, sys.byteorder[0].encode(), len(dataset),
+                             info.st_size, info.st_mtime_ns, hash_archivo(ruta_csv), len(secciones))
+    ruta_temporal = ruta_salida + ".tmp"
+    with open(ruta_temporal, 'wb') as archivo:
+        archivo.write(cabecera)
+        for entrada in tabla:
+            archivo.write(ENTRADA_TABLA.pack(*entrada))
+        for (desplazamiento, _), seccion in zip(tabla, secciones):
+            archivo.write(b'\0' * (desplazamiento - archivo.tell())) # Relleno de alineación.
+            archivo.write(seccion)
+    try:
+        os.replace(ruta_temporal, ruta_salida) # En Windows falla si alguien tiene mapeado el snapshot anterior.
+    except OSError:
+        os.remove(ruta_temporal)
+        raise
+    return ruta_salida
+
+def guardar_snapshot_desde_csv(ruta_csv, ruta_salida=None):
+    """Lee el CSV y escribe su snapshot. Devuelve la ruta del snapshot."""
+    return escribir_snapshot(DatasetPaises.desde_csv(ruta_csv), ruta_csv, ruta_salida)
+
+def _leer_cabecera(datos):
+    magia, version, orden, filas, tamanio, mtime, resumen, cantidad = CABECERA.unpack_from(datos, 0)
+    return {'magia': magia, 'version': version, 'orden': orden, 'filas': filas,
+            'tamanio': tamanio, 'mtime': mtime, 'hash': resumen, 'secciones': cantidad}
+
+def snapshot_vigente(ruta_csv, ruta_snap=None):
+    """
+    True si el snapshot existe, tiene el esquema actual y corresponde al CSV. Si el tamaño
+    y la fecha coinciden se confía en él; si no, se compara el hash del contenido.
+    """
+    ruta_snap = ruta_snap or ruta_snapshot(ruta_csv)
+    if not (os.path.exists(ruta_snap) and os.path.exists(ruta_csv)):
+        return False
+    with open(ruta_snap, 'rb') as archivo:
+        datos = archivo.read(CABECERA.size)
+    if len(datos) < CABECERA.size:
+        return False
+    cabecera = _leer_cabecera(datos)
+    if (cabecera['magia'] != MAGIA or cabecera['version'] != VERSION_ESQUEMA
+            or cabecera['orden'] != sys.byteorder[0].encode()):
+        return False
+    info = os.stat(ruta_csv)
+    if info.st_size != cabecera['tamanio']:
+        return False
+    if info.st_mtime_ns == cabecera['mtime']:
+        return True
+    return hash_archivo(ruta_csv) == cabecera['hash'] # La fecha cambió: verificamos el contenido.
+
+def cargar_snapshot(ruta_snap):
+    """
+    Abre el snapshot con mmap y arma un DatasetPaises cuyas columnas son vistas sobre el
+    archivo (sin copiar). El mapeo queda abierto mientras exista el dataset.
+    """
+    with open(ruta_snap, 'rb') as archivo:
+        mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    vista = memoryview(mapa)
+    cabecera = _leer_cabecera(vista)
+    tabla = [ENTRADA_TABLA.unpack_from(vista, CABECERA.size + i * ENTRADA_TABLA.size)
+             for i in range(cabecera['secciones'])]
+    secciones = [vista[desplazamiento:desplazamiento + longitud] for desplazamiento, longitud in tabla]
+
+    # Columnas numéricas: vistas tipadas directamente sobre el archivo.
+    numericas = {nombre: seccion.cast(tipo) for (nombre, tipo), seccion in zip(SECCIONES_NUMERICAS, secciones)}
+    # Columnas de texto: pares (desplazamientos, montón).
+    resto = secciones[len(SECCIONES_NUMERICAS):]
+    textos = {nombre: ColumnaTexto(resto[2 * i].cast('I'), resto[2 * i + 1]) for i, nombre in enumerate(SECCIONES_TEXTO)}
+
+    dataset = DatasetPaises.desde_columnas(
+        textos={c: textos[c] for c in COLUMNAS_TEXTO},
+        poblacion=numericas['poblacion'],
+        area=numericas['area'],
+        categorias={c: list(textos[f"categorias_{c}"]) for c in COLUMNAS_CATEGORIA},
+        codigos={c: numericas[f"codigos_{c}"] for c in COLUMNAS_CATEGORIA},
+    )
+    dataset.mapa = mapa # Mantiene vivo el mmap mientras se use el dataset.
+    return dataset
+
+def cerrar_snapshot(dataset):
+    """
+    Libera las columnas y cierra el mmap de un dataset abierto con cargar_snapshot, para
+    que el archivo se pueda reemplazar (en Windows no se puede mientras está mapeado).
+    El dataset ya no se puede usar después. Devuelve True si el mapeo quedó cerrado.
+    """
+    mapa = getattr(dataset, 'mapa', None)
+    if mapa is None:
+        return False
+    vistas = [dataset.poblacion, dataset.area, *dataset.codigos.values()]
+    for columna in dataset.textos.values():
+        if isinstance(columna, ColumnaTexto):
+            vistas += [columna._desplazamientos, columna._monton]
+    for vista in vistas:
+        if isinstance(vista, memoryview):
+            vista.release()
+    try:
+        mapa.close()
+    except BufferError: # Queda alguna vista viva (por ejemplo, de un índice): se cierra al liberarse.
+        return False
+    dataset.mapa = None
+    return True
+
+def cargar_dataset(ruta_csv, regenerar=True):
+    """
+    Carga el dataset desde el snapshot si está vigente; si no, desde el CSV.
+    Con regenerar=True, después de leer el CSV se intenta reescribir el snapshot.
+    """
+    ruta_snap = ruta_snapshot(ruta_csv)
+    if snapshot_vigente(ruta_csv, ruta_snap):
+        try:
+            with tramo("abrir_snapshot", archivo=ruta_snap) as medicion:
+                dataset = cargar_snapshot(ruta_snap)
+                medicion.contar(devueltas=len(dataset))
+            return dataset
+        except (OSError, ValueError, struct.error, TypeError): # Snapshot dañado: seguimos con el CSV.
+            pass
+    dataset = DatasetPaises.desde_csv(ruta_csv)
+    if regenerar:
+        try:
+            with tramo("escribir_snapshot", archivo=ruta_snap):
+                escribir_snapshot(dataset, ruta_csv, ruta_snap)
+        except OSError: # Sin permisos de escritura no es un error: solo perdemos la aceleración.
+            pass
+    return dataset
+
+def preparar_dataset(ruta_csv, tarea=None, columnas_orden=()):
+    """
+    Carga el dataset y arma sus índices (búsqueda, órdenes de 'columnas_orden', filtro y
+    estadísticas), para que la primera consulta no pague ese costo. No usa la interfaz:
+    puede correr en un hilo de fondo e informa el avance con 'tarea' (tareasFondo).
+    """
+    pasos = [
+        ("indice_busqueda", "Construyendo el índice de búsqueda...", lambda d: d.indice_prefijos()),
+        ("indice_orden", "Ordenando columnas...", lambda d: d.precalcular_ordenes(columnas_orden)),
+        ("indice_filtro", "Armando los índices de filtro...", lambda d: d.motor_filtros()),
+        ("indice_estadisticas", "Calculando estadísticas...", lambda d: d.motor_estadisticas()),
+    ]
+    if tarea is not None:
+        tarea.reportar(0.0, "Cargando datos...")
+    if not os.path.exists(ruta_csv):
+        raise FileNotFoundError(ruta_csv)
+    with tramo("carga", archivo=ruta_csv) as medicion:
+        dataset = cargar_dataset(ruta_csv) # Lee el snapshot o el CSV y arma las columnas tipadas.
+        medicion.contar(devueltas=len(dataset))
+        for numero, (nombre, mensaje, paso) in enumerate(pasos, start=1):
+            if tarea is not None:
+                tarea.verificar()
+                tarea.reportar(numero / (len(pasos) + 1), mensaje)
+            with tramo(nombre):
+                paso(dataset)
+    return dataset
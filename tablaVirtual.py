@@ -0,0 +1,165 @@
+# tablaVirtual.py
+# Este módulo muestra un dataset muy grande en un Treeview sin insertar todas las filas:
+# solo existen los ítems de la ventana visible (más un margen), y al desplazarse se
+# reutilizan esos mismos ítems cambiando sus valores. La barra de desplazamiento se
+# traduce a una posición dentro del dataset.
+
+from tkinter import ttk
+
+MARGEN_FILAS = 5 # Filas extra materializadas debajo de las visibles.
+ALTO_FILA_POR_DEFECTO = 20 # Píxeles por fila si el estilo no indica otro valor.
+
+def _alto_fila_estilo():
+    """Lee el alto de fila configurado en el estilo de Treeview."""
+    try:
+        alto = ttk.Style().lookup("Treeview", "rowheight")
+        return int(alto) if alto else ALTO_FILA_POR_DEFECTO
+    except (ValueError, TypeError):
+        return ALTO_FILA_POR_DEFECTO
+
+class TablaVirtual:
+    """
+    Envuelve un Treeview y su barra vertical para mostrar solo la parte visible de los datos.
+    'mostrar' recibe el dataset y los índices de fila a mostrar (como mostrar_datos_en_treeview).
+    """
+
+    def __init__(self, tree, barra_vertical, columnas, alto_fila=None):
+        self.tree = tree
+        self.barra = barra_vertical
+        self.columnas = columnas
+        self.alto_fila = alto_fila or _alto_fila_estilo()
+        self.dataset = None
+        self.indices = range(0) # Índices de fila del dataset en el orden a mostrar.
+        self.desplazamiento = 0 # Posición (dentro de 'indices') de la primera fila visible.
+        self.filas_visibles = 20 # Se ajusta con el tamaño real del widget.
+        self.items = [] # Ítems del Treeview que se reutilizan en cada refresco.
+        self._separados = set() # Ítems del pool que hoy no se muestran (detach).
+        self.fila_seleccionada = None # Fila del dataset seleccionada, para conservarla al desplazarse.
+
+        # La barra y la rueda del mouse mueven el desplazamiento, no el Treeview.
+        self.tree.configure(yscrollcommand=lambda *_: None)
+        self.barra.configure(command=self.yview)
+        self.tree.bind("<Configure>", self._al_redimensionar, add="+")
+        self.tree.bind("<<TreeviewSelect>>", self._al_seleccionar, add="+")
+        for evento in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(evento, self._al_mover_rueda, add="+")
+        for tecla, filas in (("<Up>", -1), ("<Down>", 1)):
+            self.tree.bind(tecla, lambda _e, f=filas: self._al_mover_seleccion(f))
+        for tecla, paginas in (("<Prior>", -1), ("<Next>", 1)):
+            self.tree.bind(tecla, lambda _e, p=paginas: self.yview("scroll", p, "pages") or "break")
+
+    # Datos
+
+    def mostrar(self, dataset, indices=None, conservar_posicion=False):
+        """Cambia las filas a mostrar. Por defecto vuelve al principio de la lista."""
+        self.dataset = dataset
+        if indices is None:
+            indices = range(len(dataset)) if dataset else range(0)
+        self.indices = indices
+        if not conservar_posicion:
+            self.desplazamiento = 0
+        self._refrescar()
+
+    def __len__(self):
+        return len(self.indices)
+
+    # Desplazamiento
+
+    def yview(self, *args):
+        """Recibe los comandos de la barra ('moveto', fracción) o ('scroll', n, 'units'/'pages')."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._ir_a(int(float(args[1]) * len(self.indices)))
+        elif args[0] == "scroll":
+            paso = int(args[1]) * (self.filas_visibles if args[2] == "pages" else 1)
+            self._ir_a(self.desplazamiento + paso)
+
+    def _ir_a(self, posicion):
+        maximo = max(0, len(self.indices) - self.filas_visibles)
+        posicion = min(max(0, posicion), maximo)
+        if posicion != self.desplazamiento:
+            self.desplazamiento = posicion
+            self._refrescar()
+
+    def _al_mover_rueda(self, evento):
+        if getattr(evento, "num", None) == 4 or getattr(evento, "delta", 0) > 0:
+            self._ir_a(self.desplazamiento - 3)
+        else:
+            self._ir_a(self.desplazamiento + 3)
+        return "break"
+
+    def _al_redimensionar(self, evento):
+        filas = max(1, evento.height // self.alto_fila - 1) # Se descuenta la fila de encabezados.
+        if filas != self.filas_visibles:
+            self.filas_visibles = filas
+            self._refrescar()
+
+    # Selección
+
+    def _al_seleccionar(self, _evento=None):
+        seleccion = self.tree.selection()
+        if seleccion and seleccion[0] in self.items:
+            posicion = self.desplazamiento + self.items.index(seleccion[0])
+            if posicion < len(self.indices):
+                self.fila_seleccionada = self.indices[posicion]
+
+    def _al_mover_seleccion(self, filas):
+        """Flechas arriba/abajo: mueve la selección y desplaza la ventana si sale de la vista."""
+        seleccion = self.tree.selection()
+        actual = self.desplazamiento + self.items.index(seleccion[0]) if seleccion and seleccion[0] in self.items else self.desplazamiento - 1
+        nueva = min(max(0, actual + filas), len(self.indices) - 1)
+        if nueva < 0:
+            return "break"
+        if nueva < self.desplazamiento:
+            self._ir_a(nueva)
+        elif nueva >= self.desplazamiento + self.filas_visibles:
+            self._ir_a(nueva - self.filas_visibles + 1)
+        self.fila_seleccionada = self.indices[nueva]
+        self._restaurar_seleccion()
+        return "break"
+
+    def _restaurar_seleccion(self):
+        # Como los ítems se reutilizan, la selección se vuelve a ubicar según la fila del dataset.
+        if self.fila_seleccionada is None:
+            return
+        for k, item in enumerate(self.items):
+            posicion = self.desplazamiento + k
+            if posicion >= len(self.indices) or k >= self.filas_visibles:
+                break
+            if self.indices[posicion] == self.fila_seleccionada:
+                if self.tree.selection() != (item,):
+                    self.tree.selection_set(item)
+                return
+        if self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+    # Dibujo
+
+    def _refrescar(self):
+        """Actualiza los valores de los ítems del pool con la ventana actual de filas."""
+        tamanio_pool = self.filas_visibles + MARGEN_FILAS
+        while len(self.items) < tamanio_pool: # El pool solo crece cuando la ventana se agranda.
+            self.items.append(self.tree.insert("", "end", values=()))
+        total = len(self.indices)
+        self.desplazamiento = min(self.desplazamiento, max(0, total - self.filas_visibles))
+        necesarios = max(0, min(len(self.items), total - self.desplazamiento))
+        for k, item in enumerate(self.items):
+            if k < necesarios:
+                fila = self.indices[self.desplazamiento + k]
+                self.tree.item(item, values=self.dataset.valores_fila(fila, self.columnas))
+                if item in self._separados:
+                    self.tree.move(item, "", k) # Vuelve a insertar el ítem existente en su lugar.
+                    self._separados.discard(item)
+            elif item not in self._separados:
+                self.tree.detach(item)
+                self._separados.add(item)
+        self._restaurar_seleccion()
+        self._actualizar_barra()
+
+    def _actualizar_barra(self):
+        total = len(self.indices)
+        if total <= self.filas_visibles:
+            self.barra.set(0.0, 1.0)
+        else:
+            self.barra.set(self.desplazamiento / total, (self.desplazamiento + self.filas_visibles) / total)
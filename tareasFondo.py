@@ -0,0 +1,187 @@
+# tareasFondo.py
+# Este módulo ejecuta trabajos largos (cargar datos, armar índices, filtrar, ordenar,
+# calcular estadísticas) fuera del hilo de la interfaz. Los resultados, errores y avisos
+# de progreso vuelven por una cola que la interfaz revisa periódicamente con after(), así
+# los callbacks siempre corren en el hilo de Tk. Una tarea nueva de un mismo grupo cancela
+# la anterior: si no había empezado no se ejecuta y, si ya estaba corriendo, su resultado
+# se descarta (o se corta antes si la tarea revisa 'verificar').
+# No depende de tkinter: solo necesita un objeto con after().
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+INTERVALO_SONDEO_MS = 50 # Cada cuánto la interfaz revisa la cola de resultados.
+
+class TareaCancelada(Exception):
+    """Se lanza dentro de una tarea (con Tarea.verificar) cuando otra más nueva la reemplazó."""
+
+class Tarea:
+    """Un trabajo enviado al ejecutor. Se puede cancelar y puede informar su progreso."""
+
+    def __init__(self, ejecutor, grupo, al_terminar, al_fallar, al_progresar):
+        self.grupo = grupo
+        self.futuro = None
+        self._ejecutor = ejecutor
+        self._cancelada = threading.Event()
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.al_progresar = al_progresar
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+    def cancelar(self):
+        """Evita que la tarea empiece o, si ya empezó, que se entregue su resultado."""
+        self._cancelada.set()
+        if self.futuro is not None:
+            self.futuro.cancel()
+
+    def verificar(self):
+        """Para llamar entre pasos de una tarea larga: la corta si fue cancelada."""
+        if self.cancelada:
+            raise TareaCancelada()
+
+    def reportar(self, fraccion, mensaje=""):
+        """Informa el avance (de 0 a 1) y un mensaje; se entrega en el hilo de la interfaz."""
+        self._ejecutor._cola.put(('progreso', self, (fraccion, mensaje)))
+
+class _TrabajadorDemonio:
+    """
+    Lo mismo que un ThreadPoolExecutor de un solo hilo, pero el hilo es daemon: una tarea
+    que no se puede cortar (una descarga, por ejemplo) no retiene la salida del proceso.
+    """
+
+    def __init__(self, nombre):
+        self._pendientes = queue.SimpleQueue()
+        threading.Thread(target=self._trabajar, name=nombre, daemon=True).start()
+
+    def submit(self, funcion):
+        futuro = Future()
+        self._pendientes.put((futuro, funcion))
+        return futuro
+
+    def _trabajar(self):
+        while True:
+            pendiente = self._pendientes.get()
+            if pendiente is None: # shutdown()
+                return
+            futuro, funcion = pendiente
+            if not futuro.set_running_or_notify_cancel(): # Cancelada antes de empezar.
+                continue
+            try:
+                futuro.set_result(funcion())
+            except BaseException as error:
+                futuro.set_exception(error)
+
+    def shutdown(self, wait=False, cancel_futures=False):
+        if cancel_futures:
+            while True:
+                try:
+                    pendiente = self._pendientes.get_nowait()
+                except queue.Empty:
+                    break
+                if pendiente is not None:
+                    pendiente[0].cancel()
+        self._pendientes.put(None)
+
+class EjecutorTareas:
+    """
+    Ejecuta funciones en hilos de fondo y entrega los resultados en el hilo de la interfaz.
+    Con un solo trabajador (por defecto) las tareas corren de a una y en orden, así que
+    pueden compartir estado sin bloqueos. Con demonio=True (solo con un trabajador) el hilo
+    es daemon: al cerrar, una tarea que sigue corriendo no demora la salida del programa.
+    """
+
+    def __init__(self, max_trabajadores=1, demonio=False):
+        if demonio:
+            if max_trabajadores != 1:
+                raise ValueError("demonio=True solo admite un trabajador.")
+            self._pool = _TrabajadorDemonio("tareas_demonio")
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_trabajadores, thread_name_prefix="tareas")
+        self._cola = queue.Queue()
+        self._por_grupo = {} # grupo -> última tarea enviada de ese grupo.
+        self.activas = set() # Tareas enviadas que todavía no terminaron.
+        self.al_cambiar_actividad = None # Callback(ocupado) cuando empieza o termina el trabajo pendiente.
+        self._sondeo = None
+
+    def enviar(self, funcion, *argumentos, grupo=None, al_terminar=None, al_fallar=None,
+               al_progresar=None, con_tarea=False):
+        """
+        Envía funcion(*argumentos) a un hilo de fondo y devuelve la Tarea. Con con_tarea=True
+        la función recibe además la Tarea como último argumento (para reportar o verificar).
+        Si se indica 'grupo', se cancela la tarea anterior del mismo grupo.
+        """
+        if grupo is not None and grupo in self._por_grupo:
+            self._por_grupo[grupo].cancelar()
+        tarea = Tarea(self, grupo, al_terminar, al_fallar, al_progresar)
+        if grupo is not None:
+            self._por_grupo[grupo] = tarea
+
+        def ejecutar():
+            if tarea.cancelada:
+                return
+            try:
+                resultado = funcion(*argumentos, tarea) if con_tarea else funcion(*argumentos)
+            except TareaCancelada:
+                return
+            except Exception as error: # El error se informa en el hilo de la interfaz.
+                self._cola.put(('error', tarea, error))
+                return
+            self._cola.put(('resultado', tarea, resultado))
+
+        ocioso = not self.activas
+        self.activas.add(tarea)
+        tarea.futuro = self._pool.submit(ejecutar)
+        tarea.futuro.add_done_callback(lambda _futuro: self._cola.put(('fin', tarea, None)))
+        if ocioso and self.al_cambiar_actividad is not None:
+            self.al_cambiar_actividad(True)
+        return tarea
+
+    def cancelar_grupo(self, grupo):
+        """Cancela la última tarea del grupo, si hay una."""
+        if grupo in self._por_grupo:
+            self._por_grupo[grupo].cancelar()
+
+    @property
+    def ocupado(self):
+        return bool(self.activas)
+
+    def procesar_cola(self):
+        """Entrega los resultados pendientes. Se llama desde el hilo de la interfaz."""
+        ocupado = self.ocupado
+        while True:
+            try:
+                tipo, tarea, dato = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == 'fin':
+                self.activas.discard(tarea)
+                if self._por_grupo.get(tarea.grupo) is tarea:
+                    del self._por_grupo[tarea.grupo]
+            elif tarea.cancelada: # Reemplazada por una tarea más nueva: se descarta.
+                continue
+            elif tipo == 'resultado' and tarea.al_terminar is not None:
+                tarea.al_terminar(dato)
+            elif tipo == 'error' and tarea.al_fallar is not None:
+                tarea.al_fallar(dato)
+            elif tipo == 'progreso' and tarea.al_progresar is not None:
+                tarea.al_progresar(*dato)
+        if ocupado != self.ocupado and self.al_cambiar_actividad is not None:
+            self.al_cambiar_actividad(self.ocupado)
+
+    def sondear(self, ventana, intervalo_ms=INTERVALO_SONDEO_MS):
+        """Revisa la cola ahora y vuelve a programarse con ventana.after()."""
+        self.procesar_cola()
+        self._sondeo = ventana.after(intervalo_ms, self.sondear, ventana, intervalo_ms)
+
+    def cerrar(self):
+        """
+        Cancela todo lo pendiente y libera los hilos (al cerrar la ventana). Una tarea que
+        ya está corriendo sigue hasta terminar; con demonio=True no se la espera al salir.
+        """
+        for tarea in list(self.activas):
+            tarea.cancelar()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,62 @@
+# tests/test_jsonIncremental.py
+# Pruebas de iterar_array_json: bloques partidos en cualquier lugar y, con datos rotos,
+# que el error aparezca sin leer el resto de la respuesta.
+# Uso: python -m unittest discover tests   (o python -m pytest tests)
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Módulos en la raíz del repo.
+
+from jsonIncremental import iterar_array_json
+
+def en_bloques(texto, tamanio):
+    datos = texto.encode('utf-8')
+    return [datos[i:i + tamanio] for i in range(0, len(datos), tamanio)]
+
+class FlujoLargo:
+    """Bloques que empiezan con 'inicio' y siguen con 'cantidad' veces 'relleno'; cuenta cuántos se leyeron."""
+
+    def __init__(self, inicio, relleno, cantidad=2000):
+        self.inicio, self.relleno, self.cantidad, self.leidos = inicio, relleno, cantidad, 0
+
+    def __iter__(self):
+        yield self.inicio
+        for _ in range(self.cantidad):
+            self.leidos += 1
+            yield self.relleno
+
+class TestIterarArrayJson(unittest.TestCase):
+
+    def test_bloques_de_cualquier_tamanio(self):
+        texto = json.dumps([{"nombre": "Perú", "capital": ["Lima"], "area": 1285216.5}, -1.5e10, 2E+3, 0, True, None, "ñé"],
+                           ensure_ascii=False)
+        for tamanio in (1, 2, 3, 7, len(texto)):
+            with self.subTest(tamanio=tamanio):
+                self.assertEqual(list(iterar_array_json(en_bloques(texto, tamanio))), json.loads(texto))
+
+    def test_array_vacio(self):
+        self.assertEqual(list(iterar_array_json(en_bloques(" [ ] ", 1))), [])
+
+    def test_json_invalido(self):
+        for texto in ('[1.x]', '[{"a": 1 x}]', '[1,,2]', '{"a": 1}', '[1] 2', '["sin cerrar'):
+            for tamanio in (1, 100):
+                with self.subTest(texto=texto, tamanio=tamanio), self.assertRaises(ValueError):
+                    list(iterar_array_json(en_bloques(texto, tamanio)))
+
+    def test_elemento_roto_falla_sin_leer_el_resto(self):
+        flujo = FlujoLargo(b'[{"a": 1}, {"b": 2 "c": 3}, ', b'{"x": 1},' * 1000)
+        with self.assertRaises(ValueError):
+            list(iterar_array_json(flujo))
+        self.assertLessEqual(flujo.leidos, 1)
+
+    def test_elemento_demasiado_grande_falla_acotado(self):
+        flujo = FlujoLargo(b'[{"a": "texto sin cerrar', b'x' * 65536)
+        with self.assertRaises(ValueError):
+            list(iterar_array_json(flujo, maximo_elemento=1 << 20))
+        self.assertLessEqual(flujo.leidos, (1 << 20) // 65536 + 1)
+
+if __name__ == "__main__":
+    unittest.main()